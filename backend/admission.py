@@ -0,0 +1,207 @@
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import yt_dlp
+
+from video_ids import youtube_video_id
+
+# Longest video processed normally, in seconds (0 = no limit)
+ADMISSION_MAX_DURATION = float(os.getenv("ADMISSION_MAX_DURATION", "0"))
+# What happens to longer videos: reject, truncate (process only the first ADMISSION_MAX_DURATION
+# seconds) or low_priority (process in full in the low-priority lane)
+ADMISSION_POLICY = os.getenv("ADMISSION_POLICY", "reject").lower()
+ADMISSION_PROBE_TTL = int(os.getenv("ADMISSION_PROBE_TTL", "1800"))
+# Concurrent jobs per lane (0 = unlimited)
+ADMISSION_LANE_LIMITS = {
+    "normal": int(os.getenv("ADMISSION_NORMAL_CONCURRENCY", "0")),
+    "low": int(os.getenv("ADMISSION_LOW_PRIORITY_CONCURRENCY", "1")),
+}
+# Pipeline seconds per second of media, for job cost estimates
+ADMISSION_SECONDS_PER_MEDIA_SECOND = float(os.getenv("ADMISSION_SECONDS_PER_MEDIA_SECOND", "0.5"))
+
+
+class ProbeCache:
+    """Probe results kept in memory by video ID for ``ttl_seconds``"""
+
+    def __init__(self, ttl_seconds: int, max_entries: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # key -> (expires at, probe), least recently used first
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.time():
+                self._entries.pop(key, None)
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def put(self, key: str, probe: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl_seconds, probe)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "ttl_seconds": self.ttl_seconds}
+
+
+def summarize(info: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of the extracted info admission decisions use"""
+    duration = info.get("duration")
+    # Cheapest video format, as the download cascade starts from the smallest one
+    rates = []
+    for fmt in info.get("formats") or []:
+        if fmt.get("vcodec") == "none":
+            continue
+        size = fmt.get("filesize") or fmt.get("filesize_approx")
+        if size and duration:
+            rates.append(size / duration)
+        elif fmt.get("tbr"):
+            rates.append(fmt["tbr"] * 1000 / 8)
+    return {
+        "id": info.get("id"),
+        "title": info.get("title"),
+        "duration": duration,
+        "is_live": bool(info.get("is_live")),
+        "live_status": info.get("live_status"),
+        "formats": len(info.get("formats") or []),
+        "bytes_per_second": round(min(rates)) if rates else None,
+    }
+
+
+def estimate_cost(summary: Dict[str, Any], media_seconds: Optional[float]) -> Dict[str, Any]:
+    """Rough download size and processing time for ``media_seconds`` of the video"""
+    if not media_seconds:
+        return {"media_seconds": None, "download_bytes": None, "processing_seconds": None}
+    rate = summary.get("bytes_per_second")
+    return {
+        "media_seconds": round(media_seconds, 1),
+        "download_bytes": round(rate * media_seconds) if rate else None,
+        "processing_seconds": round(media_seconds * ADMISSION_SECONDS_PER_MEDIA_SECOND),
+    }
+
+
+def decide(summary: Dict[str, Any], max_duration: float = ADMISSION_MAX_DURATION,
+           policy: str = ADMISSION_POLICY) -> Dict[str, Any]:
+    """Admission decision for a probed video: accept, reject, truncate or low_priority"""
+    decision = {"action": "accept", "reason": None, "lane": "normal", "max_duration": None}
+    duration = summary.get("duration")
+    if summary.get("is_live") or summary.get("live_status") in ("is_live", "is_upcoming"):
+        decision.update(action="reject", reason="Live streams and upcoming premieres cannot be processed")
+    elif max_duration and duration and duration > max_duration:
+        limit = f"{duration / 60:.0f} min video exceeds the {max_duration / 60:.0f} min limit"
+        if policy == "truncate":
+            decision.update(action="truncate", reason=f"{limit}; only the start is processed", max_duration=max_duration)
+            duration = max_duration
+        elif policy == "low_priority":
+            decision.update(action="low_priority", reason=f"{limit}; queued in the low-priority lane", lane="low")
+        else:
+            decision.update(action="reject", reason=limit)
+    decision["cost"] = estimate_cost(summary, duration)
+    return decision
+
+
+def probe_video(url: str, cache: ProbeCache) -> Tuple[Dict[str, Any], bool]:
+    """Extract metadata without downloading, cached by video ID; returns the probe and whether it was cached"""
+    key = youtube_video_id(url) or url
+    probe = cache.get(key)
+    if probe is not None:
+        return probe, True
+    started = time.time()
+    with yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True, 'skip_download': True}) as ydl:
+        info = ydl.sanitize_info(ydl.extract_info(url, download=False))
+    probe = {"summary": summarize(info), "info": info, "seconds": round(time.time() - started, 2)}
+    cache.put(key, probe)
+    return probe, False
+
+
+async def admit(url: str) -> Dict[str, Any]:
+    """Probe a video and decide how to run it
+
+    The decision carries the probe summary and, under ``info``, the full
+    extracted info for the processor to reuse. A failed probe admits the
+    job unchanged; the download cascade may still succeed where it failed.
+    """
+    loop = asyncio.get_event_loop()
+    try:
+        probe, cached = await loop.run_in_executor(None, probe_video, url, probe_cache)
+    except Exception as e:
+        print(f"Admission probe failed for {url}: {e}", flush=True)
+        return {"action": "accept", "reason": f"probe failed: {e}", "lane": "normal", "max_duration": None,
+                "cost": estimate_cost({}, None), "probe": None, "info": None}
+    decision = decide(probe["summary"])
+    decision.update(probe={**probe["summary"], "cached": cached, "seconds": probe["seconds"]}, info=probe["info"])
+    print(f"Admission: {decision['action']} ({decision['reason'] or 'within limits'})", flush=True)
+    return decision
+
+
+class LaneScheduler:
+    """Per-lane concurrency limits; queued jobs start cheapest (by estimated cost) first"""
+
+    def __init__(self, limits: Dict[str, int]):
+        self.limits = limits
+        self._running: Dict[str, int] = {lane: 0 for lane in limits}
+        self._waiting: Dict[str, List[Tuple[float, int, "asyncio.Future[None]"]]] = {lane: [] for lane in limits}
+        self._order = itertools.count()
+
+    @asynccontextmanager
+    async def slot(self, lane: str, cost: float = 0.0) -> AsyncIterator[None]:
+        limit = self.limits.get(lane, 0)
+        self._running.setdefault(lane, 0)
+        waiting = self._waiting.setdefault(lane, [])
+        if limit > 0 and (self._running[lane] >= limit or waiting):
+            future = asyncio.get_event_loop().create_future()
+            heapq.heappush(waiting, (cost, next(self._order), future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                # Cancelled after the slot was handed over: pass it on
+                if future.done() and not future.cancelled():
+                    self._release(lane)
+                raise
+        else:
+            self._running[lane] += 1
+        try:
+            yield
+        finally:
+            self._release(lane)
+
+    def _release(self, lane: str):
+        waiting = self._waiting[lane]
+        while waiting:
+            _, _, future = heapq.heappop(waiting)
+            if not future.done():
+                # Hand the slot straight to the next job; the running count stays the same
+                future.set_result(None)
+                return
+        self._running[lane] -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            lane: {
+                "limit": self.limits.get(lane, 0),
+                "running": self._running.get(lane, 0),
+                "waiting": sum(1 for _, _, future in self._waiting.get(lane, []) if not future.done()),
+            }
+            for lane in set(self.limits) | set(self._running)
+        }
+
+
+probe_cache = ProbeCache(ADMISSION_PROBE_TTL)
+lane_scheduler = LaneScheduler(ADMISSION_LANE_LIMITS)
@@ -0,0 +1,95 @@
+import subprocess
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+# Whisper's native input format: 16 kHz mono float32
+SAMPLE_RATE = 16000
+
+
+def extract_pcm(media_path: str, pcm_path: str, max_seconds: Optional[float] = None) -> Path:
+    """Decode the audio track of ``media_path`` (at most ``max_seconds`` of it) to raw 16 kHz mono float32 PCM"""
+    cmd = ["ffmpeg", "-nostdin", "-y", "-i", str(media_path)]
+    if max_seconds:
+        cmd += ["-t", str(max_seconds)]
+    cmd += [
+        "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "-f", "f32le", "-acodec", "pcm_f32le", str(pcm_path)
+    ]
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to extract audio: {result.stderr.decode(errors='ignore')[-500:]}")
+    return Path(pcm_path)
+
+
+def start_pcm_stream(source_url: str, pcm_path: str, headers: Optional[Dict[str, str]] = None,
+                     max_seconds: Optional[float] = None) -> subprocess.Popen:
+    """Start ffmpeg decoding a remote media URL to raw PCM at ``pcm_path`` as it downloads
+
+    The PCM file grows while ffmpeg runs; ``pcm_length`` tells how much is
+    there. ffmpeg's errors go to ``<pcm_path>.log``.
+    """
+    cmd = ["ffmpeg", "-nostdin", "-y", "-loglevel", "error"]
+    if headers:
+        cmd += ["-headers", "".join(f"{key}: {value}\r\n" for key, value in headers.items())]
+    if source_url.startswith("http"):
+        cmd += ["-reconnect", "1", "-reconnect_streamed", "1"]
+    cmd += ["-i", source_url]
+    if max_seconds:
+        cmd += ["-t", str(max_seconds)]
+    cmd += [
+        "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "-f", "f32le", "-acodec", "pcm_f32le", "-flush_packets", "1", str(pcm_path)
+    ]
+    with open(f"{pcm_path}.log", "wb") as log:
+        return subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=log)
+
+
+def pcm_length(pcm_path: str) -> int:
+    """Number of whole samples currently in a PCM file"""
+    try:
+        return Path(pcm_path).stat().st_size // 4
+    except FileNotFoundError:
+        return 0
+
+
+def open_pcm(pcm_path: str, length: Optional[int] = None) -> np.ndarray:
+    """Memory-map a raw float32 PCM file without reading it into memory
+
+    Copy-on-write mode keeps the file untouched while giving consumers such
+    as Whisper (which wraps the array with ``torch.from_numpy``) a writable
+    view instead of forcing a full copy. ``length`` maps only the first
+    samples of a file that is still being written.
+    """
+    length = pcm_length(pcm_path) if length is None else length
+    if length == 0:
+        return np.zeros(0, dtype=np.float32)
+    return np.memmap(pcm_path, dtype=np.float32, mode="c", shape=(length,))
+
+
+def frame_energy_db(samples: np.ndarray, frame_seconds: float = 0.02) -> np.ndarray:
+    """RMS energy in dBFS for consecutive non-overlapping frames"""
+    frame_size = max(1, int(frame_seconds * SAMPLE_RATE))
+    n_frames = len(samples) // frame_size
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = np.asarray(samples[:n_frames * frame_size], dtype=np.float32).reshape(n_frames, frame_size)
+    rms = np.sqrt(np.mean(np.square(frames), axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def quietest_point(samples: np.ndarray, start: int, end: int,
+                   frame_seconds: float = 0.02, smooth_seconds: float = 0.3) -> int:
+    """Sample index in the quietest stretch of ``samples[start:end]``
+
+    Frame energies are smoothed first so a real pause wins over a single
+    quiet frame between two syllables.
+    """
+    energy = frame_energy_db(samples[start:end], frame_seconds)
+    if len(energy) == 0:
+        return (start + end) // 2
+    width = max(1, min(len(energy), int(smooth_seconds / frame_seconds)))
+    smoothed = np.convolve(energy, np.ones(width) / width, mode="same")
+    frame_size = max(1, int(frame_seconds * SAMPLE_RATE))
+    return start + int(np.argmin(smoothed)) * frame_size + frame_size // 2
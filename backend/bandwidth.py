@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Set
+
+# Aggregate download budget in bytes per second across all jobs (0 = unlimited)
+DOWNLOAD_BANDWIDTH_LIMIT = int(os.getenv("DOWNLOAD_BANDWIDTH_LIMIT", "0"))
+# Fragments fetched in parallel per DASH/HLS download
+FRAGMENT_CONCURRENCY = int(os.getenv("DOWNLOAD_FRAGMENT_CONCURRENCY", "4"))
+
+
+class DownloadLease:
+    """One active download's share of the bandwidth budget.
+
+    ``hook`` is a yt-dlp progress hook: it counts received bytes and, when
+    a limit is set, blocks the downloading thread until the download's
+    share of the bucket covers them.
+    """
+
+    def __init__(self, scheduler: "BandwidthScheduler", name: str):
+        self.scheduler = scheduler
+        self.name = name
+        self.started = time.time()
+        self.bytes = 0
+        self.tokens = 0.0
+        self.refilled = self.started
+        self._seen: Dict[str, int] = {}
+        # Files reported since the current attempt started; see new_attempt
+        self._attempt_files: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "DownloadLease":
+        self.scheduler._register(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.scheduler._unregister(self)
+
+    def throughput(self) -> float:
+        return self.bytes / max(time.time() - self.started, 1e-6)
+
+    def hook(self, d: Dict[str, Any]):
+        if d.get("status") != "downloading":
+            return
+        # downloaded_bytes is cumulative per file, and fragment threads report concurrently
+        filename = d.get("filename") or ""
+        downloaded = d.get("downloaded_bytes") or 0
+        with self._lock:
+            previous = self._seen.get(filename, 0)
+            if filename not in self._attempt_files:
+                self._attempt_files.add(filename)
+                # A retry that starts the file over, rather than resuming it, downloads every byte again
+                if downloaded < previous:
+                    previous = 0
+            delta = max(0, downloaded - previous)
+            self._seen[filename] = max(downloaded, previous)
+            self.bytes += delta
+        if delta:
+            self.scheduler._consume(self, delta)
+
+    def new_attempt(self):
+        """A download retried under the same lease, possibly writing the same files again"""
+        with self._lock:
+            self._attempt_files.clear()
+
+    def count(self, nbytes: int):
+        """Bytes received by a download that cannot be paused, e.g. ffmpeg reading a URL itself
+
+        They are accounted for, and the download keeps its share of the
+        budget, but the downloading side is never made to wait.
+        """
+        with self._lock:
+            self.bytes += nbytes
+        if nbytes:
+            self.scheduler._consume(self, nbytes, throttle=False)
+
+    def summary(self) -> Dict[str, Any]:
+        seconds = time.time() - self.started
+        return {
+            "bytes": self.bytes,
+            "seconds": round(seconds, 2),
+            "throughput": round(self.bytes / max(seconds, 1e-6)),
+        }
+
+
+class BandwidthScheduler:
+    """Process-wide token bucket shared fairly among active downloads.
+
+    The limit is split equally between the downloads running right now;
+    each keeps its own bucket refilled at its current share, so a new job
+    slows the others down and a finishing one frees its share for the rest.
+    """
+
+    def __init__(self, limit_bytes_per_second: int = 0, burst_seconds: float = 1.0):
+        self.limit = limit_bytes_per_second
+        self.burst_seconds = burst_seconds
+        self._lock = threading.Lock()
+        self._active: Dict[int, DownloadLease] = {}
+        self._stats = {"downloads": 0, "bytes": 0, "throttled_seconds": 0.0}
+
+    def lease(self, name: str) -> DownloadLease:
+        return DownloadLease(self, name)
+
+    def _register(self, lease: DownloadLease):
+        with self._lock:
+            self._active[id(lease)] = lease
+            self._stats["downloads"] += 1
+
+    def _unregister(self, lease: DownloadLease):
+        with self._lock:
+            self._active.pop(id(lease), None)
+
+    def _consume(self, lease: DownloadLease, nbytes: int, throttle: bool = True):
+        with self._lock:
+            self._stats["bytes"] += nbytes
+            if self.limit <= 0 or not throttle:
+                return
+            share = self.limit / max(1, len(self._active))
+            now = time.time()
+            lease.tokens = min(lease.tokens + (now - lease.refilled) * share, share * self.burst_seconds)
+            lease.refilled = now
+            lease.tokens -= nbytes
+            # Running into debt means this download got ahead of its share
+            wait = -lease.tokens / share if lease.tokens < 0 else 0.0
+            self._stats["throttled_seconds"] += wait
+        if wait:
+            time.sleep(wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "limit_bytes_per_second": self.limit,
+                "fragment_concurrency": FRAGMENT_CONCURRENCY,
+                **self._stats,
+                "throttled_seconds": round(self._stats["throttled_seconds"], 2),
+                "active": [
+                    {"name": lease.name, "bytes": lease.bytes, "throughput": round(lease.throughput())}
+                    for lease in self._active.values()
+                ],
+            }
+
+
+bandwidth_scheduler = BandwidthScheduler(DOWNLOAD_BANDWIDTH_LIMIT)
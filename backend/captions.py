@@ -0,0 +1,143 @@
+import html
+import re
+import urllib.request
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional, Tuple
+
+from transcript import Segment, Transcript
+
+# Preferred caption formats, most precise first
+CAPTION_FORMATS = ("srv3", "vtt")
+
+_VTT_TIMING = re.compile(
+    r"((?:\d+:)?\d{1,2}:\d{2}[.,]\d{3})\s*-->\s*((?:\d+:)?\d{1,2}:\d{2}[.,]\d{3})"
+)
+_VTT_TAG = re.compile(r"<[^>]+>")
+_NON_SPEECH = re.compile(r"^\s*[\[(][^\])]*[\])]\s*$")
+
+
+def _vtt_seconds(timestamp: str) -> float:
+    parts = timestamp.replace(",", ".").split(":")
+    seconds = float(parts[-1])
+    if len(parts) > 1:
+        seconds += int(parts[-2]) * 60
+    if len(parts) > 2:
+        seconds += int(parts[-3]) * 3600
+    return seconds
+
+
+def parse_vtt(content: str) -> List[Segment]:
+    """Parse WebVTT cues into ``(text, start, end)`` segments.
+
+    YouTube's automatic captions repeat the previous line at the top of each
+    cue and add near-zero-length cues while the text scrolls, so lines that
+    were already emitted are dropped.
+    """
+    transcript: List[Segment] = []
+    previous_lines: List[str] = []
+    # Cues are separated by empty lines; YouTube puts whitespace-only lines inside cues
+    for block in re.split(r"\n{2,}", content.replace("\r\n", "\n")):
+        lines = block.strip().split("\n")
+        timing_index = next((i for i, line in enumerate(lines) if _VTT_TIMING.search(line)), None)
+        if timing_index is None:
+            continue
+        match = _VTT_TIMING.search(lines[timing_index])
+        start, end = _vtt_seconds(match.group(1)), _vtt_seconds(match.group(2))
+
+        text_lines = []
+        for line in lines[timing_index + 1:]:
+            line = html.unescape(_VTT_TAG.sub("", line)).strip()
+            if line:
+                text_lines.append(line)
+        new_lines = [line for line in text_lines if line not in previous_lines]
+        if text_lines:
+            previous_lines = text_lines
+        if not new_lines or end - start < 0.05:
+            continue
+        transcript.append((" " + " ".join(new_lines), start, end))
+    return transcript
+
+
+def parse_srv3(content: str) -> List[Segment]:
+    """Parse YouTube's srv3 timed-text XML into ``(text, start, end)`` segments"""
+    root = ET.fromstring(content)
+    transcript: List[Segment] = []
+    for p in root.iter("p"):
+        text = " ".join("".join(p.itertext()).split())
+        if not text:
+            continue
+        start = int(p.get("t", 0)) / 1000
+        end = start + int(p.get("d", 0)) / 1000
+        transcript.append((" " + html.unescape(text), start, end))
+
+    # Auto captions overlap each line with the next; clamp to the next start
+    for i in range(len(transcript) - 1):
+        text, start, end = transcript[i]
+        next_start = transcript[i + 1][1]
+        if end > next_start > start:
+            transcript[i] = (text, start, next_start)
+    return transcript
+
+
+def parse_captions(content: str, ext: str) -> List[Segment]:
+    if ext == "srv3":
+        return parse_srv3(content)
+    if ext == "vtt":
+        return parse_vtt(content)
+    raise ValueError(f"Unsupported caption format: {ext}")
+
+
+def caption_quality_issue(transcript: List[Segment], duration: Optional[float]) -> Optional[str]:
+    """Return why a caption transcript is unusable, or None if it passes"""
+    if not transcript:
+        return "no caption segments"
+    speech = [segment for segment in transcript if not _NON_SPEECH.match(segment[0])]
+    if len(speech) < max(1, len(transcript) // 2):
+        return "captions are mostly non-speech tags"
+    words = sum(len(segment[0].split()) for segment in speech)
+    if duration:
+        covered = sum(max(0.0, end - start) for _, start, end in speech)
+        if covered / duration < 0.2:
+            return f"captions cover only {covered / duration:.0%} of the video"
+        if words / (duration / 60) < 20:
+            return "too few words per minute"
+    if any(end < start for _, start, end in transcript):
+        return "caption timings are inconsistent"
+    return None
+
+
+def select_caption_track(info: Dict[str, Any], language: str = "en") -> Optional[Dict[str, str]]:
+    """Pick the best caption track from a yt-dlp info dict: manual before automatic"""
+    for kind, field in (("manual", "subtitles"), ("auto", "automatic_captions")):
+        tracks = info.get(field) or {}
+        # Exact language first, then the untranslated original and regional variants ("en-US")
+        regional = re.compile(rf"^{re.escape(language)}-[A-Z]{{2}}$")
+        candidates = [language, f"{language}-orig"] + sorted(lang for lang in tracks if regional.match(lang))
+        for lang in candidates:
+            formats = {track.get("ext"): track for track in tracks.get(lang) or []}
+            for ext in CAPTION_FORMATS:
+                if ext in formats and formats[ext].get("url"):
+                    return {"kind": kind, "language": lang, "ext": ext, "url": formats[ext]["url"]}
+    return None
+
+
+def fetch_caption_transcript(info: Dict[str, Any], language: str = "en",
+                             timeout: int = 30) -> Tuple[Optional[Transcript], Dict[str, Any]]:
+    """Download and parse the best caption track; returns the transcript and a report"""
+    track = select_caption_track(info, language)
+    if track is None:
+        return None, {"used": False, "reason": "no captions available"}
+
+    report: Dict[str, Any] = {"kind": track["kind"], "language": track["language"], "ext": track["ext"]}
+    try:
+        request = urllib.request.Request(track["url"], headers=info.get("http_headers") or {})
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            content = response.read().decode("utf-8", errors="replace")
+        transcript = parse_captions(content, track["ext"])
+    except Exception as e:
+        return None, {**report, "used": False, "reason": f"caption download failed: {e}"}
+
+    issue = caption_quality_issue(transcript, info.get("duration"))
+    if issue:
+        return None, {**report, "used": False, "reason": issue}
+    return Transcript.from_segments(transcript), {**report, "used": True, "segments": len(transcript)}
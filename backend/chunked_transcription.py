@@ -0,0 +1,198 @@
+import asyncio
+import os
+from collections import deque
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from audio import SAMPLE_RATE, quietest_point
+from transcript import Row, Segment, Transcript
+
+# "auto" chunks inputs longer than TRANSCRIBE_CHUNK_MIN_SECONDS when several workers exist
+CHUNK_MODE = os.getenv("TRANSCRIBE_CHUNKED", "auto").lower()
+CHUNK_MIN_SECONDS = float(os.getenv("TRANSCRIBE_CHUNK_MIN_SECONDS", "600"))
+WINDOW_SECONDS = float(os.getenv("TRANSCRIBE_WINDOW_SECONDS", "120"))
+WINDOW_OVERLAP_SECONDS = float(os.getenv("TRANSCRIBE_WINDOW_OVERLAP", "2"))
+
+
+# Emit segments window by window while transcription runs, rather than all at the end
+STREAM_WINDOWS = os.getenv("TRANSCRIBE_STREAMING", "true").lower() == "true"
+# Decode audio straight from the stream URL and transcribe windows while the rest downloads
+PIPELINED = os.getenv("TRANSCRIBE_PIPELINED", "false").lower() == "true"
+
+
+def should_chunk(duration_seconds: float, workers: int) -> bool:
+    """Whether a transcription of this length should be split into windows"""
+    if CHUNK_MODE in ("false", "off", "0"):
+        return False
+    if CHUNK_MODE in ("true", "on", "1"):
+        return True
+    if CHUNK_MODE == "auto":
+        return workers > 1 and duration_seconds >= CHUNK_MIN_SECONDS
+    return False
+
+
+def plan_windows(samples: np.ndarray, window_seconds: float, overlap_seconds: float = 2.0,
+                 search_seconds: float = 15.0) -> List[Dict[str, int]]:
+    """Split audio into overlapping windows cut at the quietest point near each boundary.
+
+    Each window owns the span between two cut points; ``start``/``end``
+    extend that span by the overlap so words at a cut are heard by both
+    neighbours. All positions are sample indices.
+    """
+    total = len(samples)
+    window = max(1, int(window_seconds * SAMPLE_RATE))
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    search = int(search_seconds * SAMPLE_RATE)
+
+    cuts = [0]
+    nominal = window
+    while nominal < total - window // 4:
+        # Look for a pause around the nominal boundary, never behind the last cut
+        lo = max(cuts[-1] + window // 2, nominal - search)
+        hi = min(total, nominal + search)
+        cut = quietest_point(samples, lo, hi) if hi > lo else nominal
+        cuts.append(cut)
+        nominal = cut + window
+    cuts.append(total)
+
+    windows = []
+    for i in range(len(cuts) - 1):
+        windows.append({
+            "index": i,
+            "own_start": cuts[i],
+            "own_end": cuts[i + 1],
+            "start": max(0, cuts[i] - overlap),
+            "end": min(total, cuts[i + 1] + overlap),
+        })
+    return windows
+
+
+async def plan_windows_live(available: Callable[[], int], finished: Callable[[], bool],
+                            load: Callable[[int], np.ndarray], window_seconds: float,
+                            overlap_seconds: float = 2.0, search_seconds: float = 15.0,
+                            poll_seconds: float = 0.25) -> AsyncIterator[Dict[str, Any]]:
+    """``plan_windows`` for audio that is still arriving, yielding each window once its samples exist.
+
+    ``available`` is the number of samples so far, ``finished`` whether
+    more can come and ``load(n)`` the first ``n`` samples. A cut is only
+    chosen once the whole search span and overlap after it have arrived,
+    so the plan matches ``plan_windows`` on the complete audio. The final
+    window is marked ``last``.
+    """
+    window = max(1, int(window_seconds * SAMPLE_RATE))
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    search = int(search_seconds * SAMPLE_RATE)
+
+    last_cut = 0
+    nominal = window
+    index = 0
+    while True:
+        # Enough to pick the cut, include the overlap after it, and know a cut is due at all
+        needed = nominal + max(search, window // 4 + 1) + overlap
+        while not finished() and available() < needed:
+            await asyncio.sleep(poll_seconds)
+        done = finished()
+        total = available()
+        if done and not nominal < total - window // 4:
+            yield {"index": index, "own_start": last_cut, "own_end": total,
+                   "start": max(0, last_cut - overlap), "end": total, "last": True}
+            return
+        lo = max(last_cut + window // 2, nominal - search)
+        hi = min(total, nominal + search)
+        cut = quietest_point(load(hi), lo, hi) if hi > lo else nominal
+        yield {"index": index, "own_start": last_cut, "own_end": cut,
+               "start": max(0, last_cut - overlap), "end": min(total, cut + overlap), "last": False}
+        index += 1
+        last_cut = cut
+        nominal = cut + window
+
+
+def owned_segments(window: Dict[str, int], segments: Iterable[Segment], is_last: bool) -> Transcript:
+    """Shift one window's segments onto the global timeline, keeping those it owns.
+
+    A segment belongs to the window that owns its midpoint, so text heard
+    by two neighbouring windows appears once.
+    """
+    shifted = Transcript.from_segments(segments).shifted(window["start"] / SAMPLE_RATE)
+    own_start = window["own_start"] / SAMPLE_RATE
+    own_end = window["own_end"] / SAMPLE_RATE
+    owned = []
+    for i, (_, start, end) in enumerate(shifted):
+        midpoint = (start + end) / 2
+        if midpoint < own_start or (midpoint >= own_end and not is_last):
+            continue
+        owned.append(i)
+    return shifted.select(owned)
+
+
+def _is_repeat(segment: Sequence[Any], previous: Sequence[Any]) -> bool:
+    """Whisper can place the same sentence on either side of a cut"""
+    return segment[0].strip() == previous[0].strip() and segment[1] < previous[2]
+
+
+def stitch_segments(windows: List[Dict[str, int]], results: List[Iterable[Segment]]) -> Transcript:
+    """Shift window-local segments onto the global timeline and drop overlap duplicates"""
+    transcript = Transcript.concat(
+        owned_segments(window, segments, window is windows[-1]) for window, segments in zip(windows, results)
+    )
+
+    deduped: List[Row] = []
+    for row in transcript.rows():
+        if deduped and _is_repeat(row, deduped[-1]):
+            text, start, end, words = deduped[-1]
+            deduped[-1] = (text, start, max(end, row[2]), words)
+            continue
+        deduped.append(row)
+    return Transcript.from_segments(deduped)
+
+
+async def transcribe_windows(windows: List[Dict[str, int]],
+                             transcribe_window: Callable[[int, int], Awaitable[Transcript]]) -> Transcript:
+    """Transcribe all windows concurrently and stitch the results in order"""
+    results = await asyncio.gather(*[
+        transcribe_window(window["start"], window["end"]) for window in windows
+    ])
+    return stitch_segments(windows, list(results))
+
+
+async def _planned(windows: List[Dict[str, int]]) -> AsyncIterator[Dict[str, Any]]:
+    for window in windows:
+        yield {**window, "last": window is windows[-1]}
+
+
+async def stream_windows(windows: Union[List[Dict[str, int]], AsyncIterable[Dict[str, Any]]],
+                         transcribe_window: Callable[[int, int], Awaitable[Transcript]],
+                         max_in_flight: int = 2) -> AsyncIterator[Tuple[Dict[str, Any], Transcript]]:
+    """Yield each window's global segments in timeline order as soon as they are ready.
+
+    ``windows`` is a plan from ``plan_windows`` or, for audio still
+    downloading, the live plan from ``plan_windows_live``. At most
+    ``max_in_flight`` windows are submitted ahead of the one being
+    emitted, so memory stays bounded however long the input is.
+    """
+    plan = _planned(windows) if isinstance(windows, list) else windows.__aiter__()
+    pending: Deque[Tuple[Dict[str, Any], "asyncio.Future[Transcript]"]] = deque()
+    exhausted = False
+    previous: Optional[Segment] = None
+    try:
+        while True:
+            while not exhausted and len(pending) < max(1, max_in_flight):
+                try:
+                    ahead = await plan.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                pending.append((ahead, asyncio.ensure_future(transcribe_window(ahead["start"], ahead["end"]))))
+            if not pending:
+                return
+            window, task = pending.popleft()
+            segments = owned_segments(window, await task, window["last"])
+            if previous is not None and segments and _is_repeat(segments[0], previous):
+                segments = segments[1:]
+            if segments:
+                previous = segments[-1]
+            yield window, segments
+    finally:
+        for _, task in pending:
+            task.cancel()
@@ -0,0 +1,175 @@
+import ast
+import asyncio
+import os
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from transcript import Transcript
+
+CLIP_MODEL = os.getenv("OPENAI_MODEL", "gpt-4")
+# Part of the clip cache key: bump whenever the prompts or the transcript encoding change
+PROMPT_VERSION = "v2"
+# "auto" maps over windows only when the whole transcript would not fit the prompt budget untouched
+MAP_REDUCE_MODE = os.getenv("CLIP_MAP_REDUCE", "auto").lower()
+MAP_WINDOW_SECONDS = float(os.getenv("CLIP_WINDOW_SECONDS", "900"))
+MAP_WINDOW_OVERLAP_SECONDS = float(os.getenv("CLIP_WINDOW_OVERLAP", "60"))
+MAP_CONCURRENCY = int(os.getenv("CLIP_MAP_CONCURRENCY", "4"))
+# Most clips kept after ranking the candidates from all windows
+MAX_CLIPS = int(os.getenv("CLIP_MAX_CLIPS", "10"))
+# Start map windows while transcription is still running, for inputs at least this long
+EARLY_MAP = os.getenv("CLIP_EARLY_MAP", "true").lower() == "true"
+EARLY_MAP_MIN_SECONDS = float(os.getenv("CLIP_EARLY_MAP_MIN_SECONDS", "3600"))
+
+DEFAULT_INSTRUCTIONS = "Find the most engaging and important moments in this video"
+
+SYSTEM_PROMPT = """
+You are a precise and efficient video clipping assistant.
+
+Given a transcript of a video and a user request, your job is to extract the most relevant time intervals that match the intent of the request.
+
+Provide just enough context for the user to understand what's happening, but avoid unnecessary filler. Be decisive—separate clips only when the topic, speaker, or scene clearly shifts. Minimize the number of clips while maintaining clarity.
+
+Return only a list of timestamp dictionaries in this exact format:
+[{'start': 12.4, 'end': 54.6}, {'start': 110.2, 'end': 132.0}]
+
+Do not include any explanation or commentary—just the list of relevant timestamp ranges.
+"""
+
+MAP_SYSTEM_PROMPT = """
+You are a precise video clipping assistant looking at one part of a longer video.
+
+Given this part of the transcript and a user request, list the time intervals in it that match the request, each with a relevance score from 1 (barely relevant) to 10 (exactly what was asked for). If nothing in this part matches, return an empty list.
+
+Return only a list in this exact format:
+[{'start': 12.4, 'end': 54.6, 'score': 8}]
+
+Do not include any explanation or commentary.
+"""
+
+
+def build_prompt(transcript_text: str, instructions: str, scored: bool = False, excerpt: bool = False) -> str:
+    example = "[{'start': 12.4, 'end': 54.6, 'score': 8}, ...]" if scored else "[{'start': 12.4, 'end': 54.6}, ...]"
+    omitted = ("\n            Only the parts related to the instructions are included; where the times jump, "
+               "a part was left out, and no interval may span it." if excerpt else "")
+    return f"""
+            Here is the transcript of the video. Each line is "[start seconds] text" and lasts until the next line starts:{omitted}
+{transcript_text}
+
+            Instructions: {instructions}
+
+            Please identify the most relevant time intervals in the video based on the instructions.
+            Return only the timestamps in this exact format: {example}
+            """
+
+
+def parse_intervals(content: str) -> List[Dict[str, float]]:
+    """The timestamp list in a model response"""
+    if re.search(r"\[\s*\]", content) and not re.search(r"\[\s*{", content):
+        return []
+    match = re.search(r"\[\s*{.*?}\s*\]", content, re.DOTALL)
+    if not match:
+        raise ValueError("No valid timestamp list found in GPT response")
+    return ast.literal_eval(match.group(0))
+
+
+def should_map_reduce(prompt_report: Dict[str, Any], line_seconds: float) -> bool:
+    """Whether the single-prompt encoding had to be degraded to fit the budget"""
+    if MAP_REDUCE_MODE in ("false", "off", "0"):
+        return False
+    if MAP_REDUCE_MODE in ("true", "on", "1"):
+        return True
+    return prompt_report["words_per_line"] is not None or prompt_report["line_seconds"] > line_seconds
+
+
+def split_transcript(transcript: Transcript, window_seconds: float = MAP_WINDOW_SECONDS,
+                     overlap_seconds: float = MAP_WINDOW_OVERLAP_SECONDS) -> List[Transcript]:
+    """Overlapping time windows of the transcript, so a moment at a boundary is whole in one of them"""
+    if len(transcript) == 0:
+        return []
+    end = transcript.ends[-1]
+    step = max(1.0, window_seconds - overlap_seconds)
+    windows = []
+    start = transcript.starts[0]
+    while True:
+        window = transcript.slice(start, start + window_seconds)
+        if len(window):
+            windows.append(window)
+        if start + window_seconds >= end:
+            return windows
+        start += step
+
+
+def reduce_candidates(candidates: List[Dict[str, float]], max_clips: int = MAX_CLIPS) -> List[Dict[str, float]]:
+    """Merge candidates found by overlapping windows, keep the best ``max_clips`` in timeline order"""
+    merged: List[Dict[str, float]] = []
+    for candidate in sorted(candidates, key=lambda c: (c["start"], c["end"])):
+        score = float(candidate.get("score", 5))
+        if merged and candidate["start"] < merged[-1]["end"]:
+            # The same moment seen from two windows
+            merged[-1]["end"] = max(merged[-1]["end"], candidate["end"])
+            merged[-1]["score"] = max(merged[-1]["score"], score)
+        else:
+            merged.append({"start": candidate["start"], "end": candidate["end"], "score": score})
+    best = sorted(merged, key=lambda c: (-c["score"], c["start"]))[:max_clips]
+    return [{"start": c["start"], "end": c["end"]} for c in sorted(best, key=lambda c: c["start"])]
+
+
+WindowKey = Tuple[int, float, float]
+
+
+def window_key(window: Transcript) -> WindowKey:
+    return len(window), round(window.starts[0], 3), round(window.ends[-1], 3)
+
+
+class EarlyMap:
+    """Map-window candidate extraction started while transcription is still running.
+
+    Fed the transcribed segments in timeline order, it starts ``map_window``
+    on each window of the split_transcript grid as soon as the transcript
+    has moved past the window's end. Map-reduce then takes over the tasks
+    for windows that turned out identical instead of asking again.
+    """
+
+    def __init__(self, map_window: Callable[[Transcript], Awaitable[Any]],
+                 window_seconds: float = MAP_WINDOW_SECONDS, overlap_seconds: float = MAP_WINDOW_OVERLAP_SECONDS):
+        self.map_window = map_window
+        self.window_seconds = window_seconds
+        self.step = max(1.0, window_seconds - overlap_seconds)
+        self._parts: List[Transcript] = []
+        self._next: Optional[float] = None
+        self._tasks: Dict[WindowKey, "asyncio.Future[Any]"] = {}
+        self.started = 0
+
+    def feed(self, segments: Transcript, position: float):
+        """New segments, and the position up to which the transcript is final"""
+        if len(segments):
+            self._parts.append(segments)
+        if not self._parts:
+            return
+        if self._next is None:
+            self._next = self._parts[0].starts[0]
+        transcript = None
+        while self._next + self.window_seconds <= position:
+            if transcript is None:
+                transcript = Transcript.concat(self._parts)
+            window = transcript.slice(self._next, self._next + self.window_seconds)
+            if len(window) and window_key(window) not in self._tasks:
+                self._tasks[window_key(window)] = asyncio.ensure_future(self.map_window(window))
+                self.started += 1
+            self._next += self.step
+
+    def take(self, window: Transcript) -> Optional["asyncio.Future[Any]"]:
+        """The task already started for this exact window, if any"""
+        return self._tasks.pop(window_key(window), None)
+
+    def cancel(self):
+        """Drop unused tasks and start over, e.g. when transcription restarts"""
+        for task in self._tasks.values():
+            if task.done():
+                if not task.cancelled():
+                    task.exception()
+            else:
+                task.cancel()
+        self._tasks.clear()
+        self._parts.clear()
+        self._next = None
@@ -0,0 +1,113 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from storage_paths import storage_root
+
+
+def default_cache_dir(name: str) -> Path:
+    return storage_root() / "cache" / name
+
+
+class DiskCache:
+    """Size-bounded LRU cache of byte blobs stored one file per entry.
+
+    Recency is kept in file modification times, so the LRU order survives
+    restarts; the in-memory index is rebuilt from the directory on startup.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._load_index()
+
+    def _load_index(self):
+        entries = []
+        for path in self.cache_dir.glob("*.bin"):
+            try:
+                stat = path.stat()
+                entries.append((stat.st_mtime, path.stem, stat.st_size))
+            except OSError:
+                continue
+        for _, name, size in sorted(entries):
+            self._index[name] = size
+            self._total_bytes += size
+
+    @staticmethod
+    def _name(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _path(self, name: str) -> Path:
+        return self.cache_dir / f"{name}.bin"
+
+    def get(self, key: str) -> Optional[bytes]:
+        name = self._name(key)
+        with self._lock:
+            if name not in self._index:
+                self._stats["misses"] += 1
+                return None
+            path = self._path(name)
+            try:
+                data = path.read_bytes()
+                os.utime(path)
+            except OSError:
+                self._total_bytes -= self._index.pop(name)
+                self._stats["misses"] += 1
+                return None
+            self._index.move_to_end(name)
+            self._stats["hits"] += 1
+            return data
+
+    def set(self, key: str, data: bytes):
+        name = self._name(key)
+        path = self._path(name)
+        tmp_path = path.with_suffix(f".tmp{threading.get_ident()}")
+        with self._lock:
+            if len(data) > self.max_bytes:
+                return
+            # Write then rename so readers never see a partial entry
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            if name in self._index:
+                self._total_bytes -= self._index.pop(name)
+            self._index[name] = len(data)
+            self._total_bytes += len(data)
+            self._stats["writes"] += 1
+            self._evict_locked()
+
+    def delete(self, key: str):
+        name = self._name(key)
+        with self._lock:
+            if name in self._index:
+                self._total_bytes -= self._index.pop(name)
+            try:
+                self._path(name).unlink()
+            except OSError:
+                pass
+
+    def _evict_locked(self):
+        while self._total_bytes > self.max_bytes and self._index:
+            name, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            self._stats["evictions"] += 1
+            try:
+                self._path(name).unlink()
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
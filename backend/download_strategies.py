@@ -0,0 +1,122 @@
+import json
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from disk_cache import default_cache_dir
+
+# (finished at, succeeded, seconds taken)
+Attempt = Tuple[float, bool, float]
+
+
+class DownloadStrategyScheduler:
+    """Orders download strategies by how they have been doing lately.
+
+    Each strategy keeps a rolling window of its recent attempts. Strategies
+    are tried best success rate first (ties go to the faster one, then to
+    the original cascade order; untried ones count as promising), and a
+    strategy whose last ``failure_streak`` attempts all failed is skipped
+    until ``cooldown_seconds`` have passed. The history is saved to a JSON
+    file so the ordering survives restarts.
+    """
+
+    def __init__(self, path: Optional[Path], window: int = 20, failure_streak: int = 3,
+                 cooldown_seconds: float = 900):
+        self.path = Path(path) if path else None
+        self.window = window
+        self.failure_streak = failure_streak
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        self._history: Dict[str, Deque[Attempt]] = {}
+        self._load()
+
+    def _load(self):
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            for name, attempts in data.get("strategies", {}).items():
+                self._history[name] = deque(
+                    [(float(at), bool(ok), float(seconds)) for at, ok, seconds in attempts], maxlen=self.window
+                )
+        except (OSError, ValueError, TypeError) as e:
+            print(f"Warning: ignoring unreadable download strategy history: {e}", flush=True)
+
+    def _save_locked(self):
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps({
+                "strategies": {name: list(attempts) for name, attempts in self._history.items()}
+            }), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: could not save download strategy history: {e}", flush=True)
+
+    def record(self, name: str, succeeded: bool, seconds: float):
+        with self._lock:
+            attempts = self._history.setdefault(name, deque(maxlen=self.window))
+            attempts.append((time.time(), succeeded, round(seconds, 3)))
+            self._save_locked()
+
+    def _cooling_down_locked(self, name: str, now: float) -> bool:
+        attempts = self._history.get(name)
+        if not attempts or len(attempts) < self.failure_streak:
+            return False
+        recent = list(attempts)[-self.failure_streak:]
+        return not any(ok for _, ok, _ in recent) and now - recent[-1][0] < self.cooldown_seconds
+
+    def _score_locked(self, name: str) -> Tuple[float, float]:
+        attempts = self._history.get(name) or ()
+        successes = sum(1 for _, ok, _ in attempts if ok)
+        # Laplace smoothing: an untried strategy scores 0.5 and is not starved
+        success_rate = (successes + 1) / (len(attempts) + 2)
+        latencies = [seconds for _, ok, seconds in attempts if ok]
+        return success_rate, statistics.median(latencies) if latencies else float("inf")
+
+    def order(self, names: List[str]) -> List[str]:
+        """Strategies to try, best first, without the ones cooling down"""
+        now = time.time()
+        with self._lock:
+            available = [name for name in names if not self._cooling_down_locked(name, now)]
+            if not available:
+                # Everything is failing; walking the whole cascade beats giving up
+                return list(names)
+            position = {name: i for i, name in enumerate(names)}
+            scores = {name: self._score_locked(name) for name in available}
+        return sorted(available, key=lambda name: (-scores[name][0], scores[name][1], position[name]))
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            strategies = {}
+            for name, attempts in self._history.items():
+                success_rate, median_seconds = self._score_locked(name)
+                successes = sum(1 for _, ok, _ in attempts if ok)
+                strategies[name] = {
+                    "attempts": len(attempts),
+                    "successes": successes,
+                    "success_rate": round(successes / len(attempts), 3) if attempts else None,
+                    "median_success_seconds": None if median_seconds == float("inf") else median_seconds,
+                    "last_attempt": attempts[-1][0] if attempts else None,
+                    "cooling_down": self._cooling_down_locked(name, now),
+                }
+            return {
+                "window": self.window,
+                "failure_streak": self.failure_streak,
+                "cooldown_seconds": self.cooldown_seconds,
+                "strategies": strategies,
+            }
+
+
+download_scheduler = DownloadStrategyScheduler(
+    Path(os.getenv("DOWNLOAD_STRATEGY_STATS_PATH", str(default_cache_dir("downloads") / "strategies.json"))),
+    window=int(os.getenv("DOWNLOAD_STRATEGY_WINDOW", "20")),
+    cooldown_seconds=float(os.getenv("DOWNLOAD_STRATEGY_COOLDOWN", "900")),
+)
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from disk_cache import DiskCache, default_cache_dir
+from transcript import Transcript
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+# Cached clip lists older than this are recomputed
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+
+def transcript_hash(transcript: Transcript) -> str:
+    """Content hash of a transcript, at the millisecond precision it is stored with"""
+    payload = json.dumps(transcript.to_dict(), separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def normalize_instructions(instructions: str) -> str:
+    """Instructions that differ only in case, spacing or final punctuation share a cache entry"""
+    return re.sub(r"\s+", " ", instructions).strip().rstrip(".!").strip().lower()
+
+
+class LLMCache:
+    """Persistent clip lists keyed by transcript content, instructions, model and prompt version.
+
+    Jobs with the default instructions, or the same instructions on the
+    same video, get their timestamps from disk instead of a GPT round trip.
+    """
+
+    def __init__(self, cache: DiskCache, ttl_seconds: int = LLM_CACHE_TTL_SECONDS):
+        self.cache = cache
+        self.ttl_seconds = ttl_seconds
+        self._expired = 0
+
+    @staticmethod
+    def make_key(content_hash: str, instructions: str, model: str, prompt_version: str) -> str:
+        instructions_hash = hashlib.sha256(normalize_instructions(instructions).encode("utf-8")).hexdigest()[:16]
+        return f"clips:{prompt_version}:{model}:{content_hash}:{instructions_hash}"
+
+    def get(self, key: str) -> Optional[List[Dict[str, float]]]:
+        data = self.cache.get(key)
+        if data is None:
+            return None
+        try:
+            entry = json.loads(data.decode("utf-8"))
+        except ValueError as e:
+            print(f"Warning: discarding unreadable cached clip list: {e}", flush=True)
+            return None
+        if time.time() - entry["created_at"] > self.ttl_seconds:
+            self._expired += 1
+            self.cache.delete(key)
+            return None
+        return entry["timestamps"]
+
+    def put(self, key: str, timestamps: List[Dict[str, float]]):
+        entry = {"created_at": time.time(), "timestamps": timestamps}
+        self.cache.set(key, json.dumps(entry, separators=(",", ":")).encode("utf-8"))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.cache.get_stats(), "expired": self._expired, "ttl_seconds": self.ttl_seconds}
+
+
+llm_cache = LLMCache(DiskCache(
+    os.getenv("LLM_CACHE_DIR", str(default_cache_dir("llm"))),
+    max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+))
@@ -0,0 +1,123 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set
+
+import httpx
+from openai import AsyncOpenAI
+
+# OpenAI-compatible endpoint, e.g. a local stand-in for load tests (default: api.openai.com)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+# Connections shared by every job; idle ones are kept open for reuse
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "10"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "120"))
+
+
+class LLMClient:
+    """One AsyncOpenAI client for the whole process.
+
+    All jobs share its keep-alive connection pool, so only the first
+    request pays for the TLS handshake, and requests are awaited on the
+    event loop instead of holding an executor thread each.
+    """
+
+    def __init__(self, base_url: Optional[str] = OPENAI_BASE_URL):
+        self.base_url = base_url
+        self._client: Optional[AsyncOpenAI] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        # Closes of clients left behind by earlier event loops, kept referenced until they finish
+        self._closing: Set["asyncio.Future[None]"] = set()
+        self._stats = {"requests": 0, "errors": 0, "clients_created": 0, "clients_closed": 0, "total_seconds": 0.0}
+
+    def get(self) -> AsyncOpenAI:
+        """The shared client, created on first use in the running event loop"""
+        loop = asyncio.get_event_loop()
+        with self._lock:
+            # Pooled connections belong to the loop that opened them
+            if self._client is None or self._loop is not loop:
+                if self._client is not None:
+                    self._retire(self._client, self._loop)
+                api_key = os.getenv("OPENAI_API_KEY")
+                if not api_key and self.base_url:
+                    # Local stand-ins usually accept any key
+                    api_key = "local"
+                self._client = AsyncOpenAI(
+                    api_key=api_key,
+                    base_url=self.base_url,
+                    timeout=OPENAI_TIMEOUT,
+                    max_retries=OPENAI_MAX_RETRIES,
+                    http_client=httpx.AsyncClient(
+                        limits=httpx.Limits(
+                            max_connections=OPENAI_MAX_CONNECTIONS,
+                            max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+                            keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+                        ),
+                        timeout=OPENAI_TIMEOUT,
+                    ),
+                )
+                self._loop = loop
+                self._stats["clients_created"] += 1
+            return self._client
+
+    def _retire(self, client: AsyncOpenAI, loop: Optional[asyncio.AbstractEventLoop]):
+        """Close a client made for another event loop, on that loop if it still runs"""
+        self._stats["clients_closed"] += 1
+        if loop is not None and loop.is_running() and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(client.close(), loop)
+            return
+        # Closing from here still releases the sockets, though the dead loop can no longer be told
+        future = asyncio.ensure_future(self._close_quietly(client))
+        self._closing.add(future)
+        future.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close_quietly(client: AsyncOpenAI):
+        try:
+            await client.close()
+        except RuntimeError:
+            pass
+
+    async def complete(self, messages: List[Dict[str, str]], model: str,
+                       usage: Optional[Dict[str, int]] = None, **kwargs) -> str:
+        """Content of one chat completion; the token counts the server reports are stored in ``usage``"""
+        client = self.get()
+        started = time.time()
+        try:
+            completion = await client.chat.completions.create(model=model, messages=messages, **kwargs)
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+        finally:
+            self._stats["requests"] += 1
+            self._stats["total_seconds"] += time.time() - started
+        if usage is not None and completion.usage is not None:
+            usage["prompt_tokens"] = completion.usage.prompt_tokens
+            usage["completion_tokens"] = completion.usage.completion_tokens
+        return completion.choices[0].message.content
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+            self._stats["clients_closed"] += 1
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self._stats["requests"]
+        return {
+            **self._stats,
+            "total_seconds": round(self._stats["total_seconds"], 2),
+            "mean_seconds": round(self._stats["total_seconds"] / requests, 3) if requests else None,
+            "base_url": self.base_url or "https://api.openai.com/v1",
+            "max_connections": OPENAI_MAX_CONNECTIONS,
+            "max_keepalive_connections": OPENAI_MAX_KEEPALIVE,
+        }
+
+
+llm_client = LLMClient()
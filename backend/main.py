@@ -1,14 +1,26 @@
 import os
 import json
 import uuid
-from typing import List, Dict, Any
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, UploadFile, File, Form, Response
+from typing import List, Dict, Any, Optional
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, UploadFile, File, Form, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from pathlib import Path
 import asyncio
 from video_processor import VideoProcessor
+from model_registry import model_registry, preload_model_names
+from transcription_pool import transcription_pool
+from transcription_engines import ENGINES, get_engine
+from transcript_cache import transcript_cache
+from llm_cache import llm_cache
+from llm_client import llm_client
+from download_strategies import download_scheduler
+from source_cache import source_cache
+from bandwidth import bandwidth_scheduler
+from sources import HttpSource, UploadSource, VideoSource, YouTubeSource
+from uploads import UPLOAD_CHUNK_SIZE, upload_manager
+from admission import admit, lane_scheduler, probe_cache
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -59,6 +71,27 @@ manager = ConnectionManager()
 # In-memory storage for jobs (in production, use a database)
 jobs: Dict[str, Dict[str, Any]] = {}
 
+@app.on_event("startup")
+async def warmup_models():
+    """Preload transcription models so the first job does not pay for loading them"""
+    if os.getenv("WHISPER_WARMUP", "true").lower() != "true":
+        return
+    if transcription_pool.enabled:
+        # Models live in the worker processes, not in the API process
+        transcription_pool.start()
+    else:
+        # Load in the background so health checks answer while weights are read
+        loop = asyncio.get_event_loop()
+        loop.run_in_executor(None, lambda: [get_engine(None, name).warmup() for name in preload_model_names()])
+
+@app.on_event("shutdown")
+async def shutdown_transcription_pool():
+    transcription_pool.shutdown()
+
+@app.on_event("shutdown")
+async def close_llm_client():
+    await llm_client.aclose()
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint for Docker"""
@@ -112,6 +145,54 @@ async def test_storage():
             "error": str(e)
         }
 
+@app.get("/api/stats/models")
+async def model_stats():
+    """Transcription model registry load/hit statistics"""
+    if transcription_pool.enabled:
+        # Models are loaded in the worker processes, not in the API process
+        return transcription_pool.registry_stats()
+    return model_registry.get_stats()
+
+@app.get("/api/stats/transcription")
+async def transcription_stats():
+    """Transcription worker pool queue depth and timing"""
+    return transcription_pool.get_stats()
+
+@app.get("/api/stats/download-strategies")
+async def download_strategy_stats():
+    """Rolling success rate and latency of each YouTube download strategy"""
+    return download_scheduler.get_stats()
+
+@app.get("/api/stats/source-cache")
+async def source_cache_stats():
+    """Shared source video cache hit/miss/coalesced counters and size"""
+    return source_cache.get_stats()
+
+@app.get("/api/stats/bandwidth")
+async def bandwidth_stats():
+    """Download bandwidth budget, throttling and per-job throughput"""
+    return bandwidth_scheduler.get_stats()
+
+@app.get("/api/stats/admission")
+async def admission_stats():
+    """Job lanes and metadata probe cache"""
+    return {"lanes": lane_scheduler.get_stats(), "probe_cache": probe_cache.get_stats()}
+
+@app.get("/api/stats/transcript-cache")
+async def transcript_cache_stats():
+    """Persistent transcript cache hit/miss counters and size"""
+    return transcript_cache.get_stats()
+
+@app.get("/api/stats/llm-cache")
+async def llm_cache_stats():
+    """Clip list cache hit/miss, expiry and size statistics"""
+    return llm_cache.get_stats()
+
+@app.get("/api/stats/openai")
+async def openai_stats():
+    """Shared OpenAI client request counts, latency and pool limits"""
+    return llm_client.get_stats()
+
 @app.websocket("/ws/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, user_id: str):
     await manager.connect(websocket, user_id)
@@ -122,19 +203,97 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
     except WebSocketDisconnect:
         manager.disconnect(user_id)
 
+def upload_http_error(e: Exception) -> HTTPException:
+    """Map UploadManager errors to HTTP responses"""
+    if isinstance(e, KeyError):
+        return HTTPException(status_code=404, detail="Upload not found")
+    if isinstance(e, PermissionError):
+        return HTTPException(status_code=403, detail="Access denied")
+    return HTTPException(status_code=400, detail=str(e))
+
+@app.post("/api/uploads")
+async def create_upload(
+    user_id: str = Form(...),
+    filename: str = Form(...),
+    size: int = Form(...)
+):
+    """Start a resumable upload; send its chunks with PUT /api/uploads/{upload_id}/chunks/{index}"""
+    try:
+        return upload_manager.create(user_id, filename, size)
+    except ValueError as e:
+        raise upload_http_error(e)
+
+@app.put("/api/uploads/{upload_id}/chunks/{index}")
+async def upload_chunk(upload_id: str, index: int, user_id: str, request: Request):
+    """Receive one chunk as the raw request body; re-sending a chunk overwrites it"""
+    try:
+        return await upload_manager.write_chunk(upload_id, user_id, index, request.stream())
+    except (KeyError, PermissionError, ValueError) as e:
+        raise upload_http_error(e)
+
+@app.get("/api/uploads/{upload_id}")
+async def get_upload(upload_id: str, user_id: str):
+    """Upload status, including the chunks still missing"""
+    try:
+        return upload_manager.status(upload_id, user_id)
+    except (KeyError, PermissionError) as e:
+        raise upload_http_error(e)
+
+async def read_upload_file(file: UploadFile):
+    """Yield a multipart file in fixed-size pieces"""
+    while True:
+        piece = await file.read(UPLOAD_CHUNK_SIZE)
+        if not piece:
+            break
+        yield piece
+
 @app.post("/api/jobs")
 async def create_job(
-    youtube_url: str = Form(...),
+    user_id: str = Form(...),
+    youtube_url: Optional[str] = Form(None),
+    video_url: Optional[str] = Form(None),
+    upload_id: Optional[str] = Form(None),
+    file: Optional[UploadFile] = File(None),
     instructions: str = Form(""),
-    user_id: str = Form(...)
+    use_captions: Optional[bool] = Form(None),
+    engine: Optional[str] = Form(None),
+    use_llm_cache: bool = Form(True)
 ):
-    """Create a new video processing job"""
+    """Create a new video processing job from a YouTube URL, a direct video URL or an upload"""
+    if engine and engine not in ENGINES:
+        raise HTTPException(status_code=400, detail=f"Unknown transcription engine: {engine}")
+    if sum(1 for given in (youtube_url, video_url, upload_id, file) if given) != 1:
+        raise HTTPException(status_code=400, detail="Provide exactly one of youtube_url, video_url, upload_id or file")
+    
+    source: VideoSource
+    try:
+        if youtube_url:
+            source = YouTubeSource(youtube_url)
+        elif video_url:
+            source = HttpSource(video_url)
+        else:
+            if file:
+                # Streamed to disk piece by piece, like a single-request resumable upload
+                upload = await upload_manager.receive(user_id, file.filename, read_upload_file(file))
+                upload_id = upload["upload_id"]
+            upload = upload_manager.status(upload_id, user_id)
+            source = UploadSource(upload_manager.completed_path(upload_id, user_id), upload["filename"], move=True)
+    except (KeyError, PermissionError, ValueError) as e:
+        raise upload_http_error(e)
+    
+    # Pre-flight metadata probe: refuse, truncate or deprioritize long and live videos before downloading
+    admission = await admit(youtube_url) if youtube_url else None
+    if admission and admission["action"] == "reject":
+        raise HTTPException(status_code=400, detail=admission["reason"])
+    
     job_id = str(uuid.uuid4())
     
     # Initialize job
     jobs[job_id] = {
         "id": job_id,
         "youtube_url": youtube_url,
+        # Direct URLs and uploads have no youtube_url; the title names them in job lists
+        "title": source.title,
         "instructions": instructions,
         "user_id": user_id,
         "status": "processing",
@@ -142,35 +301,66 @@ async def create_job(
         "created_at": asyncio.get_event_loop().time(),
         "video_path": None,
         "clips": [],
-        "transcript": ""
+        "transcript": "",
+        "source": source.describe(),
+        "admission": {key: value for key, value in admission.items() if key != "info"} if admission else None
     }
     
     # Start processing in background
-    asyncio.create_task(process_video_job(job_id, youtube_url, instructions, user_id))
+    asyncio.create_task(process_video_job(job_id, source, instructions, user_id, use_captions, engine, upload_id, admission,
+                                        use_llm_cache))
     
     return {"job_id": job_id, "status": "processing"}
 
-async def process_video_job(job_id: str, youtube_url: str, instructions: str, user_id: str):
+async def process_video_job(job_id: str, source: VideoSource, instructions: str, user_id: str,
+                            use_captions: Optional[bool] = None, engine: Optional[str] = None,
+                            upload_id: Optional[str] = None, admission: Optional[Dict[str, Any]] = None,
+                            use_llm_cache: bool = True):
     """Process video in background"""
     try:
-        processor = VideoProcessor(job_id)
+        processor = VideoProcessor(job_id, engine_name=engine)
         
-        def progress_callback(progress: int, step: str):
+        def progress_callback(progress: int, step: str, download: Optional[Dict[str, Any]] = None):
             jobs[job_id]["progress"] = progress
+            message = {
+                "type": "progress",
+                "job_id": job_id,
+                "progress": progress,
+                "step": step
+            }
+            if download is not None:
+                # Byte counts, speed and ETA while the source downloads
+                jobs[job_id]["download"] = download
+                message["download"] = download
+            asyncio.create_task(
+                manager.send_personal_message(json.dumps(message), user_id)
+            )
+        
+        def segment_callback(segments, position: float, duration: float):
             asyncio.create_task(
                 manager.send_personal_message(
                     json.dumps({
-                        "type": "progress",
+                        "type": "transcript_segment",
                         "job_id": job_id,
-                        "progress": progress,
-                        "step": step
+                        "segments": [
+                            {"text": text, "start": start, "end": end} for text, start, end in segments
+                        ],
+                        "position": position,
+                        "duration": duration
                     }),
                     user_id
                 )
             )
         
-        # Process the video
-        result = await processor.process_video(youtube_url, instructions, progress_callback)
+        # Process the video once its lane has room; cheaper queued jobs go first
+        admission = admission or {"lane": "normal", "cost": {}, "max_duration": None, "info": None}
+        if admission["lane"] != "normal":
+            progress_callback(0, f"Queued in the {admission['lane']}-priority lane...")
+        async with lane_scheduler.slot(admission["lane"], admission["cost"].get("processing_seconds") or 0):
+            result = await processor.process_video(
+                source, instructions, progress_callback, use_captions, segment_callback,
+                max_duration=admission["max_duration"], video_info=admission["info"], use_llm_cache=use_llm_cache
+            )
         
         # Update job with results
         jobs[job_id].update({
@@ -178,8 +368,10 @@ async def process_video_job(job_id: str, youtube_url: str, instructions: str, us
             "progress": 100,
             "video_path": result["video_path"],
             "clips": result["clips"],
-            "transcript": result["transcript"],
-            "video_data": result.get("video_data")  # Store video data for Railway
+            "transcript": result["transcript"].to_dict(),
+            "source": result.get("source"),
+            "video_data": result.get("video_data"),  # Store video data for Railway
+            "metrics": result.get("metrics", {})
         })
         
         # Send completion message
@@ -209,6 +401,10 @@ async def process_video_job(job_id: str, youtube_url: str, instructions: str, us
             }),
             user_id
         )
+    finally:
+        if upload_id:
+            # The job took the uploaded file; drop the rest of the upload's state
+            upload_manager.discard(upload_id)
 
 @app.get("/api/jobs")
 async def get_jobs(user_id: str):
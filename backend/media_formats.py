@@ -0,0 +1,104 @@
+import json
+import os
+import re
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Rewrite format selectors to try H.264/AAC streams first, which go into mp4 without re-encoding
+PREFER_REMUX = os.getenv("FORMAT_PREFER_REMUX", "true").lower() == "true"
+
+# Codecs that can be stream-copied into an mp4 container
+MP4_VIDEO_CODECS = {"h264", "hevc", "mpeg4", "av1"}
+MP4_AUDIO_CODECS = {"aac", "mp3", "ac3", "eac3"}
+
+_SIMPLE_SELECTOR = re.compile(r"^(best|worst)((?:\[[^\]]+\])*)$")
+
+
+def prefer_remuxable(selector: str) -> str:
+    """Expand a yt-dlp format selector so mp4-compatible streams are tried first
+
+    Each ``best[...]``/``worst[...]`` alternative becomes: the same choice
+    restricted to H.264/AAC single files, then an H.264 video + AAC audio
+    pair (merged by stream copy), then the original choice. Anything more
+    elaborate is kept as is.
+    """
+    alternatives = []
+    for alternative in selector.split("/"):
+        match = _SIMPLE_SELECTOR.match(alternative.strip())
+        if match:
+            kind, filters = match.groups()
+            prefix = kind[0]
+            alternatives += [
+                f"{kind}{filters}[vcodec^=avc1][acodec^=mp4a]",
+                f"{prefix}v*{filters}[vcodec^=avc1]+{prefix}a[acodec^=mp4a]",
+            ]
+        alternatives.append(alternative)
+    return "/".join(dict.fromkeys(alternatives))
+
+
+def probe_streams(path: str) -> Dict[str, Optional[str]]:
+    """Container and first video/audio codec names of a media file, via ffprobe"""
+    result = subprocess.run([
+        "ffprobe", "-v", "error", "-show_entries", "format=format_name:stream=codec_type,codec_name",
+        "-of", "json", str(path)
+    ], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe failed: {result.stderr[-300:]}")
+    data = json.loads(result.stdout or "{}")
+    probe: Dict[str, Optional[str]] = {
+        "container": (data.get("format") or {}).get("format_name"),
+        "video_codec": None,
+        "audio_codec": None,
+    }
+    for stream in data.get("streams") or []:
+        key = f"{stream.get('codec_type')}_codec"
+        if key in probe and probe[key] is None:
+            probe[key] = stream.get("codec_name")
+    return probe
+
+
+def plan_conversion(probe: Dict[str, Optional[str]]) -> Dict[str, Any]:
+    """Decide how to turn a probed file into mp4: nothing, a remux, or a (partial) transcode"""
+    copy_video = probe["video_codec"] is None or probe["video_codec"] in MP4_VIDEO_CODECS
+    copy_audio = probe["audio_codec"] is None or probe["audio_codec"] in MP4_AUDIO_CODECS
+    in_mp4 = "mp4" in (probe["container"] or "").split(",")
+    if copy_video and copy_audio:
+        action = "none" if in_mp4 else "remux"
+    else:
+        action = "transcode"
+    return {"action": action, "copy_video": copy_video, "copy_audio": copy_audio}
+
+
+def normalize_to_mp4(path: str) -> Dict[str, Any]:
+    """Make ``path`` an mp4 in place, re-encoding only streams mp4 cannot carry
+
+    Returns what was done (``none``, ``remux`` or ``transcode``), which
+    streams were re-encoded and how long it took.
+    """
+    started = time.time()
+    probe = probe_streams(path)
+    plan = plan_conversion(probe)
+    report: Dict[str, Any] = {**probe, "action": plan["action"], "transcoded_streams": []}
+    if plan["action"] != "none":
+        if not plan["copy_video"]:
+            report["transcoded_streams"].append("video")
+        if not plan["copy_audio"]:
+            report["transcoded_streams"].append("audio")
+        tmp_path = Path(path).with_name(f".{Path(path).stem}.normalized.mp4")
+        cmd = [
+            "ffmpeg", "-nostdin", "-y", "-i", str(path), "-map", "0:v:0?", "-map", "0:a:0?",
+            "-c:v", "copy" if plan["copy_video"] else "libx264",
+            "-c:a", "copy" if plan["copy_audio"] else "aac",
+        ]
+        if not plan["copy_video"]:
+            cmd += ["-preset", "veryfast", "-crf", "23"]
+        cmd += ["-movflags", "+faststart", str(tmp_path)]
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            tmp_path.unlink(missing_ok=True)
+            raise RuntimeError(f"ffmpeg {plan['action']} failed: {result.stderr.decode(errors='ignore')[-500:]}")
+        os.replace(tmp_path, path)
+    report["seconds"] = round(time.time() - started, 2)
+    return report
@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+def _load_whisper_model(name: str) -> Any:
+    """Default loader: build an openai-whisper model by name"""
+    import whisper
+    return whisper.load_model(name)
+
+
+class ModelRegistry:
+    """Process-wide cache of loaded transcription models.
+
+    Models are keyed by name and loaded at most once per process. Callers
+    hold a reference while a model is in use; when more than ``max_models``
+    are resident, the least recently used model with no active references
+    is evicted.
+    """
+
+    def __init__(self, max_models: int = 1, loader: Callable[[str], Any] = _load_whisper_model):
+        self.max_models = max(1, max_models)
+        self.loader = loader
+        self._models: "OrderedDict[str, Any]" = OrderedDict()
+        self._refcounts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        # One lock per model name so two threads asking for the same model
+        # wait for a single load instead of both reading the weights
+        self._load_locks: Dict[str, threading.Lock] = {}
+        # openai-whisper installs kv-cache hooks on the decoder while decoding,
+        # so one model instance can only serve one transcription at a time
+        self._use_locks: Dict[str, threading.Lock] = {}
+        self._stats = {
+            "loads": 0,
+            "hits": 0,
+            "evictions": 0,
+            "load_seconds": 0.0,
+        }
+
+    def _named_lock(self, locks: Dict[str, threading.Lock], name: str) -> threading.Lock:
+        with self._lock:
+            if name not in locks:
+                locks[name] = threading.Lock()
+            return locks[name]
+
+    def get(self, name: str, loader: Optional[Callable[[str], Any]] = None) -> Any:
+        """Return the model for ``name``, loading it on first use, and take a reference"""
+        with self._lock:
+            if name in self._models:
+                self._models.move_to_end(name)
+                self._refcounts[name] = self._refcounts.get(name, 0) + 1
+                self._stats["hits"] += 1
+                return self._models[name]
+
+        with self._named_lock(self._load_locks, name):
+            # Another thread may have finished loading while we waited
+            with self._lock:
+                if name in self._models:
+                    self._models.move_to_end(name)
+                    self._refcounts[name] = self._refcounts.get(name, 0) + 1
+                    self._stats["hits"] += 1
+                    return self._models[name]
+
+            print(f"Loading transcription model '{name}'...", flush=True)
+            start_time = time.time()
+            model = (loader or self.loader)(name)
+            elapsed = time.time() - start_time
+            print(f"Model '{name}' loaded in {elapsed:.2f}s", flush=True)
+
+            with self._lock:
+                self._models[name] = model
+                self._refcounts[name] = self._refcounts.get(name, 0) + 1
+                self._stats["loads"] += 1
+                self._stats["load_seconds"] += elapsed
+                self._evict_locked()
+            return model
+
+    def release(self, name: str):
+        """Drop a reference taken by ``get``"""
+        with self._lock:
+            if self._refcounts.get(name, 0) > 0:
+                self._refcounts[name] -= 1
+            self._evict_locked()
+
+    @contextmanager
+    def acquire(self, name: str, loader: Optional[Callable[[str], Any]] = None) -> Iterator[Any]:
+        """Context manager around ``get``/``release`` holding the model exclusively"""
+        model = self.get(name, loader)
+        try:
+            with self._named_lock(self._use_locks, name):
+                yield model
+        finally:
+            self.release(name)
+
+    def _evict_locked(self):
+        """Evict idle models beyond the configured limit, least recently used first"""
+        if len(self._models) <= self.max_models:
+            return
+        for name in list(self._models.keys()):
+            if len(self._models) <= self.max_models:
+                break
+            if self._refcounts.get(name, 0) == 0:
+                del self._models[name]
+                self._refcounts.pop(name, None)
+                self._stats["evictions"] += 1
+                print(f"Evicted transcription model '{name}'", flush=True)
+
+    def warmup(self, names: List[str], loader: Optional[Callable[[str], Any]] = None):
+        """Load the given models ahead of the first job"""
+        for name in names:
+            try:
+                self.get(name, loader)
+                self.release(name)
+            except Exception as e:
+                print(f"Warning: could not preload model '{name}': {e}", flush=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return load/hit counters and the currently resident models"""
+        with self._lock:
+            requests = self._stats["loads"] + self._stats["hits"]
+            return {
+                **self._stats,
+                "hit_rate": self._stats["hits"] / requests if requests else 0.0,
+                "max_models": self.max_models,
+                "resident": list(self._models.keys()),
+                "in_use": {name: count for name, count in self._refcounts.items() if count > 0},
+            }
+
+
+DEFAULT_MODEL = os.getenv("WHISPER_MODEL", "base")
+
+
+def preload_model_names() -> List[str]:
+    """Models to load at startup (WHISPER_PRELOAD_MODELS, defaults to WHISPER_MODEL)"""
+    names = os.getenv("WHISPER_PRELOAD_MODELS", DEFAULT_MODEL)
+    return [name.strip() for name in names.split(",") if name.strip()]
+
+
+model_registry = ModelRegistry(max_models=int(os.getenv("WHISPER_MAX_MODELS", "1")))
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# (progress percent, step message, download details)
+ProgressCallback = Callable[[int, str, Optional[Dict[str, Any]]], None]
+
+
+class ProgressBridge:
+    """Carries yt-dlp download progress from download threads to the event loop.
+
+    ``hook`` is a yt-dlp progress hook. It aggregates bytes across the files
+    of one download (e.g. separate video and audio streams), maps the
+    fraction done onto ``[start, end]`` percent, and posts at most one
+    update per ``interval`` seconds to ``callback`` on ``loop``. The percent
+    never goes backwards, even when a second file's size becomes known.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, callback: ProgressCallback,
+                 start: int, end: int, step: str, interval: float = 0.5):
+        self.loop = loop
+        self.callback = callback
+        self.start = start
+        self.end = end
+        self.step = step
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._files: Dict[str, Dict[str, float]] = {}
+        self._last_sent = 0.0
+        self._progress = start
+
+    def hook(self, d: Dict[str, Any]):
+        status = d.get("status")
+        if status not in ("downloading", "finished"):
+            return
+        filename = d.get("filename") or ""
+        with self._lock:
+            entry = self._files.setdefault(filename, {"downloaded": 0, "total": 0, "speed": 0.0})
+            entry["downloaded"] = d.get("downloaded_bytes") or entry["downloaded"]
+            entry["total"] = d.get("total_bytes") or d.get("total_bytes_estimate") or entry["total"]
+            if status == "finished":
+                entry["total"] = entry["total"] or entry["downloaded"]
+                entry["speed"] = 0.0
+            else:
+                entry["speed"] = d.get("speed") or 0.0
+
+            now = time.time()
+            if status != "finished" and now - self._last_sent < self.interval:
+                return
+            self._last_sent = now
+            details = self._details_locked(d.get("eta"))
+
+        self.loop.call_soon_threadsafe(self.callback, details["progress"], self._message(details), details)
+
+    def _details_locked(self, eta: Optional[float]) -> Dict[str, Any]:
+        downloaded = sum(entry["downloaded"] for entry in self._files.values())
+        total = sum(entry["total"] for entry in self._files.values())
+        speed = sum(entry["speed"] for entry in self._files.values())
+        if total:
+            fraction = min(downloaded / total, 1.0)
+            self._progress = max(self._progress, self.start + int((self.end - self.start) * fraction))
+        if eta is None and total and speed:
+            eta = max(0.0, (total - downloaded) / speed)
+        return {
+            "progress": self._progress,
+            "downloaded_bytes": int(downloaded),
+            "total_bytes": int(total) or None,
+            "speed": round(speed) or None,
+            "eta": round(eta) if eta is not None else None,
+        }
+
+    def _message(self, details: Dict[str, Any]) -> str:
+        text = f"{self.step} {details['downloaded_bytes'] / 1e6:.1f} MB"
+        if details["total_bytes"]:
+            text += f" of {details['total_bytes'] / 1e6:.1f} MB"
+        if details["speed"]:
+            text += f" at {details['speed'] / 1e6:.1f} MB/s"
+        if details["eta"] is not None:
+            text += f", {details['eta']}s left"
+        return text
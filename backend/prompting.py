@@ -0,0 +1,119 @@
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from transcript import Transcript
+
+# Estimated tokens the transcript may take up in the clip-identification prompt
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "6000"))
+# Consecutive segments are merged into lines of up to this many seconds
+PROMPT_LINE_SECONDS = float(os.getenv("PROMPT_LINE_SECONDS", "10"))
+# Over budget, lines are merged further up to this length before their text is trimmed
+PROMPT_MAX_LINE_SECONDS = float(os.getenv("PROMPT_MAX_LINE_SECONDS", "60"))
+
+# Without tiktoken: digit groups of up to three, words and single punctuation marks,
+# which is how cl100k splits ordinary English text
+_TOKEN_PATTERN = re.compile(r"\d{1,3}|[^\W\d_]+|[^\w\s]")
+_encoder: Any = False
+
+Line = Tuple[float, str]
+
+
+def _get_encoder() -> Optional[Any]:
+    global _encoder
+    if _encoder is False:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # Not installed, or its vocabulary cannot be downloaded
+            _encoder = None
+    return _encoder
+
+
+def estimate_tokens(text: str) -> int:
+    """Prompt tokens for ``text``: exact when tiktoken is installed, a close estimate otherwise"""
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text))
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def merge_lines(transcript: Transcript, line_seconds: float, max_gap: float = 2.0) -> Tuple[List[Line], float]:
+    """Join consecutive segments into ``(start, text)`` lines of at most ``line_seconds``
+
+    A pause longer than ``max_gap`` always starts a new line, so lines
+    keep to natural breaks. Also returns the end time of the last segment.
+    """
+    lines: List[Line] = []
+    texts: List[str] = []
+    line_start = last_end = 0.0
+    for text, start, end in transcript:
+        text = text.strip()
+        if not text:
+            continue
+        if texts and (end - line_start > line_seconds or start - last_end > max_gap):
+            lines.append((line_start, " ".join(texts)))
+            texts = []
+        if not texts:
+            line_start = start
+        texts.append(text)
+        last_end = end
+    if texts:
+        lines.append((line_start, " ".join(texts)))
+    return lines, last_end
+
+
+def format_lines(lines: List[Line], end: float, max_words: Optional[int] = None) -> str:
+    """``[12.4] text`` lines, each lasting until the next; a final ``[end] (end)`` line closes the last one"""
+    rows = []
+    for start, text in lines:
+        if max_words is not None:
+            words = text.split()
+            text = " ".join(words[:max_words]) + (" ..." if len(words) > max_words else "")
+        rows.append(f"[{start:.1f}] {text}")
+    rows.append(f"[{end:.1f}] (end)")
+    return "\n".join(rows)
+
+
+def build_transcript_block(transcript: Transcript, budget: int = PROMPT_TOKEN_BUDGET,
+                           line_seconds: float = PROMPT_LINE_SECONDS,
+                           max_line_seconds: float = PROMPT_MAX_LINE_SECONDS) -> Tuple[str, Dict[str, Any]]:
+    """Encode a transcript for the prompt within ``budget`` estimated tokens
+
+    Over budget, lines are merged into longer spans first; if that is not
+    enough, every line is kept (so the whole timeline stays addressable)
+    but only the first words of each are sent.
+    """
+    seconds = line_seconds
+    while True:
+        lines, end = merge_lines(transcript, seconds)
+        text = format_lines(lines, end)
+        tokens = estimate_tokens(text)
+        if tokens <= budget or seconds >= max_line_seconds:
+            break
+        seconds = min(seconds * 2, max_line_seconds)
+
+    max_words = None
+    if tokens > budget:
+        # Largest per-line word count that fits
+        lo, hi = 1, max((len(line.split()) for _, line in lines), default=1)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if estimate_tokens(format_lines(lines, end, mid)) <= budget:
+                lo = mid
+            else:
+                hi = mid - 1
+        max_words = lo
+        text = format_lines(lines, end, max_words)
+        tokens = estimate_tokens(text)
+
+    report = {
+        "segments": len(transcript),
+        "lines": len(lines),
+        "line_seconds": seconds,
+        "words_per_line": max_words,
+        "tokens": tokens,
+        "budget": budget,
+    }
+    return text, report
@@ -0,0 +1,119 @@
+import copy
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yt_dlp
+from yt_dlp.utils import download_range_func
+
+# "full" downloads the whole video up front; "two_phase" fetches audio for analysis,
+# then only the sections around the chosen clips
+FETCH_MODE = os.getenv("FETCH_MODE", "full").lower()
+# Sections are stream-copied, so they are widened by this much on each side to leave room
+# for keyframe-aligned starts and word-snapped cuts; the render trims them precisely
+KEYFRAME_PAD_SECONDS = float(os.getenv("FETCH_KEYFRAME_PAD", "3"))
+AUDIO_FORMAT = "worstaudio/worst"
+SECTION_FORMAT = os.getenv("FETCH_SECTION_FORMAT", "best[height<=720]/best")
+
+
+def plan_sections(intervals: List[Dict[str, float]], duration: Optional[float] = None,
+                  pad_seconds: float = KEYFRAME_PAD_SECONDS) -> List[Tuple[float, float]]:
+    """Padded, merged ``(start, end)`` time ranges covering every clip"""
+    padded = []
+    for interval in intervals:
+        start = max(0.0, interval['start'] - pad_seconds)
+        end = interval['end'] + pad_seconds
+        if duration:
+            end = min(end, duration)
+        if end > start:
+            padded.append((start, end))
+    padded.sort()
+
+    sections: List[Tuple[float, float]] = []
+    for start, end in padded:
+        if sections and start <= sections[-1][1]:
+            sections[-1] = (sections[-1][0], max(sections[-1][1], end))
+        else:
+            sections.append((start, end))
+    return [(round(start, 3), round(end, 3)) for start, end in sections]
+
+
+def locate_section(sections: List[Dict[str, Any]], start: float, end: float) -> Optional[Dict[str, Any]]:
+    """The downloaded section containing ``[start, end]``"""
+    for section in sections:
+        if section["start"] <= start and end <= section["end"]:
+            return section
+    return None
+
+
+def _downloaded_paths(result: Dict[str, Any]) -> List[str]:
+    return [download["filepath"] for download in result.get("requested_downloads") or [] if download.get("filepath")]
+
+
+def fetch_audio(info: Dict[str, Any], out_dir: Path, base_opts: Optional[Dict[str, Any]] = None,
+                max_seconds: Optional[float] = None) -> str:
+    """Download only the lowest-bitrate audio stream, or just its first ``max_seconds``; returns its path"""
+    opts = {
+        **(base_opts or {}),
+        'format': AUDIO_FORMAT,
+        'outtmpl': str(Path(out_dir) / "source_audio.%(ext)s"),
+    }
+    if max_seconds:
+        opts['download_ranges'] = download_range_func(None, [(0.0, max_seconds)])
+        opts['force_keyframes_at_cuts'] = False
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        result = ydl.process_ie_result(copy.deepcopy(info), download=True)
+    paths = _downloaded_paths(result)
+    if not paths or not os.path.exists(paths[0]):
+        raise RuntimeError("Audio download produced no file")
+    return paths[0]
+
+
+def audio_stream_url(info: Dict[str, Any]) -> Tuple[str, Dict[str, str], float]:
+    """URL, request headers and bytes per second of the audio stream ``fetch_audio`` would download, for reading it directly
+
+    The byte rate is 0 when the format advertises neither a bitrate nor a size.
+    """
+    with yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True, 'format': AUDIO_FORMAT}) as ydl:
+        selected = ydl.process_ie_result(copy.deepcopy(info), download=False)
+    fmt = (selected.get("requested_formats") or [selected])[-1]
+    # ffmpeg reads plain HTTP and HLS itself; DASH fragment lists need yt-dlp's downloader
+    if not fmt.get("url") or fmt.get("protocol", "https") not in ("http", "https", "m3u8", "m3u8_native"):
+        raise RuntimeError(f"Audio format {fmt.get('format_id')} cannot be streamed ({fmt.get('protocol')})")
+    kbps = fmt.get("abr") or fmt.get("tbr")
+    size = fmt.get("filesize") or fmt.get("filesize_approx")
+    if kbps:
+        byte_rate = kbps * 125.0
+    elif size and info.get("duration"):
+        byte_rate = size / info["duration"]
+    else:
+        byte_rate = 0.0
+    return fmt["url"], fmt.get("http_headers") or {}, byte_rate
+
+
+def fetch_sections(info: Dict[str, Any], sections: List[Tuple[float, float]], out_dir: Path,
+                   base_opts: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Download just the given time ranges of the video, one file per range"""
+    opts = {
+        **(base_opts or {}),
+        'format': SECTION_FORMAT,
+        'outtmpl': str(Path(out_dir) / "section_%(section_start)s.%(ext)s"),
+        'download_ranges': download_range_func(None, sections),
+        'force_keyframes_at_cuts': False,
+    }
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        result = ydl.process_ie_result(copy.deepcopy(info), download=True)
+
+    downloaded = []
+    for download in result.get("requested_downloads") or []:
+        path = download.get("filepath")
+        if path and os.path.exists(path):
+            downloaded.append({
+                "start": float(download.get("section_start") or 0.0),
+                "end": float(download.get("section_end") or 0.0),
+                "path": path,
+                "bytes": os.path.getsize(path),
+            })
+    if len(downloaded) < len(sections):
+        raise RuntimeError(f"Only {len(downloaded)} of {len(sections)} sections were downloaded")
+    return sorted(downloaded, key=lambda section: section["start"])
@@ -0,0 +1,172 @@
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from transcript import Transcript
+
+RETRIEVAL_ENABLED = os.getenv("RETRIEVAL_ENABLED", "true").lower() == "true"
+# Transcript windows the index ranks, in seconds
+RETRIEVAL_WINDOW_SECONDS = float(os.getenv("RETRIEVAL_WINDOW_SECONDS", "30"))
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "6"))
+# Windows kept on each side of a match, for context
+RETRIEVAL_NEIGHBORS = int(os.getenv("RETRIEVAL_NEIGHBORS", "1"))
+# Targeted requests still get the whole transcript when the matches would cover more than this share of it
+RETRIEVAL_MAX_SHARE = float(os.getenv("RETRIEVAL_MAX_SHARE", "0.6"))
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD = re.compile(r"[a-z0-9]+")
+STOPWORDS = set("""
+a about all an and any are as at be been but by can could did do does for from had has have he her his how i if
+in into is it its just me my no not of on only or our out over she so some than that the their them then there
+these they this those to up us was we were what when where which while who why will with would you your
+""".split())
+# Words that frame a request rather than say what it is about
+REQUEST_WORDS = set("""
+return give show find get want need clip clips part parts section sections portion segment segments bit bits
+video talk talks talking said say says saying mention mentions mentioned discuss discusses discussed
+strictly exactly just please moment moments time times where
+""".split())
+# Requests made only of these (and request words) ask for a selection from the whole video
+BROAD_WORDS = set("""
+highlight highlights best top most engaging important interesting funny funniest exciting key main
+memorable viral good great summary summarize recap overview everything whole entire
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return [word for word in _WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+def query_terms(instructions: str) -> List[str]:
+    """Topic words of a request; empty for broad requests such as highlights"""
+    terms = []
+    for word in tokenize(instructions):
+        if word in REQUEST_WORDS or word in BROAD_WORDS:
+            continue
+        if word.isdigit() and len(word) <= 2:
+            # "return #3" refers to a list, not to a topic
+            continue
+        terms.append(word)
+    return terms
+
+
+class WindowIndex:
+    """BM25 index over fixed-length time windows of one transcript"""
+
+    def __init__(self, transcript: Transcript, window_seconds: float = RETRIEVAL_WINDOW_SECONDS):
+        self.transcript = transcript
+        # Segment index ranges [lo, hi) of each window
+        self.windows: List[Tuple[int, int]] = []
+        counts: List[Counter] = []
+        lo = 0
+        for i in range(len(transcript)):
+            if i > lo and transcript.ends[i] - transcript.starts[lo] > window_seconds:
+                self.windows.append((lo, i))
+                lo = i
+        if len(transcript):
+            self.windows.append((lo, len(transcript)))
+        for lo, hi in self.windows:
+            # Segment texts are contiguous in the transcript's text buffer
+            counts.append(Counter(tokenize(transcript.text[transcript.offsets[lo]:transcript.offsets[hi]])))
+        self.counts = counts
+        self.lengths = np.array([sum(c.values()) for c in counts], dtype=np.float64)
+        self.avg_length = float(self.lengths.mean()) if len(counts) else 0.0
+        self.document_frequency: Counter = Counter()
+        for c in counts:
+            self.document_frequency.update(c.keys())
+
+    def expand(self, term: str) -> List[str]:
+        """Vocabulary words a query term stands for: itself, its singular, and words it abbreviates (gov -> government)"""
+        stem = term[:-1] if len(term) > 3 and term.endswith("s") else term
+        if len(stem) < 3:
+            return [stem] if stem in self.document_frequency else []
+        return [word for word in self.document_frequency if word.startswith(stem)]
+
+    def scores(self, terms: List[str]) -> np.ndarray:
+        n = len(self.windows)
+        scores = np.zeros(n)
+        if not n:
+            return scores
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths / max(self.avg_length, 1e-9))
+        for term in terms:
+            words = self.expand(term)
+            if not words:
+                continue
+            # Every expansion counts as an occurrence of the query term
+            tf = np.array([sum(c.get(word, 0) for word in words) for c in self.counts], dtype=np.float64)
+            df = int(np.count_nonzero(tf))
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            scores += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores
+
+
+def select_windows(scores: np.ndarray, top_k: int, neighbors: int) -> List[int]:
+    """Top-k matching windows plus their neighbours, in timeline order"""
+    ranked = [int(i) for i in np.argsort(-scores, kind="stable")[:top_k] if scores[i] > 0]
+    selected = set()
+    for i in ranked:
+        selected.update(range(max(0, i - neighbors), min(len(scores), i + neighbors + 1)))
+    return sorted(selected)
+
+
+def filter_transcript(transcript: Transcript, instructions: str, window_seconds: float = RETRIEVAL_WINDOW_SECONDS,
+                      top_k: int = RETRIEVAL_TOP_K, neighbors: int = RETRIEVAL_NEIGHBORS,
+                      max_share: float = RETRIEVAL_MAX_SHARE
+                      ) -> Tuple[Optional[Transcript], List[Tuple[float, float]], Dict[str, Any]]:
+    """The parts of a transcript relevant to targeted instructions
+
+    Returns the filtered transcript and the time ranges it covers, or
+    ``None`` when the whole transcript should be sent: broad requests,
+    no match at all, or matches spread over most of the video.
+    """
+    terms = query_terms(instructions)
+    report: Dict[str, Any] = {"mode": "broad", "query_terms": terms}
+    if not terms or len(transcript) == 0:
+        return None, [], report
+
+    index = WindowIndex(transcript, window_seconds)
+    scores = index.scores(terms)
+    selected = select_windows(scores, top_k, neighbors)
+    report.update(windows=len(index.windows), matched_windows=int(np.count_nonzero(scores)),
+                  selected_windows=len(selected))
+    if not selected:
+        report["mode"] = "no_match"
+        return None, [], report
+    if len(selected) > max_share * len(index.windows):
+        report["mode"] = "spread"
+        return None, [], report
+
+    # Contiguous runs of selected windows become time ranges
+    ranges: List[Tuple[float, float]] = []
+    indices: List[int] = []
+    for w in selected:
+        lo, hi = index.windows[w]
+        indices.extend(range(lo, hi))
+        start, end = transcript.starts[lo], transcript.ends[hi - 1]
+        if ranges and w - 1 in selected:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    total = transcript.ends[-1] - transcript.starts[0]
+    kept = sum(end - start for start, end in ranges)
+    report.update(mode="targeted", ranges=len(ranges), kept_seconds=round(kept, 1),
+                  kept_share=round(kept / total, 3) if total > 0 else 1.0)
+    return transcript.select(indices), ranges, report
+
+
+def clamp_to_ranges(timestamps: List[Dict[str, float]], ranges: List[Tuple[float, float]]) -> List[Dict[str, float]]:
+    """Keep each interval within the range it starts in, so none spans text the model did not see"""
+    clamped = []
+    for timestamp in timestamps:
+        start, end = timestamp["start"], timestamp["end"]
+        for lo, hi in ranges:
+            if lo - 1.0 <= start < hi:
+                clamped.append({**timestamp, "start": max(start, lo), "end": min(end, hi)})
+                break
+    return clamped
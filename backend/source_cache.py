@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from disk_cache import default_cache_dir
+
+
+def link_or_copy(src: Path, dst: Path):
+    """Hard link when possible (same filesystem), otherwise copy"""
+    if dst.exists():
+        dst.unlink()
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class SourceCache:
+    """Shared, size-bounded LRU cache of downloaded source media files.
+
+    Entries are keyed by source identity plus format (e.g.
+    ``youtube:<id>:video/mp4``) and stored one file per entry, named by the
+    key's hash. Jobs get a hard link (or copy) of the cached file, so
+    eviction never pulls a file out from under a running job. Concurrent
+    fetches of the same key share one download.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # hash -> (size, file suffix), least recently used first
+        self._index: "OrderedDict[str, Tuple[int, str]]" = OrderedDict()
+        self._total_bytes = 0
+        self._inflight: Dict[str, "asyncio.Future[None]"] = {}
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "stores": 0, "evictions": 0}
+        if self.enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._load_index()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _load_index(self):
+        entries = []
+        for path in self.cache_dir.iterdir():
+            if not path.is_file() or path.name.startswith("."):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size, path.suffix))
+        for _, name, size, suffix in sorted(entries):
+            self._index[name] = (size, suffix)
+            self._total_bytes += size
+
+    @staticmethod
+    def _name(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _path(self, name: str, suffix: str) -> Path:
+        return self.cache_dir / f"{name}{suffix}"
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            return self._name(key) in self._index
+
+    def _checkout(self, key: str, dest_stem: Path) -> Optional[Path]:
+        """Link the cached file for ``key`` to ``dest_stem`` plus its suffix"""
+        name = self._name(key)
+        with self._lock:
+            entry = self._index.get(name)
+            if entry is None:
+                return None
+            size, suffix = entry
+            path = self._path(name, suffix)
+            dest = dest_stem.with_suffix(suffix)
+            try:
+                link_or_copy(path, dest)
+                os.utime(path)
+            except OSError:
+                self._total_bytes -= self._index.pop(name)[0]
+                return None
+            self._index.move_to_end(name)
+            return dest
+
+    def _store(self, key: str, produced: Path):
+        size = produced.stat().st_size
+        if size > self.max_bytes:
+            return
+        name = self._name(key)
+        path = self._path(name, produced.suffix)
+        tmp_path = self.cache_dir / f".{name}.tmp{threading.get_ident()}"
+        # Link (or copy) then rename so other jobs never see a partial entry
+        link_or_copy(produced, tmp_path)
+        with self._lock:
+            os.replace(tmp_path, path)
+            if name in self._index:
+                self._total_bytes -= self._index.pop(name)[0]
+            self._index[name] = (size, produced.suffix)
+            self._total_bytes += size
+            self._stats["stores"] += 1
+            self._evict_locked()
+
+    def _evict_locked(self):
+        while self._total_bytes > self.max_bytes and self._index:
+            name, (size, suffix) = self._index.popitem(last=False)
+            self._total_bytes -= size
+            self._stats["evictions"] += 1
+            try:
+                self._path(name, suffix).unlink()
+            except OSError:
+                pass
+
+    async def fetch(self, key: str, produce: Callable[[], Awaitable[str]], dest_stem: Path) -> Tuple[str, str]:
+        """Get the file for ``key`` at ``dest_stem`` (plus its extension), downloading at most once.
+
+        ``produce`` downloads the file and returns its path; it only runs on
+        a miss with no download of the same key already in flight. Returns
+        the path and the outcome: ``hit``, ``coalesced`` or ``miss``.
+        """
+        if not self.enabled:
+            return await produce(), "miss"
+
+        loop = asyncio.get_event_loop()
+        dest = await loop.run_in_executor(None, self._checkout, key, dest_stem)
+        if dest is not None:
+            with self._lock:
+                self._stats["hits"] += 1
+            return str(dest), "hit"
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            with self._lock:
+                self._stats["coalesced"] += 1
+            try:
+                # A failed download fails its waiters too; retrying would repeat the same failure
+                await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The downloading job was cancelled, not us
+            dest = await loop.run_in_executor(None, self._checkout, key, dest_stem)
+            if dest is not None:
+                return str(dest), "coalesced"
+            # Evicted, too large to cache or abandoned: download it ourselves
+
+        with self._lock:
+            self._stats["misses"] += 1
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            produced = await produce()
+            try:
+                await loop.run_in_executor(None, self._store, key, Path(produced))
+            except OSError as e:
+                print(f"Warning: could not cache source {key}: {e}", flush=True)
+            future.set_result(None)
+            return produced, "miss"
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an un-awaited failure is not logged as never retrieved
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "in_flight": len(self._inflight),
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+source_cache = SourceCache(
+    Path(os.getenv("SOURCE_CACHE_DIR", str(default_cache_dir("sources")))),
+    max_bytes=int(os.getenv("SOURCE_CACHE_MAX_BYTES", str(2 * 1024 ** 3))),
+)
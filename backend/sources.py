@@ -0,0 +1,216 @@
+import http.client
+import ipaddress
+import os
+import shutil
+import socket
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from source_cache import link_or_copy
+from video_ids import youtube_video_id
+
+# Bytes read per iteration when streaming a remote file to disk
+STREAM_CHUNK_SIZE = 1024 * 1024
+# Let direct URLs reach loopback, private and link-local addresses (local development only)
+HTTP_SOURCE_ALLOW_PRIVATE = os.getenv("HTTP_SOURCE_ALLOW_PRIVATE", "false").lower() == "true"
+
+# yt-dlp style progress hooks, so bandwidth leases and progress bridges work for every source
+ProgressHook = Callable[[Dict[str, Any]], None]
+
+
+class VideoSource:
+    """Where a job's video comes from"""
+
+    kind = ""
+
+    def __init__(self, url: Optional[str] = None):
+        self.url = url
+
+    @property
+    def video_id(self) -> Optional[str]:
+        """YouTube video ID, which enables captions, two-phase fetch and the source cache"""
+        return None
+
+    @property
+    def title(self) -> str:
+        """What to show for the job in lists"""
+        return self.url or ""
+
+    def describe(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "url": self.url}
+
+
+class FileSource(VideoSource, ABC):
+    """A source that is a single media file, copied to the job as-is"""
+
+    @abstractmethod
+    def fetch(self, dest: Path, hooks: List[ProgressHook]) -> Path:
+        """Put the video at ``dest`` (blocking), reporting progress to ``hooks``"""
+
+
+class YouTubeSource(VideoSource):
+    """A YouTube (or other yt-dlp supported) page.
+
+    Not a FileSource: VideoProcessor downloads it itself, through the
+    strategy cascade, the source cache and the two-phase section fetch.
+    """
+
+    kind = "youtube"
+
+    @property
+    def video_id(self) -> Optional[str]:
+        return youtube_video_id(self.url)
+
+
+def _check_public_address(address: str):
+    ip = ipaddress.ip_address(address.split("%")[0])
+    if not ip.is_global or ip.is_multicast:
+        raise ValueError(f"Video URL resolves to a non-public address ({ip})")
+
+
+def check_public_url(url: str):
+    """Reject URLs whose host is, or resolves to, a loopback, private, link-local or otherwise non-public address"""
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https"):
+        raise ValueError("Video URL must use http or https")
+    if not parsed.hostname:
+        raise ValueError("Video URL has no host")
+    try:
+        infos = socket.getaddrinfo(parsed.hostname, parsed.port or (443 if parsed.scheme == "https" else 80),
+                                   type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        raise ValueError(f"Cannot resolve {parsed.hostname}: {e}")
+    for info in infos:
+        _check_public_address(info[4][0])
+
+
+class _PublicHTTPConnection(http.client.HTTPConnection):
+    def connect(self):
+        super().connect()
+        # The address actually connected to, so DNS changing after the check does not help
+        _check_public_address(self.sock.getpeername()[0])
+
+
+class _PublicHTTPSConnection(http.client.HTTPSConnection):
+    def connect(self):
+        super().connect()
+        _check_public_address(self.sock.getpeername()[0])
+
+
+class _PublicHTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(_PublicHTTPConnection, req)
+
+
+class _PublicHTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(_PublicHTTPSConnection, req, context=self._context)
+
+
+class _PublicRedirectHandler(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        check_public_url(newurl)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+class HttpSource(FileSource):
+    """A media file at a plain HTTP(S) URL, streamed to disk.
+
+    Only public addresses are fetched, on the first request and on every
+    redirect, so job URLs cannot reach the server's own network.
+    """
+
+    kind = "url"
+
+    def __init__(self, url: str, timeout: float = 60, allow_private: bool = HTTP_SOURCE_ALLOW_PRIVATE):
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https"):
+            raise ValueError("Video URL must use http or https")
+        if not parsed.hostname:
+            raise ValueError("Video URL has no host")
+        super().__init__(url)
+        self.timeout = timeout
+        self.allow_private = allow_private
+
+    def _open(self, request: urllib.request.Request):
+        if self.allow_private:
+            return urllib.request.urlopen(request, timeout=self.timeout)
+        check_public_url(self.url)
+        # No proxy handler: the connected peer must be the checked host itself
+        opener = urllib.request.OpenerDirector()
+        for handler in (_PublicHTTPHandler(), _PublicHTTPSHandler(), _PublicRedirectHandler(),
+                        urllib.request.HTTPDefaultErrorHandler(), urllib.request.HTTPErrorProcessor()):
+            opener.add_handler(handler)
+        return opener.open(request, timeout=self.timeout)
+
+    def fetch(self, dest: Path, hooks: List[ProgressHook]) -> Path:
+        request = urllib.request.Request(self.url, headers={"User-Agent": "clipwave/1.0"})
+        started = time.time()
+        downloaded = 0
+        with self._open(request) as response, open(dest, "wb") as f:
+            total = int(response.headers.get("Content-Length") or 0) or None
+            while True:
+                chunk = response.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.write(chunk)
+                downloaded += len(chunk)
+                status = {
+                    "status": "downloading",
+                    "filename": str(dest),
+                    "downloaded_bytes": downloaded,
+                    "total_bytes": total,
+                    "speed": downloaded / max(time.time() - started, 1e-6),
+                }
+                for hook in hooks:
+                    hook(status)
+        if downloaded == 0:
+            raise RuntimeError(f"No data received from {self.url}")
+        if total and downloaded < total:
+            raise RuntimeError(f"Download truncated: got {downloaded} of {total} bytes")
+        finished = {"status": "finished", "filename": str(dest), "downloaded_bytes": downloaded, "total_bytes": downloaded}
+        for hook in hooks:
+            hook(finished)
+        return Path(dest)
+
+
+class UploadSource(FileSource):
+    """A local file, e.g. a finished upload; also the offline path for tests and benchmarks"""
+
+    kind = "upload"
+
+    def __init__(self, path: str, filename: Optional[str] = None, move: bool = False):
+        super().__init__()
+        self.path = Path(path)
+        self.filename = filename or self.path.name
+        # Uploads are handed over to the job; other local files are linked and left in place
+        self.move = move
+
+    @property
+    def title(self) -> str:
+        return self.filename
+
+    def describe(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "filename": self.filename}
+
+    def fetch(self, dest: Path, hooks: List[ProgressHook]) -> Path:
+        if not self.path.is_file():
+            raise RuntimeError(f"Source file not found: {self.filename}")
+        size = self.path.stat().st_size
+        if self.move:
+            shutil.move(str(self.path), str(dest))
+        else:
+            link_or_copy(self.path, Path(dest))
+        finished = {"status": "finished", "filename": str(dest), "downloaded_bytes": size, "total_bytes": size}
+        for hook in hooks:
+            hook(finished)
+        return Path(dest)
+
+
+def as_source(source) -> VideoSource:
+    """Accept a VideoSource or, as before, a YouTube URL string"""
+    return source if isinstance(source, VideoSource) else YouTubeSource(source)
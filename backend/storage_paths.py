@@ -0,0 +1,7 @@
+import os
+from pathlib import Path
+
+
+def storage_root() -> Path:
+    """Root of the persistent storage: /app/storage in Docker, ./storage locally"""
+    return Path("/app/storage") if os.path.exists("/app") else Path("./storage")
@@ -0,0 +1,200 @@
+import bisect
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+Segment = Tuple[str, float, float]
+Word = Tuple[str, float, float]
+# (text, start, end, words); plain (text, start, end) tuples are accepted wherever rows are
+Row = Tuple[str, float, float, List[Word]]
+
+
+class Transcript:
+    """Timed transcript stored as parallel arrays.
+
+    Segment texts live in one string buffer addressed by offsets, and their
+    start/end times in float arrays sorted by start, so lookups by time are
+    binary searches. Optional word timestamps are kept the same way, with
+    ``word_index`` giving each segment's range of words. Iterating yields
+    ``(text, start, end)`` tuples.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.offsets = array("l", [0])
+        self.starts = array("d")
+        self.ends = array("d")
+        # Words of segment i are word numbers word_index[i] to word_index[i + 1]
+        self.word_index = array("l", [0])
+        self.word_text = ""
+        self.word_offsets = array("l", [0])
+        self.word_starts = array("d")
+        self.word_ends = array("d")
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[Sequence[Any]]) -> "Transcript":
+        """Build from ``(text, start, end)`` or ``(text, start, end, words)`` rows"""
+        if isinstance(segments, Transcript):
+            return segments
+        transcript = cls()
+        texts: List[str] = []
+        word_texts: List[str] = []
+        position = word_position = 0
+        for segment in sorted(segments, key=lambda row: row[1]):
+            text = segment[0]
+            texts.append(text)
+            position += len(text)
+            transcript.offsets.append(position)
+            transcript.starts.append(segment[1])
+            transcript.ends.append(segment[2])
+            for word, start, end in (segment[3] if len(segment) > 3 else ()):
+                word_texts.append(word)
+                word_position += len(word)
+                transcript.word_offsets.append(word_position)
+                transcript.word_starts.append(start)
+                transcript.word_ends.append(end)
+            transcript.word_index.append(len(transcript.word_starts))
+        transcript.text = "".join(texts)
+        transcript.word_text = "".join(word_texts)
+        return transcript
+
+    @classmethod
+    def concat(cls, parts: Iterable["Transcript"]) -> "Transcript":
+        return cls.from_segments([row for part in parts for row in part.rows()])
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[Segment]:
+        for i in range(len(self)):
+            yield self.segment(i)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.select(range(len(self))[key])
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("transcript segment index out of range")
+        return self.segment(key)
+
+    def __repr__(self) -> str:
+        return f"Transcript({len(self)} segments, {self.word_count} words)"
+
+    @property
+    def word_count(self) -> int:
+        return len(self.word_starts)
+
+    @property
+    def has_words(self) -> bool:
+        return self.word_count > 0
+
+    def segment(self, i: int) -> Segment:
+        return self.text[self.offsets[i]:self.offsets[i + 1]], self.starts[i], self.ends[i]
+
+    def word(self, i: int) -> Word:
+        return self.word_text[self.word_offsets[i]:self.word_offsets[i + 1]], self.word_starts[i], self.word_ends[i]
+
+    def words(self, i: int) -> List[Word]:
+        """Word timestamps of segment ``i`` (empty when the engine gave none)"""
+        return [self.word(w) for w in range(self.word_index[i], self.word_index[i + 1])]
+
+    def rows(self) -> Iterator[Row]:
+        for i in range(len(self)):
+            text, start, end = self.segment(i)
+            yield text, start, end, self.words(i)
+
+    def to_segments(self) -> List[Segment]:
+        return list(self)
+
+    def select(self, indices: Iterable[int]) -> "Transcript":
+        """Segments at the given positions, with their words"""
+        rows = []
+        for i in indices:
+            text, start, end = self.segment(i)
+            rows.append((text, start, end, self.words(i)))
+        return Transcript.from_segments(rows)
+
+    def map_times(self, fn: Callable[[float], float]) -> "Transcript":
+        """Copy with every segment and word time passed through ``fn``"""
+        mapped = Transcript()
+        mapped.text, mapped.offsets, mapped.word_index = self.text, array("l", self.offsets), array("l", self.word_index)
+        mapped.word_text, mapped.word_offsets = self.word_text, array("l", self.word_offsets)
+        mapped.starts = array("d", (round(fn(t), 3) for t in self.starts))
+        mapped.ends = array("d", (round(fn(t), 3) for t in self.ends))
+        mapped.word_starts = array("d", (round(fn(t), 3) for t in self.word_starts))
+        mapped.word_ends = array("d", (round(fn(t), 3) for t in self.word_ends))
+        return mapped
+
+    def shifted(self, offset: float) -> "Transcript":
+        return self.map_times(lambda t: t + offset)
+
+    def segment_at(self, t: float) -> Optional[int]:
+        """Index of the segment spoken at time ``t``, if any"""
+        i = bisect.bisect_right(self.starts, t) - 1
+        return i if i >= 0 and t < self.ends[i] else None
+
+    def word_at(self, t: float) -> Optional[int]:
+        """Index of the word spoken at time ``t``, if any"""
+        i = bisect.bisect_right(self.word_starts, t) - 1
+        return i if i >= 0 and t < self.word_ends[i] else None
+
+    def slice(self, start: float, end: float) -> "Transcript":
+        """Segments overlapping ``[start, end)``"""
+        lo = bisect.bisect_right(self.starts, start) - 1
+        if lo < 0 or self.ends[lo] <= start:
+            lo += 1
+        hi = bisect.bisect_left(self.starts, end)
+        return self[lo:hi]
+
+    def snap(self, start: float, end: float) -> Tuple[float, float]:
+        """Widen a cut so it does not split a word at either edge"""
+        first = self.word_at(start)
+        if first is not None:
+            start = self.word_starts[first]
+        last = self.word_at(end)
+        if last is not None:
+            end = self.word_ends[last]
+        return start, end
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact JSON-friendly form: text buffers, lengths and millisecond times"""
+        data: Dict[str, Any] = {
+            "text": self.text,
+            "lengths": [self.offsets[i + 1] - self.offsets[i] for i in range(len(self))],
+            "starts": [round(t * 1000) for t in self.starts],
+            "ends": [round(t * 1000) for t in self.ends],
+        }
+        if self.has_words:
+            data["words"] = {
+                "text": self.word_text,
+                "lengths": [self.word_offsets[i + 1] - self.word_offsets[i] for i in range(self.word_count)],
+                "starts": [round(t * 1000) for t in self.word_starts],
+                "ends": [round(t * 1000) for t in self.word_ends],
+                "counts": [self.word_index[i + 1] - self.word_index[i] for i in range(len(self))],
+            }
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Transcript":
+        transcript = cls()
+        transcript.text = data["text"]
+        transcript.offsets = array("l", _running_total(data["lengths"]))
+        transcript.starts = array("d", (t / 1000 for t in data["starts"]))
+        transcript.ends = array("d", (t / 1000 for t in data["ends"]))
+        words = data.get("words")
+        if words:
+            transcript.word_text = words["text"]
+            transcript.word_offsets = array("l", _running_total(words["lengths"]))
+            transcript.word_starts = array("d", (t / 1000 for t in words["starts"]))
+            transcript.word_ends = array("d", (t / 1000 for t in words["ends"]))
+            transcript.word_index = array("l", _running_total(words["counts"]))
+        else:
+            transcript.word_index = array("l", [0] * (len(transcript.starts) + 1))
+        return transcript
+
+
+def _running_total(lengths: Iterable[int]) -> List[int]:
+    totals = [0]
+    for length in lengths:
+        totals.append(totals[-1] + length)
+    return totals
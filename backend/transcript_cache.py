@@ -0,0 +1,47 @@
+import json
+import os
+import zlib
+from typing import Any, Dict, Optional
+
+from disk_cache import DiskCache, default_cache_dir
+from transcript import Transcript
+
+
+class TranscriptCache:
+    """Persistent transcripts keyed by source identity, model and language.
+
+    The same video submitted with different instructions produces the same
+    transcript, so it is transcribed once and reused from disk afterwards.
+    """
+
+    def __init__(self, cache: DiskCache):
+        self.cache = cache
+
+    @staticmethod
+    def make_key(source_key: str, model_name: str, language: str) -> str:
+        return f"transcript:v2:{source_key}:{model_name}:{language}"
+
+    def get(self, source_key: str, model_name: str, language: str) -> Optional[Transcript]:
+        data = self.cache.get(self.make_key(source_key, model_name, language))
+        if data is None:
+            return None
+        try:
+            return Transcript.from_dict(json.loads(zlib.decompress(data).decode("utf-8")))
+        except (zlib.error, ValueError, KeyError) as e:
+            print(f"Warning: discarding unreadable cached transcript: {e}", flush=True)
+            return None
+
+    def put(self, source_key: str, model_name: str, language: str,
+            transcript: Transcript):
+        # Millisecond precision is all the clipping stages use
+        payload = json.dumps(transcript.to_dict(), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        self.cache.set(self.make_key(source_key, model_name, language), zlib.compress(payload, 6))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.cache.get_stats()
+
+
+transcript_cache = TranscriptCache(DiskCache(
+    os.getenv("TRANSCRIPT_CACHE_DIR", str(default_cache_dir("transcripts"))),
+    max_bytes=int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+))
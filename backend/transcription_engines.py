@@ -0,0 +1,129 @@
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Type
+
+from model_registry import model_registry, DEFAULT_MODEL
+from transcript import Transcript
+
+# Word timestamps let the render stage cut on word boundaries
+WORD_TIMESTAMPS = os.getenv("TRANSCRIBE_WORD_TIMESTAMPS", "true").lower() == "true"
+
+
+class TranscriptionEngine(ABC):
+    """A speech-to-text backend.
+
+    Every engine takes a 16 kHz mono float32 waveform (or a media path) and
+    returns the same ``Transcript``, so the rest of the pipeline does not
+    care which one ran. Models are held in the shared
+    registry under ``registry_key``.
+    """
+
+    name = ""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL):
+        self.model_name = model_name
+
+    @property
+    def registry_key(self) -> str:
+        return f"{self.name}:{self.model_name}"
+
+    @property
+    def cache_key(self) -> str:
+        """Identity used for transcript caching; outputs differ between engines"""
+        return self.registry_key
+
+    @abstractmethod
+    def load_model(self, model_name: str) -> Any:
+        """Build the model; called once per process by the registry"""
+
+    @abstractmethod
+    def _transcribe(self, model: Any, audio: Any, language: str) -> Transcript:
+        """Run the model on ``audio``"""
+
+    def transcribe(self, audio: Any, language: str = "en") -> Transcript:
+        with model_registry.acquire(self.registry_key, lambda _: self.load_model(self.model_name)) as model:
+            return self._transcribe(model, audio, language)
+
+    def warmup(self):
+        model_registry.warmup([self.registry_key], lambda _: self.load_model(self.model_name))
+
+
+class WhisperEngine(TranscriptionEngine):
+    """openai-whisper in PyTorch fp32"""
+
+    name = "whisper"
+
+    @property
+    def cache_key(self) -> str:
+        # Plain model name, as used before engines were pluggable
+        return self.model_name
+
+    def load_model(self, model_name: str) -> Any:
+        import whisper
+        return whisper.load_model(model_name)
+
+    def _transcribe(self, model: Any, audio: Any, language: str) -> Transcript:
+        result = model.transcribe(audio, language=language, fp16=False, word_timestamps=WORD_TIMESTAMPS)
+        return Transcript.from_segments(
+            (segment['text'], segment['start'], segment['end'],
+             [(word['word'], word['start'], word['end']) for word in segment.get('words', [])])
+            for segment in result['segments']
+        )
+
+
+class QuantizedWhisperEngine(WhisperEngine):
+    """openai-whisper with int8 dynamic quantization of its linear layers (CPU only)"""
+
+    name = "whisper-int8"
+
+    @property
+    def cache_key(self) -> str:
+        return self.registry_key
+
+    def load_model(self, model_name: str) -> Any:
+        import torch
+        import whisper
+        model = whisper.load_model(model_name, device="cpu")
+        # whisper.model.Linear only adds dtype casting for fp16; turn it back into a
+        # plain nn.Linear so quantize_dynamic recognizes and replaces it
+        for module in model.modules():
+            if isinstance(module, whisper.model.Linear):
+                module.__class__ = torch.nn.Linear
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class FasterWhisperEngine(TranscriptionEngine):
+    """CTranslate2 backend via faster-whisper with int8 weights (optional dependency)"""
+
+    name = "faster-whisper"
+
+    def load_model(self, model_name: str) -> Any:
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise RuntimeError("The faster-whisper engine requires `pip install faster-whisper`")
+        threads = int(os.getenv("TRANSCRIBE_THREADS_PER_WORKER", "0"))
+        return WhisperModel(model_name, device="cpu", compute_type="int8", cpu_threads=threads)
+
+    def _transcribe(self, model: Any, audio: Any, language: str) -> Transcript:
+        segments, _ = model.transcribe(audio, language=language, beam_size=5, word_timestamps=WORD_TIMESTAMPS)
+        return Transcript.from_segments(
+            (segment.text, segment.start, segment.end,
+             [(word.word, word.start, word.end) for word in segment.words or []])
+            for segment in segments
+        )
+
+
+ENGINES: Dict[str, Type[TranscriptionEngine]] = {
+    engine.name: engine for engine in (WhisperEngine, QuantizedWhisperEngine, FasterWhisperEngine)
+}
+
+DEFAULT_ENGINE = os.getenv("TRANSCRIBE_ENGINE", "whisper")
+
+
+def get_engine(name: Optional[str] = None, model_name: Optional[str] = None) -> TranscriptionEngine:
+    """Engine instance by name (TRANSCRIBE_ENGINE by default)"""
+    name = name or DEFAULT_ENGINE
+    if name not in ENGINES:
+        raise ValueError(f"Unknown transcription engine '{name}'. Available: {', '.join(ENGINES)}")
+    return ENGINES[name](model_name or DEFAULT_MODEL)
@@ -0,0 +1,222 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from audio import open_pcm
+from model_registry import DEFAULT_MODEL, model_registry
+from transcript import Transcript
+from transcription_engines import DEFAULT_ENGINE, get_engine
+
+
+def transcribe_audio(engine_name: str, model_name: str, audio: Any,
+                     language: str = "en") -> Transcript:
+    """Run a transcription engine on a file path or waveform with a registry-held model"""
+    return get_engine(engine_name, model_name).transcribe(audio, language)
+
+
+def transcribe_pcm_window(engine_name: str, model_name: str, pcm_path: str, start: int, end: int,
+                          language: str = "en") -> Transcript:
+    """Transcribe ``[start, end)`` samples of a raw PCM file; timestamps are window-relative"""
+    return transcribe_audio(engine_name, model_name, open_pcm(pcm_path)[start:end], language)
+
+
+def _limit_threads(threads: int):
+    """Cap the intra-op thread pools so N workers do not oversubscribe the cores"""
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+    except Exception as e:
+        print(f"Warning: could not limit torch threads: {e}", flush=True)
+
+
+def _init_worker(engine_name: str, model_name: str, threads: int):
+    """Worker process initializer: limit threads and keep the model resident"""
+    _limit_threads(threads)
+    get_engine(engine_name, model_name).warmup()
+    print(f"Transcription worker {os.getpid()} ready ({threads} threads, "
+          f"{engine_name} model '{model_name}')", flush=True)
+
+
+def _worker_ping() -> Dict[str, Any]:
+    return {"worker_pid": os.getpid(), "registry": model_registry.get_stats()}
+
+
+def _worker_transcribe_window(pcm_path: str, start: int, end: int, engine_name: str, model_name: str,
+                              language: str) -> Dict[str, Any]:
+    """Transcribe one window of a shared PCM file inside a worker process"""
+    start_time = time.time()
+    segments = transcribe_pcm_window(engine_name, model_name, pcm_path, start, end, language)
+    return {
+        "segments": segments,
+        "worker_pid": os.getpid(),
+        "run_seconds": time.time() - start_time,
+        # The models live here, so the API process's registry never sees them
+        "registry": model_registry.get_stats(),
+    }
+
+
+class TranscriptionPool:
+    """Fixed set of worker processes, each holding a resident transcription model.
+
+    Jobs submit windows of a shared PCM file and await the segments, keeping
+    Whisper off the event loop's process. Each result carries the worker's
+    model registry counters, which ``registry_stats`` sums up. A crashed worker breaks the executor, so
+    the pool is rebuilt and the job retried once.
+    """
+
+    def __init__(self, workers: int, model_name: str = DEFAULT_MODEL, threads_per_worker: Optional[int] = None,
+                 engine_name: str = DEFAULT_ENGINE):
+        self.workers = workers
+        self.model_name = model_name
+        self.engine_name = engine_name
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // max(1, workers))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "restarts": 0,
+            "pending": 0,
+            "max_pending": 0,
+            "wait_seconds": 0.0,
+            "run_seconds": 0.0,
+        }
+        # Latest model registry stats reported by each live worker, by PID
+        self._worker_registries: Dict[int, Dict[str, Any]] = {}
+
+    @classmethod
+    def from_env(cls) -> "TranscriptionPool":
+        threads = os.getenv("TRANSCRIBE_THREADS_PER_WORKER")
+        return cls(
+            workers=int(os.getenv("TRANSCRIBE_WORKERS", "1")),
+            model_name=DEFAULT_MODEL,
+            threads_per_worker=int(threads) if threads else None,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: the parent holds the event loop and torch thread pools
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.engine_name, self.model_name, self.threads_per_worker),
+                )
+            return self._executor
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+                self._stats["restarts"] += 1
+                self._worker_registries.clear()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def start(self):
+        """Spawn the workers and load their models ahead of the first job"""
+        if not self.enabled:
+            return
+        executor = self._get_executor()
+        for _ in range(self.workers):
+            executor.submit(_worker_ping).add_done_callback(self._record_ping)
+
+    def _record_ping(self, future):
+        if not future.cancelled() and future.exception() is None:
+            self._record_registry(future.result())
+
+    def _record_registry(self, result: Dict[str, Any]):
+        with self._lock:
+            self._worker_registries[result["worker_pid"]] = result["registry"]
+
+    async def transcribe_window(self, pcm_path: str, start: int, end: int, language: str = "en",
+                                engine_name: Optional[str] = None) -> Transcript:
+        """Transcribe samples ``[start, end)`` of a PCM file on a worker process"""
+        return await self._submit(_worker_transcribe_window, pcm_path, start, end,
+                                  engine_name or self.engine_name, self.model_name, language)
+
+    async def _submit(self, fn: Callable[..., Dict[str, Any]], *args) -> Transcript:
+        loop = asyncio.get_event_loop()
+        submitted_at = time.time()
+        with self._lock:
+            self._stats["submitted"] += 1
+            self._stats["pending"] += 1
+            self._stats["max_pending"] = max(self._stats["max_pending"], self._stats["pending"])
+        try:
+            for attempt in range(2):
+                executor = self._get_executor()
+                try:
+                    result = await loop.run_in_executor(executor, fn, *args)
+                    break
+                except BrokenProcessPool:
+                    print("Transcription worker crashed, restarting pool...", flush=True)
+                    self._restart(executor)
+                    if attempt == 1:
+                        raise
+        except Exception:
+            with self._lock:
+                self._stats["failed"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._stats["pending"] -= 1
+
+        self._record_registry(result)
+        with self._lock:
+            self._stats["completed"] += 1
+            self._stats["run_seconds"] += result["run_seconds"]
+            self._stats["wait_seconds"] += max(0.0, time.time() - submitted_at - result["run_seconds"])
+        return result["segments"]
+
+    def registry_stats(self) -> Dict[str, Any]:
+        """Model registry counters summed over the workers, with each worker's own stats"""
+        with self._lock:
+            workers = dict(self._worker_registries)
+        totals = {key: sum(stats[key] for stats in workers.values())
+                  for key in ("loads", "hits", "evictions", "load_seconds")}
+        requests = totals["loads"] + totals["hits"]
+        return {
+            **totals,
+            "hit_rate": totals["hits"] / requests if requests else 0.0,
+            "workers": {str(pid): stats for pid, stats in workers.items()},
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and throughput counters, and the workers' model registries"""
+        with self._lock:
+            stats = dict(self._stats)
+        completed = stats["completed"] or 1
+        return {
+            **stats,
+            "workers": self.workers,
+            "threads_per_worker": self.threads_per_worker,
+            "engine": self.engine_name,
+            "model": self.model_name,
+            "running": min(stats["pending"], self.workers),
+            "queued": max(0, stats["pending"] - self.workers),
+            "avg_wait_seconds": stats["wait_seconds"] / completed,
+            "avg_run_seconds": stats["run_seconds"] / completed,
+            "registry": self.registry_stats(),
+        }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+transcription_pool = TranscriptionPool.from_env()
@@ -0,0 +1,195 @@
+import asyncio
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List
+
+from storage_paths import storage_root
+
+# Size of one resumable chunk; the client sends chunk i as bytes [i * size, (i + 1) * size)
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(8 * 1024 ** 2)))
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(4 * 1024 ** 3)))
+# Unfinished uploads older than this are deleted
+UPLOAD_TTL_SECONDS = int(os.getenv("UPLOAD_TTL_SECONDS", str(24 * 3600)))
+
+
+def default_upload_dir() -> Path:
+    return storage_root() / "uploads"
+
+
+class UploadManager:
+    """Resumable uploads written to disk chunk by chunk.
+
+    Each upload is a directory holding the preallocated data file and a
+    small JSON state file listing the chunks received so far, so an
+    interrupted upload resumes by re-sending only the missing chunks, even
+    after a restart. Request bodies are consumed as streams and written as
+    they arrive; nothing is buffered whole in memory.
+    """
+
+    def __init__(self, root: Path, chunk_size: int = UPLOAD_CHUNK_SIZE,
+                 max_bytes: int = UPLOAD_MAX_BYTES, ttl_seconds: int = UPLOAD_TTL_SECONDS):
+        self.root = Path(root)
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _dir(self, upload_id: str) -> Path:
+        # Upload IDs are generated UUIDs; anything else could escape the upload root
+        try:
+            return self.root / str(uuid.UUID(upload_id))
+        except ValueError:
+            raise KeyError(upload_id)
+
+    def _load(self, upload_id: str) -> Dict[str, Any]:
+        try:
+            with open(self._dir(upload_id) / "upload.json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(upload_id)
+
+    def _save(self, state: Dict[str, Any]):
+        state_path = self._dir(state["id"]) / "upload.json"
+        tmp_path = state_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
+
+    def _new_state(self, upload_id: str, user_id: str, filename: str, size: int) -> Dict[str, Any]:
+        return {
+            "id": upload_id,
+            "user_id": user_id,
+            "filename": Path(filename or "upload").name,
+            "size": size,
+            "chunk_size": self.chunk_size,
+            "received": [],
+            "created_at": time.time(),
+        }
+
+    def _lock(self, upload_id: str) -> asyncio.Lock:
+        return self._locks.setdefault(upload_id, asyncio.Lock())
+
+    def chunk_count(self, state: Dict[str, Any]) -> int:
+        return max(1, -(-state["size"] // state["chunk_size"]))
+
+    def _chunk_length(self, state: Dict[str, Any], index: int) -> int:
+        return min(state["chunk_size"], state["size"] - index * state["chunk_size"])
+
+    def create(self, user_id: str, filename: str, size: int) -> Dict[str, Any]:
+        """Start an upload of ``size`` bytes; returns its status"""
+        if size <= 0 or size > self.max_bytes:
+            raise ValueError(f"Upload size must be between 1 and {self.max_bytes} bytes")
+        self.expire()
+        upload_id = str(uuid.uuid4())
+        upload_dir = self._dir(upload_id)
+        upload_dir.mkdir(parents=True)
+        with open(upload_dir / "data", "wb") as f:
+            f.truncate(size)
+        self._save(self._new_state(upload_id, user_id, filename, size))
+        return self.status(upload_id, user_id)
+
+    def status(self, upload_id: str, user_id: str) -> Dict[str, Any]:
+        state = self._load(upload_id)
+        if state["user_id"] != user_id:
+            raise PermissionError(upload_id)
+        received = set(state["received"])
+        missing = [i for i in range(self.chunk_count(state)) if i not in received]
+        return {
+            "upload_id": upload_id,
+            "filename": state["filename"],
+            "size": state["size"],
+            "chunk_size": state["chunk_size"],
+            "chunks": self.chunk_count(state),
+            "received": sorted(received),
+            "missing": missing,
+            "complete": not missing,
+        }
+
+    async def write_chunk(self, upload_id: str, user_id: str, index: int,
+                          body: AsyncIterator[bytes]) -> Dict[str, Any]:
+        """Stream one chunk into place; it only counts as received once all its bytes arrived"""
+        loop = asyncio.get_event_loop()
+        async with self._lock(upload_id):
+            state = self._load(upload_id)
+            if state["user_id"] != user_id:
+                raise PermissionError(upload_id)
+            if not 0 <= index < self.chunk_count(state):
+                raise ValueError(f"Chunk index {index} out of range")
+            expected = self._chunk_length(state, index)
+            if index in state["received"]:
+                # A re-send overwrites the chunk in place: until it has fully arrived, the chunk is missing again
+                state["received"].remove(index)
+                self._save(state)
+            written = 0
+            with open(self._dir(upload_id) / "data", "r+b") as f:
+                f.seek(index * state["chunk_size"])
+                async for piece in body:
+                    if written + len(piece) > expected:
+                        raise ValueError(f"Chunk {index} is larger than {expected} bytes")
+                    await loop.run_in_executor(None, f.write, piece)
+                    written += len(piece)
+            if written != expected:
+                raise ValueError(f"Chunk {index} incomplete: got {written} of {expected} bytes")
+            state["received"].append(index)
+            self._save(state)
+        return self.status(upload_id, user_id)
+
+    async def receive(self, user_id: str, filename: str, body: AsyncIterator[bytes]) -> Dict[str, Any]:
+        """Store a whole file sent in one request (e.g. a multipart field) of unknown size"""
+        loop = asyncio.get_event_loop()
+        upload_id = str(uuid.uuid4())
+        upload_dir = self._dir(upload_id)
+        upload_dir.mkdir(parents=True)
+        size = 0
+        try:
+            with open(upload_dir / "data", "wb") as f:
+                async for piece in body:
+                    size += len(piece)
+                    if size > self.max_bytes:
+                        raise ValueError(f"Upload exceeds {self.max_bytes} bytes")
+                    await loop.run_in_executor(None, f.write, piece)
+            if size == 0:
+                raise ValueError("Uploaded file is empty")
+        except BaseException:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+            raise
+        state = self._new_state(upload_id, user_id, filename, size)
+        state["received"] = list(range(self.chunk_count(state)))
+        self._save(state)
+        return self.status(upload_id, user_id)
+
+    def completed_path(self, upload_id: str, user_id: str) -> Path:
+        """Path of a fully received upload's data"""
+        status = self.status(upload_id, user_id)
+        if not status["complete"]:
+            raise ValueError(f"Upload {upload_id} is missing {len(status['missing'])} chunk(s)")
+        return self._dir(upload_id) / "data"
+
+    def discard(self, upload_id: str):
+        try:
+            shutil.rmtree(self._dir(upload_id), ignore_errors=True)
+        except KeyError:
+            pass
+        self._locks.pop(upload_id, None)
+
+    def expire(self) -> List[str]:
+        """Delete uploads older than the TTL; returns their IDs"""
+        if not self.root.exists():
+            return []
+        cutoff = time.time() - self.ttl_seconds
+        expired = []
+        for upload_dir in self.root.iterdir():
+            try:
+                if upload_dir.is_dir() and upload_dir.stat().st_mtime < cutoff:
+                    expired.append(upload_dir.name)
+                    self.discard(upload_dir.name)
+            except OSError:
+                continue
+        return expired
+
+
+upload_manager = UploadManager(Path(os.getenv("UPLOAD_DIR", str(default_upload_dir()))))
@@ -0,0 +1,102 @@
+import bisect
+import os
+from typing import List, Tuple
+
+import numpy as np
+
+from audio import SAMPLE_RATE, frame_energy_db
+
+VAD_ENABLED = os.getenv("TRANSCRIBE_VAD", "true").lower() == "true"
+# Skip the pre-pass result when it would save less than this share of the audio
+VAD_MIN_SKIP_RATIO = float(os.getenv("TRANSCRIBE_VAD_MIN_SKIP", "0.05"))
+
+
+def _dilate(mask: np.ndarray, width: int) -> np.ndarray:
+    """Extend every True run by ``width`` frames on both sides"""
+    if width <= 0 or not mask.any():
+        return mask
+    kernel = np.ones(2 * width + 1, dtype=np.int32)
+    return np.convolve(mask.astype(np.int32), kernel, mode="same") > 0
+
+
+def _rolling_std(values: np.ndarray, width: int) -> np.ndarray:
+    """Standard deviation over a centred window, via cumulative sums"""
+    if len(values) == 0:
+        return values
+    width = max(1, min(width, len(values)))
+    padded = np.pad(values.astype(np.float64), (width // 2, width - 1 - width // 2), mode="edge")
+    csum = np.concatenate(([0.0], np.cumsum(padded)))
+    csum_sq = np.concatenate(([0.0], np.cumsum(padded ** 2)))
+    mean = (csum[width:] - csum[:-width]) / width
+    mean_sq = (csum_sq[width:] - csum_sq[:-width]) / width
+    return np.sqrt(np.maximum(mean_sq - mean ** 2, 0.0))
+
+
+def speech_regions(samples: np.ndarray, frame_seconds: float = 0.03, margin_db: float = 12.0,
+                   min_modulation_db: float = 4.0, min_speech_seconds: float = 0.25,
+                   min_gap_seconds: float = 0.6, pad_seconds: float = 0.2) -> List[Tuple[int, int]]:
+    """Find likely speech as ``(start, end)`` sample ranges.
+
+    A frame counts as speech when it is clearly above the noise floor and
+    its surroundings show syllable-rate loudness changes; steady beds such
+    as music, hum or room tone stay below that modulation. The mask is then
+    padded, short gaps are bridged and blips are dropped.
+    """
+    energy = frame_energy_db(samples, frame_seconds)
+    if len(energy) == 0:
+        return []
+    frame_size = int(frame_seconds * SAMPLE_RATE)
+
+    noise_floor = np.percentile(energy, 10)
+    loud = energy > max(noise_floor + margin_db, -50.0)
+    modulation = _rolling_std(energy, int(1.0 / frame_seconds))
+    speech = loud & (modulation > min_modulation_db)
+
+    # Bridge short pauses between words and pad the edges of each region
+    speech = _dilate(speech, int(min_gap_seconds / 2 / frame_seconds))
+    speech = ~_dilate(~speech, int(min_gap_seconds / 2 / frame_seconds))
+    speech = _dilate(speech, int(pad_seconds / frame_seconds))
+
+    edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    min_frames = int(min_speech_seconds / frame_seconds)
+    return [
+        (int(start * frame_size), int(min(end * frame_size, len(samples))))
+        for start, end in zip(starts, ends) if end - start >= min_frames
+    ]
+
+
+class TimeMap:
+    """Maps times in a compacted speech-only buffer back to the original timeline"""
+
+    def __init__(self, regions: List[Tuple[int, int]], gap_samples: int):
+        self.compact_starts: List[float] = []
+        self.original_starts: List[float] = []
+        self.lengths: List[float] = []
+        position = 0
+        for start, end in regions:
+            self.compact_starts.append(position / SAMPLE_RATE)
+            self.original_starts.append(start / SAMPLE_RATE)
+            self.lengths.append((end - start) / SAMPLE_RATE)
+            position += end - start + gap_samples
+
+    def to_original(self, t: float) -> float:
+        if not self.compact_starts:
+            return t
+        i = max(0, bisect.bisect_right(self.compact_starts, t) - 1)
+        # Times inside the silence inserted between regions snap to the region end
+        offset = min(max(t - self.compact_starts[i], 0.0), self.lengths[i])
+        return round(self.original_starts[i] + offset, 3)
+
+
+def compact_speech(samples: np.ndarray, regions: List[Tuple[int, int]], out_path: str,
+                   gap_seconds: float = 0.3) -> TimeMap:
+    """Write only the speech regions, separated by short silences, to a PCM file"""
+    gap = np.zeros(int(gap_seconds * SAMPLE_RATE), dtype=np.float32)
+    with open(out_path, "wb") as f:
+        for start, end in regions:
+            # Region by region so the copy never holds more than one region in memory
+            np.asarray(samples[start:end], dtype=np.float32).tofile(f)
+            gap.tofile(f)
+    return TimeMap(regions, len(gap))
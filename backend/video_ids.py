@@ -0,0 +1,40 @@
+import hashlib
+import re
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+_YOUTUBE_ID = re.compile(r"^[A-Za-z0-9_-]{11}$")
+_YOUTUBE_HOSTS = ("youtube.com", "youtube-nocookie.com", "youtu.be")
+
+
+def youtube_video_id(url: str) -> Optional[str]:
+    """Canonical 11-character video ID for any common YouTube URL form"""
+    try:
+        parsed = urlparse(url.strip())
+    except ValueError:
+        return None
+    host = (parsed.hostname or "").lower()
+    if not any(host == h or host.endswith("." + h) for h in _YOUTUBE_HOSTS):
+        return None
+
+    candidate = None
+    parts = [part for part in parsed.path.split("/") if part]
+    if host.endswith("youtu.be"):
+        candidate = parts[0] if parts else None
+    elif parts and parts[0] in ("shorts", "embed", "live", "v") and len(parts) > 1:
+        candidate = parts[1]
+    else:
+        candidate = parse_qs(parsed.query).get("v", [None])[0]
+
+    if candidate and _YOUTUBE_ID.match(candidate):
+        return candidate
+    return None
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Content hash of a file, read in fixed-size chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -1,25 +1,53 @@
 import yt_dlp
-import whisper
 import tempfile
 import os
-import re
-import ast
 import subprocess
 import asyncio
 import base64
-from openai import OpenAI
+import copy
+from contextlib import contextmanager
 from moviepy.video.io.VideoFileClip import VideoFileClip
-from typing import Callable, Optional, Dict, Any, List, Tuple
+from typing import Awaitable, Callable, Iterator, Optional, Dict, Any, List, Tuple, Union
 import threading
 import time
 from pathlib import Path
+import numpy as np
 from dotenv import load_dotenv
+from model_registry import DEFAULT_MODEL
+from transcription_pool import transcription_pool
+from transcription_engines import get_engine
+from audio import SAMPLE_RATE, extract_pcm, open_pcm, pcm_length, start_pcm_stream
+from transcript_cache import transcript_cache
+from llm_cache import LLM_CACHE_ENABLED, llm_cache, transcript_hash
+from llm_client import OPENAI_BASE_URL, llm_client
+from captions import fetch_caption_transcript
+from video_ids import file_sha256
+from download_strategies import download_scheduler
+from ranged_fetch import AUDIO_FORMAT, FETCH_MODE, KEYFRAME_PAD_SECONDS, audio_stream_url, fetch_audio, fetch_sections, locate_section, plan_sections
+from source_cache import source_cache
+from media_formats import PREFER_REMUX, normalize_to_mp4, prefer_remuxable
+from bandwidth import FRAGMENT_CONCURRENCY, DownloadLease, bandwidth_scheduler
+from progress import ProgressBridge, ProgressCallback
+from sources import FileSource, VideoSource, as_source
+from transcript import Transcript
+from prompting import PROMPT_LINE_SECONDS, build_transcript_block, estimate_tokens
+from retrieval import RETRIEVAL_ENABLED, clamp_to_ranges, filter_transcript, query_terms
+from clip_identification import (
+    CLIP_MODEL, DEFAULT_INSTRUCTIONS, EARLY_MAP, EARLY_MAP_MIN_SECONDS, MAP_CONCURRENCY, MAP_REDUCE_MODE,
+    PROMPT_VERSION, MAP_SYSTEM_PROMPT, SYSTEM_PROMPT, EarlyMap,
+    build_prompt, parse_intervals, reduce_candidates, should_map_reduce, split_transcript,
+)
+from vad import VAD_ENABLED, VAD_MIN_SKIP_RATIO, TimeMap, compact_speech, speech_regions
+from chunked_transcription import (
+    PIPELINED, WINDOW_SECONDS, WINDOW_OVERLAP_SECONDS,
+    STREAM_WINDOWS, should_chunk, plan_windows, plan_windows_live, stream_windows,
+)
 
 # Load environment variables
 load_dotenv()
 
 class VideoProcessor:
-    def __init__(self, job_id: str, storage_dir: str = None):
+    def __init__(self, job_id: str, storage_dir: str = None, engine_name: Optional[str] = None):
         self.job_id = job_id
         
         # Use absolute path for storage directory
@@ -41,11 +69,31 @@ class VideoProcessor:
         # Create temp folder for this job
         self.temp_dir = Path(tempfile.mkdtemp())
         self.video_path = self.temp_dir / "input.mp4"
+        self.audio_path = self.temp_dir / "audio.f32"
+        self.audio: Optional[np.ndarray] = None
+        self.audio_duration: Optional[float] = None
         self.output_path = self.storage_dir / f"{job_id}.mp4"
+        self.engine = get_engine(engine_name, DEFAULT_MODEL)
+        self.language = "en"
+        # Per-job stage measurements, stored on the job record by main.py
+        self.metrics: Dict[str, Any] = {}
+        self.video_info: Optional[Dict[str, Any]] = None
+        self.source: Optional[VideoSource] = None
+        # Admission truncation: only the first this-many seconds are analyzed and clipped
+        self.max_duration: Optional[float] = None
+        self.use_llm_cache = True
+        # Map-window candidate extraction started during transcription, and the limit shared with map-reduce
+        self.early_map: Optional[EarlyMap] = None
+        self._map_semaphore: Optional[asyncio.Semaphore] = None
+        # Clip sections fetched in two-phase mode; None when the full video is downloaded
+        self.sections: Optional[List[Dict[str, Any]]] = None
+        # Set by process_video so download threads can post progress back to the event loop
+        self.progress_callback: Optional[ProgressCallback] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
         
         # Load API keys from environment variables
         self.openai_key = os.getenv("OPENAI_API_KEY")
-        if not self.openai_key:
+        if not self.openai_key and not OPENAI_BASE_URL:
             raise ValueError("OPENAI_API_KEY environment variable is required")
     
     def _create_temp_cookies_file(self) -> Optional[str]:
@@ -113,33 +161,135 @@ class VideoProcessor:
         print("No cookies found - YouTube downloads may fail for restricted videos")
         return None
     
-    async def process_video(self, youtube_url: str, instructions: str = "", 
-                          progress_callback: Optional[Callable[[int, str], None]] = None) -> Dict[str, Any]:
-        """Process a YouTube video with progress updates"""
+    async def process_video(self, source: Union[str, VideoSource], instructions: str = "", 
+                          progress_callback: Optional[ProgressCallback] = None,
+                          use_captions: Optional[bool] = None,
+                          segment_callback: Optional[Callable[[Transcript, float, float], None]] = None,
+                          max_duration: Optional[float] = None,
+                          video_info: Optional[Dict[str, Any]] = None,
+                          use_llm_cache: bool = True
+                          ) -> Dict[str, Any]:
+        """Process a video with progress updates
+        
+        ``source`` is a YouTube URL or any VideoSource (direct URL, upload).
+        ``progress_callback`` receives the percent, a step message and, while
+        downloading, byte counts, speed and ETA. ``segment_callback`` receives newly transcribed segments, the audio
+        position reached and the total duration while Whisper runs.
+        ``max_duration`` limits processing to the start of the video;
+        ``video_info`` is metadata already extracted by the admission probe.
+        ``use_llm_cache=False`` asks GPT again even if these clips are cached.
+        """
+        if use_captions is None:
+            use_captions = os.getenv("CAPTIONS_FIRST", "false").lower() == "true"
         
         def update_progress(progress: int, step: str):
             if progress_callback:
                 progress_callback(progress, step)
         
+        self.progress_callback = progress_callback
+        self.loop = asyncio.get_event_loop()
+        self.source = as_source(source)
+        youtube_url = self.source.url
+        self.max_duration = max_duration
+        self.use_llm_cache = use_llm_cache
+        if max_duration:
+            self.metrics["truncated_to"] = max_duration
+        if video_info is not None:
+            self.video_info = video_info
+        video_task: Optional["asyncio.Future[None]"] = None
+        
         try:
-            # Step 1: Download video (0-25%)
-            update_progress(0, "Downloading video...")
-            await self._download_youtube_video(youtube_url, str(self.video_path))
-            update_progress(25, "Video downloaded successfully")
+            # A cached transcript for this video lets us identify clips before downloading
+            source_key = self._transcript_source_key()
+            transcript = self._get_cached_transcript(source_key) if source_key else None
+            if transcript is not None:
+                self.metrics["transcript_source"] = "cache"
+            elif source_key and use_captions:
+                update_progress(0, "Checking for existing captions...")
+                transcript = await self._fetch_caption_transcript(youtube_url)
+                if transcript is not None and max_duration:
+                    transcript = transcript.slice(0, max_duration)
+                if transcript is not None:
+                    self.metrics["transcript_source"] = f"captions:{self.metrics['captions']['kind']}"
             
-            # Step 2: Transcribe video (25-50%)
-            update_progress(25, "Transcribing video with AI...")
-            transcript = await self._transcribe_video(str(self.video_path))
-            update_progress(50, "Transcription completed")
+            # Two-phase fetch: audio alone for analysis, then only the sections around the clips
+            two_phase = FETCH_MODE == "two_phase" and source_key is not None
             
-            # Step 3: Process with GPT and identify clips (50-75%)
-            update_progress(50, "Analyzing content and identifying clips...")
-            timestamps = await self._identify_clips(transcript, instructions)
-            update_progress(75, "Clips identified")
+            if transcript is not None:
+                update_progress(25, "Transcript ready")
+                update_progress(50, "Analyzing content and identifying clips...")
+                timestamps = await self._identify_clips(transcript, instructions)
+                update_progress(60, "Clips identified, downloading video...")
+                await self._fetch_clip_video(youtube_url, timestamps, two_phase, (60, 75))
+                update_progress(75, "Video downloaded successfully")
+            else:
+                self.early_map = self._early_map(instructions)
+                
+                def on_window(segments: Transcript, position: float):
+                    duration = self.audio_duration or 1.0
+                    update_progress(25 + int(25 * min(position / duration, 1.0)),
+                                    f"Transcribing video with AI... ({position:.0f}s of {duration:.0f}s)")
+                    if segment_callback and segments:
+                        segment_callback(segments, position, duration)
+                    # Clip identification starts on the part already transcribed
+                    if self.early_map is not None and (self.audio_duration or 0) >= EARLY_MAP_MIN_SECONDS:
+                        self.early_map.feed(segments, position)
+                
+                # Pipelined: transcribe the audio stream while it downloads, unless the video is cached already
+                if (PIPELINED and source_key is not None
+                        and not source_cache.contains(self._source_cache_key(self.source.video_id, "video/mp4"))):
+                    update_progress(0, "Streaming audio into transcription...")
+                    # In full fetch mode the render needs the whole video anyway: download it alongside
+                    if not two_phase:
+                        video_task = asyncio.ensure_future(self._download_video_alongside(youtube_url))
+                    transcript = await self._transcribe_streaming(youtube_url, on_window)
+                    if transcript is not None:
+                        self.metrics["transcript_source"] = "whisper"
+                        self.metrics["transcription_engine"] = self.engine.registry_key
+                        transcript_cache.put(source_key, self.engine.cache_key, self.language, transcript)
+                
+                if transcript is None:
+                    if video_task is not None:
+                        await video_task
+                    # Step 1: Download video, or just its audio (0-25%)
+                    update_progress(0, "Downloading audio..." if two_phase else "Downloading video...")
+                    media_path = await self._fetch_analysis_media(youtube_url, two_phase)
+                    update_progress(25, "Download completed")
+                    
+                    # Without a video ID, the downloaded file's content hash identifies the source
+                    if source_key is None:
+                        loop = asyncio.get_event_loop()
+                        file_hash = await loop.run_in_executor(None, file_sha256, media_path)
+                        source_key = self._limited_key(f"sha256:{file_hash}")
+                        transcript = self._get_cached_transcript(source_key)
+                        if transcript is not None:
+                            self.metrics["transcript_source"] = "cache"
+                
+                if transcript is None:
+                    self.metrics["transcript_source"] = "whisper"
+                    self.metrics["transcription_engine"] = self.engine.registry_key
+                    # Decode the audio once; transcription and duration checks share this buffer
+                    update_progress(25, "Extracting audio...")
+                    await self._extract_audio(media_path)
+                    
+                    # Step 2: Transcribe video (25-50%)
+                    update_progress(25, "Transcribing video with AI...")
+                    transcript = await self._transcribe_video(str(self.audio_path), on_window)
+                    transcript_cache.put(source_key, self.engine.cache_key, self.language, transcript)
+                update_progress(50, "Transcription completed")
+                
+                # Step 3: Process with GPT and identify clips (50-75%)
+                update_progress(50, "Analyzing content and identifying clips...")
+                timestamps = await self._identify_clips(transcript, instructions)
+                update_progress(75, "Clips identified")
+                if video_task is not None:
+                    await video_task
+                # Already downloaded in full unless only the audio was fetched
+                await self._fetch_clip_video(youtube_url, timestamps, two_phase, (75, 75))
             
             # Step 4: Render final video (75-100%)
             update_progress(75, "Rendering final video...")
-            clips_info = await self._render_video(str(self.video_path), timestamps)
+            clips_info = await self._render_video(str(self.video_path), timestamps, transcript)
             update_progress(100, "Video processing completed")
             
             # Verify the output file was created
@@ -168,38 +318,306 @@ class VideoProcessor:
                 "video_path": str(self.output_path),
                 "clips": clips_info,
                 "transcript": transcript,
-                "video_data": video_data_b64 if self.output_path.exists() else None
+                "source": self._source_metadata(),
+                "video_data": video_data_b64 if self.output_path.exists() else None,
+                "metrics": self.metrics
             }
             
         except Exception as e:
+            if video_task is not None and not video_task.done():
+                video_task.cancel()
             self._cleanup_temp_files()
             raise e
     
-    async def _download_youtube_video(self, youtube_url: str, output_path: str):
+    def _transcript_source_key(self) -> Optional[str]:
+        """Stable identity of the source video, if it can be known before downloading"""
+        video_id = self.source.video_id
+        return self._limited_key(f"youtube:{video_id}") if video_id else None
+    
+    def _limited_key(self, source_key: str) -> str:
+        """Transcripts of a truncated video are cached apart from full ones"""
+        return f"{source_key}:first{int(self.max_duration)}s" if self.max_duration else source_key
+    
+    def _get_cached_transcript(self, source_key: str) -> Optional[Transcript]:
+        """Look up a transcript and record the outcome in the job metrics"""
+        transcript = transcript_cache.get(source_key, self.engine.cache_key, self.language)
+        stats = transcript_cache.get_stats()
+        self.metrics["transcript_cache"] = {
+            "result": "hit" if transcript is not None else "miss",
+            "source_key": source_key,
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+        }
+        if transcript is not None:
+            print(f"Transcript cache hit for {source_key}", flush=True)
+        return transcript
+    
+    def _extract_video_info(self, youtube_url: str, cookies_file: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Fetch video metadata (title, duration, formats, caption tracks) without downloading
+        
+        The result is kept on the processor; downloads are run from it with
+        ``process_ie_result`` instead of extracting the same info again.
+        """
+        info_opts = {
+            'quiet': True,
+            'no_warnings': True,
+        }
+        
+        if cookies_file:
+            info_opts['cookiefile'] = cookies_file
+        
+        try:
+            print("Validating YouTube URL...", flush=True)
+            started = time.time()
+            with yt_dlp.YoutubeDL(info_opts) as ydl:
+                info = ydl.extract_info(youtube_url, download=False)
+                print(f"Video title: {info.get('title', 'Unknown')}", flush=True)
+                print(f"Video duration: {info.get('duration', 'Unknown')} seconds", flush=True)
+                self.video_info = ydl.sanitize_info(info)
+            self.metrics["info_extraction_seconds"] = round(time.time() - started, 2)
+        except Exception as e:
+            print(f"Warning: Could not extract video info: {e}", flush=True)
+            # Continue anyway, might still be able to download
+        return self.video_info
+    
+    def _source_metadata(self) -> Optional[Dict[str, Any]]:
+        """Summary of the extracted video info, kept on the job"""
+        info = self.video_info
+        if info is None:
+            return self.source.describe() if self.source else None
+        return {
+            **(self.source.describe() if self.source else {}),
+            "id": info.get("id"),
+            "title": info.get("title"),
+            "uploader": info.get("uploader"),
+            "upload_date": info.get("upload_date"),
+            "duration": info.get("duration"),
+            "chapters": [
+                {"title": chapter.get("title"), "start": chapter.get("start_time"), "end": chapter.get("end_time")}
+                for chapter in info.get("chapters") or []
+            ],
+            "formats": len(info.get("formats") or []),
+            "subtitles": sorted(info.get("subtitles") or {}),
+            "automatic_captions": len(info.get("automatic_captions") or {}),
+        }
+    
+    async def _fetch_caption_transcript(self, youtube_url: str) -> Optional[Transcript]:
+        """Use the video's existing captions as the transcript when they pass the quality check"""
+        def fetch():
+            info = self.video_info or self._extract_video_info(youtube_url, self._create_temp_cookies_file())
+            if info is None:
+                return None, {"used": False, "reason": "video info unavailable"}
+            return fetch_caption_transcript(info, self.language)
+        
+        loop = asyncio.get_event_loop()
+        transcript, report = await loop.run_in_executor(None, fetch)
+        self.metrics["captions"] = report
+        if transcript is None:
+            print(f"Captions not used: {report.get('reason')}", flush=True)
+        else:
+            print(f"Using {report['kind']} captions ({report['segments']} segments)", flush=True)
+        return transcript
+    
+    def _fetch_opts(self) -> Dict[str, Any]:
+        """yt-dlp options for the two-phase fetch"""
+        opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'nocheckcertificate': True,
+            'socket_timeout': 60,
+            'retries': 5,
+            'fragment_retries': 5,
+            'concurrent_fragment_downloads': FRAGMENT_CONCURRENCY,
+        }
+        cookies_file = self._create_temp_cookies_file()
+        if cookies_file:
+            opts['cookiefile'] = cookies_file
+        return opts
+    
+    @contextmanager
+    def _tracked_download(self, progress_range: Optional[Tuple[int, int]], step: str) -> Iterator[Tuple[DownloadLease, list]]:
+        """Bandwidth lease and progress reporting for one download; yields the lease and yt-dlp hooks
+        
+        Without a ``progress_range`` the download runs in the background of another step and reports no percent.
+        """
+        with bandwidth_scheduler.lease(self.job_id) as lease:
+            hooks = [lease.hook]
+            if self.progress_callback and self.loop and progress_range:
+                hooks.append(ProgressBridge(self.loop, self.progress_callback, *progress_range, step).hook)
+            yield lease, hooks
+    
+    def _require_video_info(self, youtube_url: str) -> Dict[str, Any]:
+        info = self.video_info or self._extract_video_info(youtube_url, self._create_temp_cookies_file())
+        if info is None:
+            raise RuntimeError("video info unavailable")
+        return info
+    
+    async def _fetch_analysis_media(self, youtube_url: str, two_phase: bool) -> str:
+        """Download what transcription needs; only the audio stream in two-phase mode"""
+        loop = asyncio.get_event_loop()
+        # A cached full video is better than fetching the audio and then the sections
+        video_id = self.source.video_id
+        if two_phase and not source_cache.contains(self._source_cache_key(video_id, "video/mp4")):
+            def fetch():
+                info = self._require_video_info(youtube_url)
+                with self._tracked_download((0, 25), "Downloading audio...") as (lease, hooks):
+                    opts = {**self._fetch_opts(), 'progress_hooks': hooks}
+                    audio_path = fetch_audio(info, self.temp_dir, opts, self.max_duration)
+                self.metrics.setdefault("throughput", {})["audio"] = lease.summary()
+                return audio_path
+            
+            async def produce() -> str:
+                return await loop.run_in_executor(None, fetch)
+            # Truncated jobs fetch only the admitted start, cached apart from the whole track
+            media_format = f"{AUDIO_FORMAT}:first{int(self.max_duration)}s" if self.max_duration else AUDIO_FORMAT
+            try:
+                audio_path = await self._fetch_source(video_id, media_format, produce, self.temp_dir / "source_audio")
+                self.metrics["fetch"] = {"mode": "two_phase", "audio_bytes": os.path.getsize(audio_path)}
+                print(f"Audio only: {audio_path}", flush=True)
+                return audio_path
+            except Exception as e:
+                print(f"Audio-only fetch failed, downloading the full video: {e}", flush=True)
+        
+        # Already there if it was downloaded alongside a pipelined transcription that failed
+        if not self.video_path.exists():
+            await self._download_full_video(youtube_url, (0, 25))
+        self.metrics["fetch"] = {"mode": "full", "video_bytes": os.path.getsize(self.video_path)}
+        return str(self.video_path)
+    
+    async def _fetch_clip_video(self, youtube_url: str, timestamps: List[Dict[str, float]], two_phase: bool,
+                                progress_range: Tuple[int, int]):
+        """Make the video behind the chosen clips available to the render stage"""
+        if self.video_path.exists():
+            return
+        fetch_metrics = self.metrics.setdefault("fetch", {})
+        loop = asyncio.get_event_loop()
+        if two_phase:
+            def fetch():
+                info = self._require_video_info(youtube_url)
+                sections = plan_sections(timestamps, info.get("duration"))
+                if not sections:
+                    return []
+                with self._tracked_download(progress_range, "Downloading clip sections...") as (lease, hooks):
+                    opts = {**self._fetch_opts(), 'progress_hooks': hooks}
+                    downloaded = fetch_sections(info, sections, self.temp_dir, opts)
+                self.metrics.setdefault("throughput", {})["sections"] = lease.summary()
+                return downloaded
+            try:
+                self.sections = await loop.run_in_executor(None, fetch)
+                fetch_metrics.update({
+                    "mode": "two_phase",
+                    "sections": len(self.sections),
+                    "section_seconds": round(sum(s["end"] - s["start"] for s in self.sections), 2),
+                    "section_bytes": sum(s["bytes"] for s in self.sections),
+                })
+                print(f"Downloaded {len(self.sections)} clip section(s)", flush=True)
+                return
+            except Exception as e:
+                print(f"Ranged clip download failed, downloading the full video: {e}", flush=True)
+                self.sections = None
+        
+        await self._download_full_video(youtube_url, progress_range)
+        fetch_metrics.update({"mode": "full", "video_bytes": os.path.getsize(self.video_path)})
+    
+    @staticmethod
+    def _source_cache_key(video_id: Optional[str], media_format: str) -> str:
+        return f"youtube:{video_id}:{media_format}"
+    
+    async def _fetch_source(self, video_id: Optional[str], media_format: str,
+                            produce: Callable[[], Awaitable[str]], dest_stem: Path) -> str:
+        """Run ``produce`` through the shared source cache when the video ID is known"""
+        if video_id is None:
+            return await produce()
+        path, outcome = await source_cache.fetch(self._source_cache_key(video_id, media_format), produce, dest_stem)
+        self.metrics.setdefault("source_cache", {})[media_format] = outcome
+        print(f"Source cache {outcome} for {video_id} ({media_format})", flush=True)
+        return path
+    
+    async def _download_full_video(self, youtube_url: str, progress_range: Optional[Tuple[int, int]]):
+        """Download the whole video to ``self.video_path``, shared with concurrent jobs for the same video
+        
+        Truncated jobs only download the admitted start of the video.
+        """
+        if isinstance(self.source, FileSource):
+            await self._fetch_direct_source(progress_range)
+            return
+        if self.max_duration:
+            try:
+                await self._download_prefix(youtube_url, progress_range)
+                return
+            except Exception as e:
+                print(f"Prefix download failed, downloading the full video: {e}", flush=True)
+        
+        async def produce() -> str:
+            await self._download_youtube_video(youtube_url, str(self.video_path), progress_range)
+            return str(self.video_path)
+        
+        await self._fetch_source(self.source.video_id, "video/mp4", produce, self.video_path.with_suffix(""))
+    
+    async def _download_prefix(self, youtube_url: str, progress_range: Optional[Tuple[int, int]]):
+        """Download the first ``max_duration`` seconds as one section starting at 0, so clip times are unchanged"""
+        loop = asyncio.get_event_loop()
+        
+        def fetch() -> str:
+            info = self._require_video_info(youtube_url)
+            end = self.max_duration + KEYFRAME_PAD_SECONDS
+            if info.get("duration"):
+                end = min(end, info["duration"])
+            with self._tracked_download(progress_range, "Downloading video...") as (lease, hooks):
+                opts = {**self._fetch_opts(), 'progress_hooks': hooks}
+                section = fetch_sections(info, [(0.0, end)], self.temp_dir, opts)[0]
+            self.metrics.setdefault("throughput", {})["video"] = lease.summary()
+            os.replace(section["path"], self.video_path)
+            self._normalize_container(str(self.video_path))
+            self.metrics["prefix_fetch"] = {"seconds": round(end, 1), "bytes": os.path.getsize(self.video_path)}
+            return str(self.video_path)
+        
+        async def produce() -> str:
+            return await loop.run_in_executor(None, fetch)
+        
+        # Cached apart from the full video, so truncated jobs never pass a prefix off as the whole
+        await self._fetch_source(self.source.video_id, f"video/mp4:first{int(self.max_duration)}s",
+                                 produce, self.video_path.with_suffix(""))
+    
+    async def _download_video_alongside(self, youtube_url: str):
+        """Full video download overlapping pipelined transcription; on failure the render step fetches it again"""
+        started = time.time()
+        try:
+            await self._download_full_video(youtube_url, None)
+        except Exception as e:
+            print(f"Background video download failed, retrying after clip identification: {e}", flush=True)
+            if self.video_path.exists():
+                self.video_path.unlink()
+            return
+        self.metrics["fetch"] = {
+            "mode": "full",
+            "video_bytes": os.path.getsize(self.video_path),
+            "overlapped": True,
+            "seconds": round(time.time() - started, 2),
+        }
+    
+    async def _fetch_direct_source(self, progress_range: Optional[Tuple[int, int]]):
+        """Stream a direct-URL or uploaded source into the job's scratch directory"""
+        def fetch():
+            with self._tracked_download(progress_range, "Receiving video...") as (lease, hooks):
+                self.source.fetch(self.video_path, hooks)
+            self.metrics.setdefault("throughput", {})["video"] = lease.summary()
+        
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, fetch)
+        print(f"Fetched {self.source.kind} source: {self.video_path.stat().st_size} bytes", flush=True)
+    
+    async def _download_youtube_video(self, youtube_url: str, output_path: str,
+                                      progress_range: Optional[Tuple[int, int]] = (0, 25)):
         """Download YouTube video with cookie support and comprehensive 403 error handling"""
         def download():
             # Get cookies (either from file or base64 encoded)
             cookies_file = self._create_temp_cookies_file()
             
-            # First, try to extract video info to validate the URL
-            info_opts = {
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': True,
-            }
-            
-            if cookies_file:
-                info_opts['cookiefile'] = cookies_file
-            
-            try:
-                print("Validating YouTube URL...", flush=True)
-                with yt_dlp.YoutubeDL(info_opts) as ydl:
-                    info = ydl.extract_info(youtube_url, download=False)
-                    print(f"Video title: {info.get('title', 'Unknown')}", flush=True)
-                    print(f"Video duration: {info.get('duration', 'Unknown')} seconds", flush=True)
-            except Exception as e:
-                print(f"Warning: Could not extract video info: {e}", flush=True)
-                # Continue anyway, might still be able to download
+            # First, try to extract video info to validate the URL (skipped if the
+            # caption lookup already fetched it)
+            if self.video_info is None:
+                self._extract_video_info(youtube_url, cookies_file)
             
             # Multiple user agents optimized for Railway/Docker environment
             user_agents = [
@@ -235,16 +653,13 @@ class VideoProcessor:
                 'socket_timeout': 60,  # Increased for Railway
                 'retries': 5,  # More retries for Railway
                 'fragment_retries': 5,
+                'concurrent_fragment_downloads': FRAGMENT_CONCURRENCY,
                 'skip_unavailable_fragments': True,
                 'keepvideo': False,
                 'writesubtitles': False,
                 'writeautomaticsub': False,
                 'sleep_interval': 1,  # Avoid rate limiting
                 'max_sleep_interval': 3,
-                'postprocessors': [{
-                    'key': 'FFmpegVideoConvertor',
-                    'preferedformat': 'mp4',
-                }],
                 'prefer_ffmpeg': True,
                 'ffmpeg_location': 'ffmpeg',
             }
@@ -264,323 +679,590 @@ class VideoProcessor:
             else:
                 print("No cookies file available - some videos may fail to download")
             
-            download_successful = False
+            # The fallback cascade, as named option sets; the scheduler decides the order
+            strategies = []
             
-            # Strategy 1: Try WITHOUT cookies first (since they might be causing issues)
-            print("Strategy 1: Trying WITHOUT cookies...", flush=True)
-            try:
+            # Without cookies first (they might be causing issues), then with them
+            ydl_opts = base_ydl_opts.copy()
+            ydl_opts.pop('cookiefile', None)
+            ydl_opts['user_agent'] = user_agents[0]
+            ydl_opts['format'] = format_strategies[0]
+            ydl_opts['http_headers'] = self._browser_headers(user_agents[0])
+            strategies.append(("no_cookies", ydl_opts))
+            
+            if cookies_file:
                 ydl_opts = base_ydl_opts.copy()
-                ydl_opts.pop('cookiefile', None)  # Remove cookies
                 ydl_opts['user_agent'] = user_agents[0]
                 ydl_opts['format'] = format_strategies[0]
-                ydl_opts['http_headers'] = {
-                    'User-Agent': user_agents[0],
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Accept-Encoding': 'gzip, deflate',
-                    'DNT': '1',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                    'Sec-Fetch-Dest': 'document',
-                    'Sec-Fetch-Mode': 'navigate',
-                    'Sec-Fetch-Site': 'none',
-                    'Sec-Fetch-User': '?1',
-                    'Cache-Control': 'max-age=0',
-                }
-                
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    ydl.download([youtube_url])
-                
-                if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-                    print("Download successful WITHOUT cookies", flush=True)
-                    download_successful = True
-                    return
-            except Exception as e:
-                print(f"Strategy 1 (no cookies) failed: {e}", flush=True)
+                ydl_opts['http_headers'] = self._browser_headers(user_agents[0])
+                strategies.append(("with_cookies", ydl_opts))
             
-            # Strategy 2: Try with cookies (only if available)
-            if cookies_file:
-                print("Strategy 2: Trying with cookies...", flush=True)
-                try:
+            # Different user agents and formats without cookies
+            for i, user_agent in enumerate(user_agents[:3]):
+                for format_strategy in format_strategies[:4]:
                     ydl_opts = base_ydl_opts.copy()
-                    ydl_opts['user_agent'] = user_agents[0]
-                    ydl_opts['format'] = format_strategies[0]
-                    ydl_opts['http_headers'] = {
-                        'User-Agent': user_agents[0],
-                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                        'Accept-Language': 'en-US,en;q=0.5',
-                        'Accept-Encoding': 'gzip, deflate',
-                        'DNT': '1',
-                        'Connection': 'keep-alive',
-                        'Upgrade-Insecure-Requests': '1',
-                        'Sec-Fetch-Dest': 'document',
-                        'Sec-Fetch-Mode': 'navigate',
-                        'Sec-Fetch-Site': 'none',
-                        'Sec-Fetch-User': '?1',
-                        'Cache-Control': 'max-age=0',
-                    }
-                    
-                    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                        ydl.download([youtube_url])
-                    
-                    if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-                        print("Download successful with cookies", flush=True)
-                        download_successful = True
-                        return
-                except Exception as e:
-                    print(f"Strategy 2 (with cookies) failed: {e}", flush=True)
-                
-            # Strategy 3: Try different user agents and formats without cookies
-            print("Strategy 3: Trying different user agents and formats...", flush=True)
-            for user_agent in user_agents[:3]:  # Try first 3 user agents
-                for format_strategy in format_strategies[:4]:  # Try first 4 format strategies
-                    try:
-                        ydl_opts = base_ydl_opts.copy()
-                        ydl_opts.pop('cookiefile', None)  # Remove cookies
-                        ydl_opts['user_agent'] = user_agent
-                        ydl_opts['format'] = format_strategy
-                        ydl_opts['http_headers'] = {
-                            'User-Agent': user_agent,
-                            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                            'Accept-Language': 'en-US,en;q=0.5',
-                            'Accept-Encoding': 'gzip, deflate',
-                            'DNT': '1',
-                            'Connection': 'keep-alive',
-                            'Upgrade-Insecure-Requests': '1',
-                            'Sec-Fetch-Dest': 'document',
-                            'Sec-Fetch-Mode': 'navigate',
-                            'Sec-Fetch-Site': 'none',
-                            'Sec-Fetch-User': '?1',
-                            'Cache-Control': 'max-age=0',
-                        }
-                        
-                        print(f"Trying user agent: {user_agent[:50]}... with format: {format_strategy}", flush=True)
-                        
-                        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                            ydl.download([youtube_url])
-                        
-                        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-                            print(f"Download successful with user agent: {user_agent[:50]}... and format: {format_strategy}", flush=True)
-                            download_successful = True
-                            return
-                    except Exception as e:
-                        print(f"Failed with user agent {user_agent[:50]}... and format {format_strategy}: {e}", flush=True)
-                        continue
+                    ydl_opts.pop('cookiefile', None)
+                    ydl_opts['user_agent'] = user_agent
+                    ydl_opts['format'] = format_strategy
+                    ydl_opts['http_headers'] = self._browser_headers(user_agent)
+                    strategies.append((f"ua{i + 1}:{format_strategy}", ydl_opts))
             
-            # Strategy 4: Try with different extraction methods
-            print("Strategy 4: Trying different extraction methods...", flush=True)
+            # Different extraction methods
             extraction_methods = [
-                {'extractor_args': {'youtube': {'skip': ['dash', 'live']}}},
-                {'extractor_args': {'youtube': {'player_client': ['android']}}},
-                {'extractor_args': {'youtube': {'player_client': ['web']}}},
-                {'extractor_args': {'youtube': {'player_client': ['tv_embedded']}}},
+                ("extractor:skip_dash", {'extractor_args': {'youtube': {'skip': ['dash', 'live']}}}),
+                ("extractor:android", {'extractor_args': {'youtube': {'player_client': ['android']}}}),
+                ("extractor:web", {'extractor_args': {'youtube': {'player_client': ['web']}}}),
+                ("extractor:tv_embedded", {'extractor_args': {'youtube': {'player_client': ['tv_embedded']}}}),
             ]
+            for name, method in extraction_methods:
+                ydl_opts = base_ydl_opts.copy()
+                ydl_opts.pop('cookiefile', None)
+                ydl_opts['user_agent'] = user_agents[0]
+                ydl_opts['format'] = 'best[height<=480]/best'
+                ydl_opts.update(method)
+                strategies.append((name, ydl_opts))
+            
+            # Diagnostic-proven minimal options (exact config that worked locally)
+            strategies.append(("minimal", {
+                'outtmpl': output_path,
+                'format': 'worst[height<=360]',  # Use exact format that worked in diagnostics
+                'quiet': True,  # Less verbose for Railway
+                'socket_timeout': 30,
+                'retries': 3,
+                'nocheckcertificate': True,
+                'concurrent_fragment_downloads': FRAGMENT_CONCURRENCY,
+            }))
+            
+            # Absolute last resort - ultra minimal
+            strategies.append(("ultra_minimal", {
+                'outtmpl': output_path,
+                'format': 'worst',
+                'quiet': True,
+            }))
+            
+            options = dict(strategies)
+            # Player-client strategies change what extraction returns, so they cannot reuse the info
+            reextract = {name for name, _ in extraction_methods}
+            ordered = download_scheduler.order([name for name, _ in strategies])
+            print(f"Download strategy order: {', '.join(ordered)}", flush=True)
             
-            for method in extraction_methods:
+            def try_download(name: str, opts: Dict[str, Any], reuse: bool) -> bool:
+                lease.new_attempt()
                 try:
-                    ydl_opts = base_ydl_opts.copy()
-                    ydl_opts.pop('cookiefile', None)
-                    ydl_opts['user_agent'] = user_agents[0]
-                    ydl_opts['format'] = 'best[height<=480]/best'
-                    ydl_opts.update(method)
-                    
-                    print(f"Trying extraction method: {method}", flush=True)
-                    
-                    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                        ydl.download([youtube_url])
-                    
-                    if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-                        print(f"Download successful with extraction method: {method}", flush=True)
-                        download_successful = True
-                        return
+                    with yt_dlp.YoutubeDL(opts) as ydl:
+                        if reuse:
+                            # Format selection and download straight from the extracted info
+                            ydl.process_ie_result(copy.deepcopy(self.video_info), download=True)
+                        else:
+                            ydl.download([youtube_url])
+                    return os.path.exists(output_path) and os.path.getsize(output_path) > 0
                 except Exception as e:
-                    print(f"Extraction method failed: {e}", flush=True)
-                    continue
+                    print(f"Download strategy {name} failed{' on reused info' if reuse else ''}: {e}", flush=True)
+                    return False
             
-            # Strategy 5: Try with diagnostic-proven minimal options (exact config that worked locally)
-            print("Strategy 5: Trying with diagnostic-proven minimal config...", flush=True)
-            try:
-                minimal_opts = {
-                    'outtmpl': output_path,
-                    'format': 'worst[height<=360]',  # Use exact format that worked in diagnostics
-                    'quiet': True,  # Less verbose for Railway
-                    'socket_timeout': 30,
-                    'retries': 3,
-                    'nocheckcertificate': True,
-                }
-                
-                with yt_dlp.YoutubeDL(minimal_opts) as ydl:
-                    ydl.download([youtube_url])
-                
-                if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-                    print("Download successful with diagnostic-proven config", flush=True)
-                    download_successful = True
-                    return
-            except Exception as e:
-                print(f"Diagnostic-proven config failed: {e}", flush=True)
-            
-            # Strategy 6: Absolute last resort - ultra minimal
-            print("Strategy 6: Ultra minimal last resort...", flush=True)
-            try:
-                ultra_minimal_opts = {
-                    'outtmpl': output_path,
-                    'format': 'worst',
-                    'quiet': True,
-                }
-                
-                with yt_dlp.YoutubeDL(ultra_minimal_opts) as ydl:
-                    ydl.download([youtube_url])
-                
-                if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-                    print("Download successful with ultra minimal config", flush=True)
-                    download_successful = True
-                    return
-            except Exception as e:
-                print(f"Ultra minimal config failed: {e}", flush=True)
+            # One bandwidth share for the whole cascade; failed attempts count towards it too
+            with self._tracked_download(progress_range, "Downloading video...") as (lease, hooks):
+                reuse_info = self.video_info is not None
+                for attempt, name in enumerate(ordered, 1):
+                    print(f"Trying download strategy {name}...", flush=True)
+                    reused = reuse_info and name not in reextract
+                    opts = {**options[name], 'progress_hooks': hooks}
+                    if PREFER_REMUX:
+                        opts['format'] = prefer_remuxable(opts['format'])
+                    started = time.time()
+                    succeeded = try_download(name, opts, reused)
+                    if reused and not succeeded:
+                        # Stream URLs in the info may have expired: retry the same strategy with a fresh
+                        # extraction and only judge it by that; later attempts extract afresh too
+                        reuse_info = reused = False
+                        started = time.time()
+                        succeeded = try_download(name, opts, False)
+                    elapsed = time.time() - started
+                    download_scheduler.record(name, succeeded, elapsed)
+                    
+                    if succeeded:
+                        print(f"Download successful with strategy {name}", flush=True)
+                        self.metrics["download_strategy"] = {
+                            "name": name,
+                            "attempts": attempt,
+                            "seconds": round(elapsed, 2),
+                            "reused_info": reused,
+                        }
+                        self.metrics.setdefault("throughput", {})["video"] = lease.summary()
+                        self._normalize_container(output_path)
+                        return
             
-            # If all strategies failed
-            if not download_successful:
-                raise Exception("All download strategies failed. This video may be restricted or unavailable.")
+            raise Exception("All download strategies failed. This video may be restricted or unavailable.")
         
         # Run download in thread pool to avoid blocking
         loop = asyncio.get_event_loop()
         await loop.run_in_executor(None, download)
     
-    async def _transcribe_video(self, video_path: str) -> List[Tuple[str, float, float]]:
-        """Transcribe video using Whisper"""
-        def transcribe():
-            start_time = time.time()
-            
-            # Check if video file exists
-            if not os.path.exists(video_path):
-                raise FileNotFoundError(f"Video file not found: {video_path}")
-            
-            # Check file size
-            file_size = os.path.getsize(video_path)
-            if file_size == 0:
-                raise ValueError(f"Video file is empty: {video_path}")
+    def _normalize_container(self, path: str):
+        """Remux (or, as a last resort, transcode) the download into mp4 and record what it cost"""
+        try:
+            report = normalize_to_mp4(path)
+        except Exception as e:
+            # Downstream ffmpeg reads any container, so a failed conversion is not fatal
+            print(f"Warning: could not convert {path} to mp4: {e}", flush=True)
+            self.metrics["transcode"] = {"action": "failed", "error": str(e)}
+            return
+        self.metrics["transcode"] = report
+        print(f"Container {report['container']} ({report['video_codec']}/{report['audio_codec']}): "
+              f"{report['action']} in {report['seconds']}s", flush=True)
+    
+    @staticmethod
+    def _browser_headers(user_agent: str) -> Dict[str, str]:
+        """Request headers matching a desktop browser with the given user agent"""
+        return {
+            'User-Agent': user_agent,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Accept-Encoding': 'gzip, deflate',
+            'DNT': '1',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+            'Sec-Fetch-Dest': 'document',
+            'Sec-Fetch-Mode': 'navigate',
+            'Sec-Fetch-Site': 'none',
+            'Sec-Fetch-User': '?1',
+            'Cache-Control': 'max-age=0',
+        }
+    
+    async def _extract_audio(self, video_path: str):
+        """Decode the audio track once to 16 kHz mono PCM and memory-map it"""
+        # Check if video file exists
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+        
+        # Check file size
+        file_size = os.path.getsize(video_path)
+        if file_size == 0:
+            raise ValueError(f"Video file is empty: {video_path}")
+        
+        print(f"Video file size: {file_size} bytes", flush=True)
+        print(f"Video file path: {video_path}", flush=True)
+        
+        start_time = time.time()
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, extract_pcm, video_path, str(self.audio_path), self.max_duration)
+        self.audio = open_pcm(str(self.audio_path))
+        self.audio_duration = len(self.audio) / SAMPLE_RATE
+        print(f"Extracted {self.audio_duration:.1f}s of audio "
+              f"({self.audio_path.stat().st_size} bytes) in {time.time() - start_time:.2f}s", flush=True)
+    
+    async def _transcribe_video(self, audio_path: str,
+                                on_window: Optional[Callable[[Transcript, float], None]] = None
+                                ) -> Transcript:
+        """Transcribe the extracted audio using Whisper, window by window
+        
+        ``on_window`` receives each window's segments and the audio position
+        (in seconds) transcribed so far, as soon as the window completes; with
+        streaming off, it receives the whole transcript once at the end.
+        """
+        if self.audio is None:
+            raise ValueError("Audio has not been extracted")
+        
+        start_time = time.time()
+        try:
+            print(f"Starting transcription with {self.engine.name} ({self.engine.model_name})...", flush=True)
+            # Only speech is sent to the model; timestamps are mapped back afterwards
+            asr_path, samples, time_map = await self._speech_only_audio(audio_path)
+            duration = len(samples) / SAMPLE_RATE
             
-            print(f"Video file size: {file_size} bytes", flush=True)
-            print(f"Video file path: {video_path}", flush=True)
-            print(f"Video file absolute path: {os.path.abspath(video_path)}", flush=True)
+            if should_chunk(duration, transcription_pool.workers):
+                windows = plan_windows(samples, WINDOW_SECONDS, WINDOW_OVERLAP_SECONDS)
+            else:
+                windows = plan_windows(samples, max(duration, 1.0), 0)
+            print(f"Transcribing {duration:.1f}s of audio in {len(windows)} window(s)", flush=True)
             
-            # Check if file is readable
-            try:
-                with open(video_path, 'rb') as f:
-                    # Try to read first few bytes to verify file is accessible
-                    f.read(1024)
-                print("Video file is readable", flush=True)
-            except Exception as e:
-                raise IOError(f"Cannot read video file {video_path}: {e}")
+            async def transcribe_window(start: int, end: int):
+                return await self._transcribe_window(asr_path, samples, start, end)
             
+            # Keep every worker busy plus one window queued; in-process runs one at a time
+            max_in_flight = transcription_pool.workers + 1 if transcription_pool.enabled else 1
+            parts = []
+            async for window, segments in stream_windows(windows, transcribe_window, max_in_flight):
+                if time_map is not None:
+                    segments = segments.map_times(time_map.to_original)
+                parts.append(segments)
+                if on_window and STREAM_WINDOWS:
+                    position = window["own_end"] / SAMPLE_RATE
+                    on_window(segments, time_map.to_original(position) if time_map else position)
+            transcript = Transcript.concat(parts)
+            if on_window and not STREAM_WINDOWS:
+                on_window(transcript, self.audio_duration or duration)
+            print("Whisper transcription complete.", flush=True)
+        except Exception as e:
+            print(f"Transcription failed: {e}", flush=True)
+            raise
+        
+        end_time = time.time()
+        print("transcription took" + str(end_time - start_time) + "seconds")
+        print(transcript)
+        return transcript
+    
+    async def _transcribe_streaming(self, youtube_url: str,
+                                    on_window: Callable[[Transcript, float], None]) -> Optional[Transcript]:
+        """Decode the audio stream as it downloads and transcribe each window as soon as it has arrived
+        
+        The voice-activity pass is skipped, since it needs the whole audio up
+        front. Returns None if the stream cannot be used or breaks off; the
+        caller then downloads first and transcribes afterwards.
+        """
+        loop = asyncio.get_event_loop()
+        pcm_path = str(self.audio_path)
+        started = time.time()
+        try:
+            info = await loop.run_in_executor(None, self._require_video_info, youtube_url)
+            url, headers, byte_rate = await loop.run_in_executor(None, audio_stream_url, info)
+        except Exception as e:
+            print(f"Audio stream unavailable, downloading first: {e}", flush=True)
+            return None
+        
+        process = start_pcm_stream(url, pcm_path, headers, self.max_duration)
+        # Until the stream ends, progress is measured against the advertised duration
+        expected = info.get("duration")
+        self.audio_duration = min(expected, self.max_duration) if expected and self.max_duration else expected
+        first_window_seconds = None
+        transcribed = 0.0
+        parts = []
+        # ffmpeg reads the stream itself, so the lease counts the bytes behind the decoded audio
+        # and keeps the stream's share of the budget, but cannot make ffmpeg wait
+        lease = bandwidth_scheduler.lease(self.job_id)
+        counted = 0
+        
+        def count_received() -> int:
+            nonlocal counted
+            received = int(pcm_length(pcm_path) / SAMPLE_RATE * byte_rate)
+            if received > counted:
+                lease.count(received - counted)
+                counted = received
+            return counted
+        
+        async def report_stream():
+            duration = self.audio_duration or 0.0
+            total = int(duration * byte_rate) or None
+            while process.poll() is None:
+                received = count_received()
+                if self.progress_callback and byte_rate:
+                    progress = 25 + int(25 * min(transcribed / duration, 1.0)) if transcribed and duration else 0
+                    speed = round(lease.throughput()) or None
+                    details = {"progress": progress, "downloaded_bytes": received, "total_bytes": total,
+                               "speed": speed, "eta": round((total - received) / speed) if total and speed else None}
+                    step = f"Streaming audio into transcription... {received / 1e6:.1f} MB"
+                    if total:
+                        step += f" of {total / 1e6:.1f} MB"
+                    self.progress_callback(progress, step, details)
+                await asyncio.sleep(0.5)
+        
+        with lease:
+            reporter = asyncio.ensure_future(report_stream())
             try:
-                print("Starting Whisper transcription...", flush=True)
-                model = whisper.load_model("base")
-                print("Model loaded.", flush=True)
-                result = model.transcribe(video_path, language="en")
-                print("Whisper transcription complete.", flush=True)
-                ...
+                windows = plan_windows_live(
+                    lambda: pcm_length(pcm_path), lambda: process.poll() is not None,
+                    lambda length: open_pcm(pcm_path, length), WINDOW_SECONDS, WINDOW_OVERLAP_SECONDS,
+                )
+                
+                async def transcribe_window(start: int, end: int):
+                    return await self._transcribe_window(pcm_path, open_pcm(pcm_path, end), start, end)
+                
+                max_in_flight = transcription_pool.workers + 1 if transcription_pool.enabled else 1
+                async for window, segments in stream_windows(windows, transcribe_window, max_in_flight):
+                    if first_window_seconds is None:
+                        first_window_seconds = time.time() - started
+                    parts.append(segments)
+                    transcribed = window["own_end"] / SAMPLE_RATE
+                    on_window(segments, transcribed)
+                if process.wait() != 0:
+                    with open(f"{pcm_path}.log", "r", errors="ignore") as log:
+                        raise RuntimeError(f"ffmpeg exited with {process.returncode}: {log.read()[-300:]}")
             except Exception as e:
-                print(f"Transcription failed: {e}", flush=True)
-                raise
-            
-            transcript = []
-            for segment in result['segments']:
-                transcript.append((segment['text'], segment['start'], segment['end']))
-            
-            end_time = time.time()
-            print("transcription took" + str(end_time - start_time) + "seconds")
-            print(transcript)
-            return transcript
+                print(f"Pipelined transcription failed, downloading first instead: {e}", flush=True)
+                count_received()
+                if self.early_map is not None:
+                    self.early_map.cancel()
+                self.metrics["pipeline"] = {"fallback": str(e), "stream": self._stream_summary(lease, byte_rate)}
+                self.audio_duration = None
+                return None
+            finally:
+                reporter.cancel()
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+                count_received()
+        
+        self.audio = open_pcm(pcm_path)
+        self.audio_duration = len(self.audio) / SAMPLE_RATE
+        self.metrics["pipeline"] = {
+            "seconds": round(time.time() - started, 2),
+            "first_window_seconds": round(first_window_seconds or 0.0, 2),
+            "audio_seconds": round(self.audio_duration, 2),
+            "windows": len(parts),
+            "stream": self._stream_summary(lease, byte_rate),
+        }
+        print(f"Pipelined transcription of {self.audio_duration:.1f}s of audio in "
+              f"{self.metrics['pipeline']['seconds']}s", flush=True)
+        return Transcript.concat(parts)
+    
+    @staticmethod
+    def _stream_summary(lease: DownloadLease, byte_rate: float) -> Dict[str, Any]:
+        """Bytes the audio stream took, estimated from the audio decoded; the stream is never throttled"""
+        return {**lease.summary(), "estimated": True, "byte_rate": round(byte_rate), "throttled": False}
+    
+    async def _speech_only_audio(self, audio_path: str) -> Tuple[str, np.ndarray, Optional[TimeMap]]:
+        """Run the voice-activity pre-pass and compact the audio down to speech regions
+        
+        Returns the PCM path and samples to transcribe, plus the map back to the
+        original timeline (None when the full audio is used).
+        """
+        if not VAD_ENABLED:
+            return audio_path, self.audio, None
         
-        # Run transcription in thread pool
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, transcribe)
+        regions = await loop.run_in_executor(None, speech_regions, self.audio)
+        speech_samples = sum(end - start for start, end in regions)
+        skipped_ratio = 1 - speech_samples / max(1, len(self.audio))
+        self.metrics["vad"] = {
+            "speech_seconds": round(speech_samples / SAMPLE_RATE, 2),
+            "skipped_seconds": round((len(self.audio) - speech_samples) / SAMPLE_RATE, 2),
+            "skipped_ratio": round(skipped_ratio, 4),
+            "regions": len(regions),
+        }
+        print(f"Voice activity: {len(regions)} speech region(s), skipping {skipped_ratio:.1%} of the audio", flush=True)
+        
+        # Nothing detected is more likely a VAD miss than a silent video; transcribe everything
+        if not regions or skipped_ratio < VAD_MIN_SKIP_RATIO:
+            self.metrics["vad"]["applied"] = False
+            return audio_path, self.audio, None
+        
+        speech_path = self.temp_dir / "speech.f32"
+        time_map = await loop.run_in_executor(None, compact_speech, self.audio, regions, str(speech_path))
+        self.metrics["vad"]["applied"] = True
+        return str(speech_path), open_pcm(str(speech_path)), time_map
     
-    async def _identify_clips(self, transcript: List[Tuple[str, float, float]], instructions: str) -> List[Dict[str, float]]:
-        """Use GPT to identify relevant clips"""
-        def process_with_gpt():
-            user_prompt = instructions if instructions else "Find the most engaging and important moments in this video"
-            
-            prompt = f"""
-            Here is the transcript of the video: {transcript}
-            
-            Instructions: {user_prompt}
-            
-            Please identify the most relevant time intervals in the video based on the instructions.
-            Return only the timestamps in this exact format: [{{'start': 12.4, 'end': 54.6}}, ...]
-            """
-            
-            client = OpenAI(api_key=self.openai_key)
-            completion = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """
-You are a precise and efficient video clipping assistant.
+    async def _transcribe_window(self, pcm_path: str, samples: np.ndarray,
+                                 start: int, end: int) -> Transcript:
+        """Transcribe samples ``[start, end)`` of a PCM buffer"""
+        if transcription_pool.enabled:
+            # Workers map the same file; only the path and sample range are sent
+            return await transcription_pool.transcribe_window(
+                pcm_path, start, end, language=self.language, engine_name=self.engine.name
+            )
+        # Run transcription in thread pool on a view of the memory-mapped buffer
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None, self.engine.transcribe, samples[start:end], self.language
+        )
+    
+    async def _identify_clips(self, transcript: Transcript, instructions: str) -> List[Dict[str, float]]:
+        """Use GPT to identify relevant clips, or reuse the clips found for the same transcript and instructions"""
+        try:
+            return await self._identify_clips_cached(transcript, instructions)
+        finally:
+            # Early map windows that map-reduce did not take over are no longer needed
+            if self.early_map is not None:
+                self.early_map.cancel()
+
+    def _early_map(self, instructions: str) -> Optional[EarlyMap]:
+        """Early map windows for requests that will be mapped over the whole transcript
+
+        Targeted requests are excluded, since retrieval sends only part of
+        the transcript and its windows differ.
+        """
+        user_prompt = instructions if instructions else DEFAULT_INSTRUCTIONS
+        if (not EARLY_MAP or MAP_REDUCE_MODE in ("false", "off", "0")
+                or (RETRIEVAL_ENABLED and query_terms(user_prompt))):
+            return None
+        return EarlyMap(lambda window: self._map_window(window, user_prompt))
+
+    async def _identify_clips_cached(self, transcript: Transcript, instructions: str) -> List[Dict[str, float]]:
+        user_prompt = instructions if instructions else DEFAULT_INSTRUCTIONS
+        started = time.time()
+        if not LLM_CACHE_ENABLED:
+            return await self._identify_clips_uncached(transcript, user_prompt)
+        cache_key = llm_cache.make_key(transcript_hash(transcript), user_prompt, CLIP_MODEL, PROMPT_VERSION)
+        if self.use_llm_cache:
+            timestamps = llm_cache.get(cache_key)
+            lookup_ms = round((time.time() - started) * 1000, 1)
+            self.metrics["llm_cache"] = {"result": "hit" if timestamps else "miss", "lookup_ms": lookup_ms}
+            if timestamps:
+                print(f"Clip cache hit in {lookup_ms} ms", flush=True)
+                self.metrics["clip_identification"] = {"mode": "cache", "clips": len(timestamps)}
+                return timestamps
+        else:
+            self.metrics["llm_cache"] = {"result": "bypass"}
+        timestamps = await self._identify_clips_uncached(transcript, user_prompt)
+        # Bypassing requests refresh the entry too; results missing failed map windows are not kept
+        if timestamps and not self.metrics.get("clip_identification", {}).get("failed_windows"):
+            llm_cache.put(cache_key, timestamps)
+        return timestamps
+
+    async def _identify_clips_uncached(self, transcript: Transcript, user_prompt: str) -> List[Dict[str, float]]:
+        filtered, ranges = None, []
+        if RETRIEVAL_ENABLED:
+            # Targeted requests only need the windows that mention their topic
+            started = time.time()
+            filtered, ranges, retrieval_report = filter_transcript(transcript, user_prompt)
+            retrieval_report["ms"] = round((time.time() - started) * 1000, 1)
+            self.metrics["retrieval"] = retrieval_report
+        if filtered is not None:
+            print(f"Retrieval: sending {len(filtered)} of {len(transcript)} segments "
+                  f"({self.metrics['retrieval']['kept_share']:.0%} of the video)", flush=True)
+            timestamps = clamp_to_ranges(await self._ask_for_clips(filtered, user_prompt, excerpt=True), ranges)
+            if not timestamps:
+                # Nothing usable in the excerpt: the match may have been lexical only
+                print("Retrieval: no clips within the sent windows, retrying with the full transcript", flush=True)
+                self.metrics["retrieval"]["fallback"] = True
+                timestamps = await self._ask_for_clips(transcript, user_prompt)
+        else:
+            timestamps = await self._ask_for_clips(transcript, user_prompt)
+        if not timestamps:
+            # Rendering nothing would leave the job without an output video
+            raise ValueError("No clips matching the instructions were found in this video")
+        return timestamps
+
+    async def _ask_for_clips(self, transcript: Transcript, user_prompt: str, excerpt: bool = False) -> List[Dict[str, float]]:
+        started = time.time()
+        # Compact "[start] text" lines, merged and trimmed to fit the token budget
+        transcript_text, prompt_report = build_transcript_block(transcript)
+        if should_map_reduce(prompt_report, PROMPT_LINE_SECONDS):
+            return await self._identify_clips_map_reduce(transcript, user_prompt, excerpt)
+
+        self.metrics["prompt"] = prompt_report
+        print(f"Prompt transcript: {prompt_report['lines']} lines, ~{prompt_report['tokens']} tokens", flush=True)
+        content = await self._complete(SYSTEM_PROMPT, build_prompt(transcript_text, user_prompt, excerpt=excerpt))
+        print("GPT RESPONSE:", content, flush=True)
+        timestamps = parse_intervals(content)
+        self.metrics["clip_identification"] = {
+            "mode": "single",
+            "clips": len(timestamps),
+            "seconds": round(time.time() - started, 2),
+        }
+        return timestamps
+
+    async def _identify_clips_map_reduce(self, transcript: Transcript, user_prompt: str,
+                                         excerpt: bool = False) -> List[Dict[str, float]]:
+        """Find candidates in overlapping windows concurrently, then merge and rank them"""
+        started = time.time()
+        windows = split_transcript(transcript)
+        print(f"Identifying clips in {len(windows)} windows ({MAP_CONCURRENCY} at a time)", flush=True)
+        reused = 0
 
-Given a transcript of a video and a user request, your job is to extract the most relevant time intervals that match the intent of the request.
+        async def map_window(window: Transcript) -> Tuple[List[Dict[str, float]], float]:
+            nonlocal reused
+            early = self.early_map.take(window) if self.early_map is not None and not excerpt else None
+            if early is not None:
+                reused += 1
+                return await early
+            return await self._map_window(window, user_prompt, excerpt)
 
-Provide just enough context for the user to understand what's happening, but avoid unnecessary filler. Be decisive—separate clips only when the topic, speaker, or scene clearly shifts. Minimize the number of clips while maintaining clarity.
+        results = await asyncio.gather(*(map_window(window) for window in windows), return_exceptions=True)
+        candidates: List[Dict[str, float]] = []
+        window_seconds: List[float] = []
+        failed = 0
+        for window, result in zip(windows, results):
+            if isinstance(result, Exception):
+                failed += 1
+                print(f"Window {window.starts[0]:.0f}s failed: {result}", flush=True)
+                continue
+            candidates.extend(result[0])
+            window_seconds.append(result[1])
+        if windows and failed == len(windows):
+            raise results[0]
 
-Return only a list of timestamp dictionaries in this exact format:
-[{'start': 12.4, 'end': 54.6}, {'start': 110.2, 'end': 132.0}]
+        timestamps = reduce_candidates(candidates)
+        self.metrics["clip_identification"] = {
+            "mode": "map_reduce",
+            "windows": len(windows),
+            "failed_windows": failed,
+            "early_windows": reused,
+            "candidates": len(candidates),
+            "clips": len(timestamps),
+            "seconds": round(time.time() - started, 2),
+            "slowest_window_seconds": round(max(window_seconds, default=0.0), 2),
+        }
+        print(f"Map-reduce: {len(candidates)} candidates from {len(windows)} windows -> {len(timestamps)} clips", flush=True)
+        return timestamps
 
-Do not include any explanation or commentary—just the list of relevant timestamp ranges.
-"""
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
+    async def _map_window(self, window: Transcript, user_prompt: str,
+                          excerpt: bool = False) -> Tuple[List[Dict[str, float]], float]:
+        """Scored candidates in one map window, and the seconds the request took"""
+        if self._map_semaphore is None:
+            self._map_semaphore = asyncio.Semaphore(MAP_CONCURRENCY)
+        transcript_text, _ = build_transcript_block(window)
+        async with self._map_semaphore:
+            started = time.time()
+            content = await self._complete(MAP_SYSTEM_PROMPT, build_prompt(transcript_text, user_prompt, scored=True, excerpt=excerpt))
+            return parse_intervals(content), time.time() - started
+
+    async def _complete(self, system_prompt: str, prompt: str) -> str:
+        """One chat completion through the shared client; tokens and request time add up in ``metrics.llm``"""
+        usage: Dict[str, int] = {}
+        started = time.time()
+        try:
+            return await llm_client.complete(
+                [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt}
                 ],
+                model=CLIP_MODEL,
                 max_tokens=500,
-                temperature=0.1
+                temperature=0.1,
+                usage=usage
             )
-            
-            print("GPT RESPONSE:", completion.choices[0].message.content, flush=True)
-            
-            # Extract timestamps
-            match = re.search(r"\[\s*{.*?}\s*\]", completion.choices[0].message.content, re.DOTALL)
-            if not match:
-                raise ValueError("No valid timestamp list found in GPT response")
-            
-            return ast.literal_eval(match.group(0))
-        
-        # Run GPT processing in thread pool
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, process_with_gpt)
+        finally:
+            llm = self.metrics.setdefault("llm", {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                                                  "request_seconds": 0.0})
+            llm["requests"] += 1
+            # Servers that do not report usage get the local estimate
+            llm["prompt_tokens"] += usage.get("prompt_tokens") or estimate_tokens(system_prompt + prompt)
+            llm["completion_tokens"] += usage.get("completion_tokens", 0)
+            llm["request_seconds"] = round(llm["request_seconds"] + time.time() - started, 2)
     
-    async def _render_video(self, video_path: str, timestamps: List[Dict[str, float]]) -> List[Dict[str, Any]]:
+    async def _render_video(self, video_path: str, timestamps: List[Dict[str, float]],
+                            transcript: Optional[Transcript] = None) -> List[Dict[str, Any]]:
         """Render the final video with identified clips using ffmpeg for fast stitching"""
         def render():
             clips_info = []
             temp_clips = []
             concat_list_path = self.temp_dir / "concat_list.txt"
-            video_duration = None
+            video_duration = self.audio_duration or (self.video_info or {}).get("duration")
 
-            # Get video duration using ffprobe
-            try:
-                import json
-                result = subprocess.run([
-                    "ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "json", str(video_path)
-                ], capture_output=True, text=True)
-                video_duration = float(json.loads(result.stdout)["format"]["duration"])
-            except Exception:
-                video_duration = None
+            # Get video duration using ffprobe when neither extracted audio nor metadata has it
+            if video_duration is None:
+                try:
+                    import json
+                    result = subprocess.run([
+                        "ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "json", str(video_path)
+                    ], capture_output=True, text=True)
+                    video_duration = float(json.loads(result.stdout)["format"]["duration"])
+                except Exception:
+                    video_duration = None
 
             for i, timestamp in enumerate(timestamps):
-                start_time = max(0, timestamp['start'])
-                end_time = min(timestamp['end'], video_duration) if video_duration else timestamp['end']
+                start_time, end_time = timestamp['start'], timestamp['end']
+                # Word timestamps let cuts land between words instead of mid-word
+                if transcript is not None and transcript.has_words:
+                    start_time, end_time = transcript.snap(start_time, end_time)
+                start_time = max(0, start_time)
+                end_time = min(end_time, video_duration) if video_duration else end_time
                 if end_time <= start_time:
                     continue  # skip invalid clips
+                # In two-phase mode each clip is cut from the downloaded section around it
+                source, offset = video_path, 0.0
+                if self.sections is not None:
+                    section = locate_section(self.sections, start_time, end_time)
+                    if section is None:
+                        print(f"No downloaded section covers clip {start_time:.1f}s - {end_time:.1f}s, skipping", flush=True)
+                        continue
+                    source, offset = section["path"], section["start"]
                 out_clip = self.temp_dir / f"clip_{i+1}.mp4"
                 temp_clips.append(out_clip)
                 # ffmpeg command to extract subclip
                 cmd = [
-                    "ffmpeg", "-y", "-i", str(video_path),
-                    "-ss", str(start_time), "-to", str(end_time),
+                    "ffmpeg", "-y", "-i", str(source),
+                    "-ss", str(start_time - offset), "-to", str(end_time - offset),
                     "-avoid_negative_ts", "make_zero", str(out_clip)
                 ]
                 subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark chunked parallel transcription: wall time against window count
+on a synthetic long input.
+
+Usage: python benchmark_chunked_transcription.py [minutes] [window counts...]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from audio import SAMPLE_RATE
+from chunked_transcription import plan_windows, transcribe_windows
+from transcription_pool import TranscriptionPool
+
+
+def synthesize_audio(minutes: float, seed: int = 0) -> np.ndarray:
+    """Speech-like bursts of modulated tones separated by short pauses"""
+    rng = np.random.default_rng(seed)
+    total = int(minutes * 60 * SAMPLE_RATE)
+    audio = np.zeros(total, dtype=np.float32)
+    position = 0
+    while position < total:
+        burst = int(rng.uniform(1.5, 6.0) * SAMPLE_RATE)
+        t = np.arange(min(burst, total - position)) / SAMPLE_RATE
+        pitch = rng.uniform(110, 240)
+        envelope = 0.5 * (1 + np.sin(2 * np.pi * rng.uniform(3, 6) * t))
+        tone = np.sin(2 * np.pi * pitch * t) + 0.3 * np.sin(2 * np.pi * 2.7 * pitch * t)
+        audio[position:position + len(t)] = 0.2 * envelope * tone
+        position += len(t) + int(rng.uniform(0.3, 1.2) * SAMPLE_RATE)
+    audio += rng.normal(0, 0.003, total).astype(np.float32)
+    return audio
+
+
+async def run_benchmark(minutes: float, window_counts):
+    audio = synthesize_audio(minutes)
+    pcm_path = Path(tempfile.mkdtemp()) / "synthetic.f32"
+    audio.tofile(pcm_path)
+    duration = len(audio) / SAMPLE_RATE
+    cpu_count = os.cpu_count() or 1
+
+    print(f"Synthetic input: {duration:.0f}s of audio, {cpu_count} CPUs")
+    print(f"{'windows':>8} {'workers':>8} {'wall (s)':>10} {'RTF':>8} {'segments':>9}")
+
+    for count in window_counts:
+        workers = max(1, min(count, cpu_count))
+        pool = TranscriptionPool(workers)
+        # Spawn workers and load models before timing
+        await asyncio.gather(*[pool.transcribe_window(str(pcm_path), 0, SAMPLE_RATE) for _ in range(workers)])
+
+        samples = np.memmap(pcm_path, dtype=np.float32, mode="r")
+        windows = plan_windows(samples, duration / count, overlap_seconds=2.0)
+
+        async def transcribe_window(start, end):
+            return await pool.transcribe_window(str(pcm_path), start, end)
+
+        start_time = time.time()
+        transcript = await transcribe_windows(windows, transcribe_window)
+        wall = time.time() - start_time
+        pool.shutdown()
+
+        print(f"{len(windows):>8} {workers:>8} {wall:>10.2f} {wall / duration:>8.3f} {len(transcript):>9}")
+
+    pcm_path.unlink()
+    pcm_path.parent.rmdir()
+
+
+if __name__ == "__main__":
+    minutes = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    counts = [int(c) for c in sys.argv[2:]] or [1, 2, 4, 8]
+    asyncio.run(run_benchmark(minutes, counts))
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark pipelined against sequential download-then-transcribe on a local
+media server that serves at a fixed bandwidth. Requires ffmpeg.
+
+Usage: python benchmark_pipelined_transcription.py [minutes] [bytes/s] [--simulate RTF] [--workers N] [--identify S]
+
+With --simulate, each window "transcribes" by sleeping RTF seconds per
+second of audio on N simulated workers, so the overlap can be measured
+without Whisper installed.
+
+Both modes run a whole job in full fetch mode up to the render: the
+sequential one downloads the video, then transcribes its audio; the
+pipelined one streams the audio track into transcription while the video
+downloads alongside. Clip identification is simulated by sleeping
+--identify seconds. The job time ends once the clips are known and the
+video is on disk.
+"""
+
+import argparse
+import asyncio
+import functools
+import http.server
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from audio import SAMPLE_RATE, extract_pcm, open_pcm, pcm_length, start_pcm_stream
+from benchmark_chunked_transcription import synthesize_audio
+from chunked_transcription import plan_windows, plan_windows_live, stream_windows
+from transcript import Transcript
+from transcription_pool import TranscriptionPool
+
+WINDOW_SECONDS = 60
+OVERLAP_SECONDS = 2
+
+
+class ThrottledHandler(http.server.SimpleHTTPRequestHandler):
+    rate = 1_000_000
+
+    def log_message(self, format, *args):
+        pass
+
+    def copyfile(self, source, outputfile):
+        started = time.time()
+        sent = 0
+        while True:
+            piece = source.read(64 * 1024)
+            if not piece:
+                break
+            outputfile.write(piece)
+            sent += len(piece)
+            # Sleep until the sent bytes fit the rate
+            time.sleep(max(0.0, sent / self.rate - (time.time() - started)))
+
+
+def make_transcriber(args, pcm_path: str):
+    if args.simulate is not None:
+        workers = asyncio.Semaphore(args.workers)
+
+        async def transcribe_window(start, end):
+            async with workers:
+                await asyncio.sleep((end - start) / SAMPLE_RATE * args.simulate)
+            return Transcript.from_segments([("window", 0.0, (end - start) / SAMPLE_RATE)])
+        return transcribe_window, None
+
+    pool = TranscriptionPool(args.workers)
+
+    async def transcribe_window(start, end):
+        return await pool.transcribe_window(pcm_path, start, end)
+    return transcribe_window, pool
+
+
+async def sequential(args, urls: dict, work_dir: Path):
+    pcm_path = str(work_dir / "sequential.f32")
+    transcribe_window, pool = make_transcriber(args, pcm_path)
+    started = time.time()
+    media_path = work_dir / "sequential.mp4"
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(None, urllib.request.urlretrieve, urls["video"], str(media_path))
+    downloaded = time.time() - started
+    await loop.run_in_executor(None, extract_pcm, str(media_path), pcm_path)
+    windows = plan_windows(open_pcm(pcm_path), WINDOW_SECONDS, OVERLAP_SECONDS)
+    first = None
+    async for _ in stream_windows(windows, transcribe_window, args.workers + 1):
+        first = first or time.time() - started
+    if pool:
+        pool.shutdown()
+    transcribed = time.time() - started
+    await asyncio.sleep(args.identify)
+    return time.time() - started, transcribed, first, downloaded
+
+
+async def pipelined(args, urls: dict, work_dir: Path):
+    pcm_path = str(work_dir / "pipelined.f32")
+    transcribe_window, pool = make_transcriber(args, pcm_path)
+    started = time.time()
+    loop = asyncio.get_event_loop()
+    video = loop.run_in_executor(None, urllib.request.urlretrieve, urls["video"], str(work_dir / "pipelined.mp4"))
+    process = start_pcm_stream(urls["audio"], pcm_path)
+    downloaded = None
+
+    def finished():
+        nonlocal downloaded
+        if process.poll() is None:
+            return False
+        downloaded = downloaded or time.time() - started
+        return True
+
+    windows = plan_windows_live(lambda: pcm_length(pcm_path), finished,
+                                lambda length: open_pcm(pcm_path, length), WINDOW_SECONDS, OVERLAP_SECONDS)
+    first = None
+    async for _ in stream_windows(windows, transcribe_window, args.workers + 1):
+        first = first or time.time() - started
+    process.wait()
+    if pool:
+        pool.shutdown()
+    transcribed = time.time() - started
+    await asyncio.sleep(args.identify)
+    await video
+    return time.time() - started, transcribed, first, downloaded
+
+
+async def run_benchmark(args):
+    work_dir = Path(tempfile.mkdtemp())
+    synthesize_audio(args.minutes).tofile(work_dir / "synthetic.f32")
+    subprocess.run([
+        "ffmpeg", "-nostdin", "-y", "-loglevel", "error", "-f", "f32le", "-ar", str(SAMPLE_RATE), "-ac", "1",
+        "-i", str(work_dir / "synthetic.f32"), "-c:a", "aac", "-b:a", "64k",
+        # Index up front, as in streamable formats, so decoding can start before the download ends
+        "-movflags", "+faststart", str(work_dir / "talk.m4a")
+    ], check=True)
+    # The same audio under a small video track, standing in for the full video format
+    subprocess.run([
+        "ffmpeg", "-nostdin", "-y", "-loglevel", "error", "-f", "lavfi", "-i", "testsrc=size=320x240:rate=10",
+        "-i", str(work_dir / "talk.m4a"), "-map", "0:v", "-map", "1:a", "-c:v", "libx264", "-preset", "ultrafast",
+        "-b:v", "200k", "-c:a", "copy", "-shortest", "-movflags", "+faststart", str(work_dir / "talk.mp4")
+    ], check=True)
+    size = (work_dir / "talk.m4a").stat().st_size
+    video_size = (work_dir / "talk.mp4").stat().st_size
+
+    handler = functools.partial(type("Handler", (ThrottledHandler,), {"rate": args.rate}), directory=str(work_dir))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = {"audio": f"{base}/talk.m4a", "video": f"{base}/talk.mp4"}
+
+    mode = f"simulated RTF {args.simulate}" if args.simulate is not None else "Whisper"
+    print(f"{args.minutes:.0f} min of audio, {size / 1e6:.1f} MB audio / {video_size / 1e6:.1f} MB video "
+          f"at {args.rate / 1e6:.2f} MB/s per connection, {args.workers} worker(s), {mode}, "
+          f"{args.identify:.1f}s clip identification")
+    print(f"{'mode':>11} {'job (s)':>8} {'transcript (s)':>15} {'first window (s)':>17} {'download (s)':>13}")
+    results = {}
+    for name, run in (("sequential", sequential), ("pipelined", pipelined)):
+        job, transcribed, first, downloaded = await run(args, urls, work_dir)
+        results[name] = (job, transcribed)
+        print(f"{name:>11} {job:>8.2f} {transcribed:>15.2f} {first or 0:>17.2f} {downloaded or 0:>13.2f}")
+    server.shutdown()
+    print(f"Speedup: {results['sequential'][0] / results['pipelined'][0]:.2f}x end to end, "
+          f"{results['sequential'][1] / results['pipelined'][1]:.2f}x to the transcript")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("minutes", nargs="?", type=float, default=10)
+    parser.add_argument("rate", nargs="?", type=int, default=100_000)
+    parser.add_argument("--simulate", type=float, default=None)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--identify", type=float, default=2.0)
+    asyncio.run(run_benchmark(parser.parse_args()))
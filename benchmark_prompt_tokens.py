@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark prompt size: transcript tokens per minute of video for the
+original tuple repr, per-segment "[start - end] text" lines and the compact
+budgeted encoding. Uses tiktoken when installed, otherwise the estimate.
+
+Usage: python benchmark_prompt_tokens.py [minutes...]
+"""
+
+import random
+import sys
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from prompting import PROMPT_TOKEN_BUDGET, build_transcript_block, estimate_tokens
+from transcript import Transcript
+
+VOCABULARY = (
+    "the a of to and in that is it for you on with this we was as are be have at so they "
+    "government branch congress president court power law vote people question answer think "
+    "really important right example because actually going today talk about review"
+).split()
+
+
+def synthesize_transcript(minutes: float, seed: int = 0) -> Transcript:
+    """Whisper-like segments: 2-7 s each, about 150 words per minute, short pauses between"""
+    rng = random.Random(seed)
+    segments = []
+    position = 0.0
+    while position < minutes * 60:
+        length = rng.uniform(2.0, 7.0)
+        words = max(1, round(length * 2.5 * rng.uniform(0.7, 1.3)))
+        text = " " + " ".join(rng.choice(VOCABULARY) for _ in range(words))
+        segments.append((text.capitalize() + ".", position, position + length))
+        position += length + rng.choice([0.0, 0.0, 0.3, 1.5])
+    return Transcript.from_segments(segments)
+
+
+def encodings(transcript: Transcript):
+    yield "tuple repr", str(list(transcript))
+    yield "[start - end]", "\n".join(f"[{start:.1f} - {end:.1f}] {text.strip()}" for text, start, end in transcript)
+    yield "compact", build_transcript_block(transcript, budget=10 ** 9)[0]
+    yield f"budget {PROMPT_TOKEN_BUDGET}", build_transcript_block(transcript)[0]
+
+
+if __name__ == "__main__":
+    durations = [float(m) for m in sys.argv[1:]] or [10, 30, 60, 180]
+    print(f"{'minutes':>8} {'encoding':>14} {'tokens':>9} {'tokens/min':>11} {'vs repr':>8}")
+    for minutes in durations:
+        transcript = synthesize_transcript(minutes)
+        baseline = None
+        for name, text in encodings(transcript):
+            tokens = estimate_tokens(text)
+            baseline = baseline or tokens
+            print(f"{minutes:>8.0f} {name:>14} {tokens:>9} {tokens / minutes:>11.0f} {tokens / baseline:>8.2f}")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark the retrieval pre-filter: prompt tokens for the full transcript
+versus the windows kept for a targeted request, and the time spent
+indexing and ranking, for lectures of growing length.
+
+Usage: python benchmark_retrieval.py [minutes...]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from prompting import build_transcript_block, estimate_tokens
+from retrieval import filter_transcript
+from transcript import Transcript
+
+FILLER = (
+    "the a of to and in that is it for you on with this we was as are be have at so they "
+    "people question answer think really important right example because actually going today review"
+).split()
+TOPICS = {
+    "government": "government congress president court branch federalism amendment",
+    "chemistry": "chemistry moles reaction equation acid bond electron",
+    "research": "research paper thesis sources method defense",
+    "environment": "environmental science ecosystem energy pollution climate",
+}
+
+
+def synthesize_lecture(minutes: float, seed: int = 0) -> Transcript:
+    """Whisper-like segments cycling through topics every ten minutes"""
+    rng = random.Random(seed)
+    topics = list(TOPICS.values())
+    segments = []
+    position = 0.0
+    while position < minutes * 60:
+        topic = topics[int(position // 600) % len(topics)].split()
+        length = rng.uniform(2.0, 7.0)
+        words = max(1, round(length * 2.5))
+        text = " ".join(rng.choice(topic) if rng.random() < 0.15 else rng.choice(FILLER) for _ in range(words))
+        segments.append((" " + text.capitalize() + ".", position, position + length))
+        position += length + rng.choice([0.0, 0.3, 1.5])
+    return Transcript.from_segments(segments)
+
+
+if __name__ == "__main__":
+    durations = [float(m) for m in sys.argv[1:]] or [30, 60, 180]
+    request = "Return the part about AP gov"
+    print(f"{'minutes':>8} {'full tokens':>12} {'sent tokens':>12} {'kept':>6} {'filter ms':>10}")
+    for minutes in durations:
+        transcript = synthesize_lecture(minutes)
+        full = estimate_tokens(build_transcript_block(transcript, budget=10 ** 9)[0])
+        started = time.time()
+        filtered, _, report = filter_transcript(transcript, request)
+        elapsed = (time.time() - started) * 1000
+        sent = estimate_tokens(build_transcript_block(filtered or transcript, budget=10 ** 9)[0])
+        print(f"{minutes:>8.0f} {full:>12} {sent:>12} {sent / full:>6.0%} {elapsed:>10.1f}")
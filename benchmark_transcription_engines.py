@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark transcription engines on a fixture clip: real-time factor (RTF)
+and word error rate (WER) against a reference transcript.
+
+Usage: python benchmark_transcription_engines.py [engines...]
+
+The fixture is checked in under fixtures/benchmark/, so results do not depend
+on the network: an 11-second excerpt of John F. Kennedy's 1961 inaugural
+address (public domain), as 32 kbps Opus, with its reference transcript.
+"""
+
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from audio import SAMPLE_RATE, extract_pcm, open_pcm
+from transcription_engines import ENGINES, get_engine
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures" / "benchmark"
+FIXTURE_AUDIO = FIXTURE_DIR / "jfk_inaugural.opus"
+REFERENCE = FIXTURE_DIR / "jfk_inaugural.txt"
+
+
+def normalize_words(text: str):
+    return re.sub(r"[^a-z0-9' ]", " ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level Levenshtein distance divided by the reference length"""
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            ))
+        previous = current
+    return previous[-1] / max(1, len(ref))
+
+
+def run_benchmark(engine_names, runs: int = 3):
+    pcm_path = Path(tempfile.mkdtemp()) / "fixture.f32"
+    extract_pcm(str(FIXTURE_AUDIO), str(pcm_path))
+    audio = open_pcm(str(pcm_path))
+    duration = len(audio) / SAMPLE_RATE
+    reference = REFERENCE.read_text(encoding="utf-8")
+
+    print(f"Fixture: {duration:.1f}s clip, {runs} timed runs per engine")
+    print(f"{'engine':>16} {'load (s)':>9} {'RTF':>8} {'WER':>7}")
+
+    for name in engine_names:
+        engine = get_engine(name)
+        try:
+            start_time = time.time()
+            engine.warmup()
+            load_seconds = time.time() - start_time
+
+            timings = []
+            for _ in range(runs):
+                start_time = time.time()
+                segments = engine.transcribe(audio, "en")
+                timings.append(time.time() - start_time)
+        except Exception as e:
+            print(f"{name:>16} skipped: {e}")
+            continue
+
+        hypothesis = " ".join(text for text, _, _ in segments)
+        rtf = min(timings) / duration
+        print(f"{name:>16} {load_seconds:>9.2f} {rtf:>8.3f} {word_error_rate(reference, hypothesis):>7.1%}")
+
+    pcm_path.unlink()
+    pcm_path.parent.rmdir()
+
+
+if __name__ == "__main__":
+    run_benchmark(sys.argv[1:] or list(ENGINES))
@@ -43,14 +43,22 @@ export const JobQueue = ({ jobs, currentJob, onJobSelect, onJobDelete, loading =
 
   const getJobTitle = (job: Job) => {
     // Extract video ID from YouTube URL for a simple title
-    const url = job.youtube_url;
+    const url = job.youtube_url ?? '';
     const videoIdMatch = url.match(/(?:youtube\.com\/watch\?v=|youtu\.be\/)([^&\n?#]+)/);
-    return videoIdMatch ? `Video ${videoIdMatch[1].substring(0, 8)}...` : 'YouTube Video';
+    if (videoIdMatch) {
+      return `Video ${videoIdMatch[1].substring(0, 8)}...`;
+    }
+    // Direct URLs and uploads: the file name is the most telling part
+    const title = job.title || job.source?.filename || job.source?.url;
+    if (title) {
+      return title.split(/[?#]/)[0].split('/').filter(Boolean).pop() || title;
+    }
+    return url ? 'YouTube Video' : 'Video';
   };
 
   const getJobThumbnail = (job: Job) => {
     // Generate thumbnail URL from YouTube video ID
-    const url = job.youtube_url;
+    const url = job.youtube_url ?? '';
     const videoIdMatch = url.match(/(?:youtube\.com\/watch\?v=|youtu\.be\/)([^&\n?#]+)/);
     if (videoIdMatch) {
       return `https://img.youtube.com/vi/${videoIdMatch[1]}/mqdefault.jpg`;
@@ -35,7 +35,14 @@ export interface JobStatus {
 
 export interface Job {
   id: string;
-  youtube_url: string;
+  // null for jobs from a direct video URL or an upload
+  youtube_url: string | null;
+  title?: string;
+  source?: {
+    kind: 'youtube' | 'url' | 'upload';
+    url?: string;
+    filename?: string;
+  };
   instructions: string;
   user_id: string;
   status: 'queued' | 'processing' | 'completed' | 'failed';
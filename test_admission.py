@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test admission control: policy decisions, the probe cache TTL and cost-ordered lanes.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from admission import LaneScheduler, ProbeCache, decide, summarize
+
+INFO = {
+    "id": "abcdefghijk",
+    "duration": 3 * 3600,
+    "formats": [
+        {"format_id": "140", "vcodec": "none", "acodec": "mp4a.40.2", "tbr": 128},
+        {"format_id": "18", "vcodec": "avc1", "acodec": "mp4a", "filesize": 540_000_000},
+        {"format_id": "22", "vcodec": "avc1", "acodec": "mp4a", "tbr": 1600},
+    ],
+}
+
+
+def test_policies():
+    summary = summarize(INFO)
+    assert summary["bytes_per_second"] == 50_000  # the 360p file, not the audio-only stream
+
+    assert decide(summary, max_duration=0)["action"] == "accept"
+    rejected = decide(summary, max_duration=3600, policy="reject")
+    assert rejected["action"] == "reject" and "180 min" in rejected["reason"]
+
+    truncated = decide(summary, max_duration=3600, policy="truncate")
+    assert truncated["max_duration"] == 3600 and truncated["cost"]["media_seconds"] == 3600
+    assert truncated["cost"]["download_bytes"] == 180_000_000
+
+    low = decide(summary, max_duration=3600, policy="low_priority")
+    assert low["lane"] == "low" and low["cost"]["media_seconds"] == 3 * 3600
+
+    live = decide({**summary, "live_status": "is_upcoming"}, max_duration=0)
+    assert live["action"] == "reject"
+
+
+def test_probe_cache_ttl():
+    cache = ProbeCache(ttl_seconds=0.05)
+    cache.put("abcdefghijk", {"summary": {}})
+    assert cache.get("abcdefghijk") is not None
+    time.sleep(0.1)
+    assert cache.get("abcdefghijk") is None
+    assert cache.get_stats()["hits"] == 1 and cache.get_stats()["misses"] == 1
+
+
+def test_lane_runs_cheapest_queued_job_first():
+    lanes = LaneScheduler({"low": 1})
+    order = []
+
+    async def job(name, cost):
+        async with lanes.slot("low", cost):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        first = asyncio.create_task(job("first", 100))
+        await asyncio.sleep(0)
+        # Queued behind "first"; they start in order of estimated cost
+        queued = [asyncio.create_task(job(name, cost)) for name, cost in [("slow", 30), ("fast", 10), ("medium", 20)]]
+        await asyncio.sleep(0)
+        assert lanes.get_stats()["low"] == {"limit": 1, "running": 1, "waiting": 3}
+        await asyncio.gather(first, *queued)
+
+    asyncio.run(run())
+    assert order == ["first", "fast", "medium", "slow"]
+    assert lanes.get_stats()["low"]["running"] == 0
+
+
+if __name__ == "__main__":
+    test_policies()
+    print("✅ Admission policies")
+    test_probe_cache_ttl()
+    print("✅ Probe cache TTL")
+    test_lane_runs_cheapest_queued_job_first()
+    print("✅ Cost-ordered low-priority lane")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test the memory-mapped PCM stage: decoding, mapping and pause search. Requires ffmpeg.
+"""
+
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from audio import SAMPLE_RATE, extract_pcm, open_pcm, pcm_length, quietest_point
+
+
+def make_media(path: Path):
+    """4s of tone, 1s of silence, 3s of tone, encoded as AAC at another sample rate"""
+    rate = 44100
+    t = np.arange(4 * rate) / rate
+    tone = (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    samples = np.concatenate([tone, np.zeros(rate, dtype=np.float32), tone[:3 * rate]])
+    raw = path.with_suffix(".raw")
+    samples.tofile(raw)
+    subprocess.run([
+        "ffmpeg", "-nostdin", "-y", "-loglevel", "error", "-f", "f32le", "-ar", str(rate), "-ac", "1",
+        "-i", str(raw), "-ac", "2", "-c:a", "aac", str(path)
+    ], check=True)
+
+
+def test_extract_and_map_pcm():
+    work_dir = Path(tempfile.mkdtemp())
+    media = work_dir / "talk.m4a"
+    make_media(media)
+
+    pcm_path = extract_pcm(str(media), str(work_dir / "audio.f32"))
+    # 16 kHz mono float32, 4 bytes per sample
+    assert abs(pcm_length(str(pcm_path)) - 8 * SAMPLE_RATE) < SAMPLE_RATE // 10
+    assert pcm_path.stat().st_size == pcm_length(str(pcm_path)) * 4
+
+    samples = open_pcm(str(pcm_path))
+    assert isinstance(samples, np.memmap) and samples.dtype == np.float32
+    assert len(samples) == pcm_length(str(pcm_path))
+    assert np.abs(samples[SAMPLE_RATE:2 * SAMPLE_RATE]).max() > 0.3
+    assert np.abs(samples[int(4.2 * SAMPLE_RATE):int(4.8 * SAMPLE_RATE)]).max() < 0.01
+
+    # Copy-on-write: consumers may write to the view, the file stays as decoded
+    before = pcm_path.read_bytes()
+    samples[:SAMPLE_RATE] = 0
+    del samples
+    assert pcm_path.read_bytes() == before
+
+    # A file still being written is mapped only up to the given length
+    assert len(open_pcm(str(pcm_path), SAMPLE_RATE)) == SAMPLE_RATE
+    assert len(open_pcm(str(work_dir / "missing.f32"))) == 0
+
+    truncated = extract_pcm(str(media), str(work_dir / "first.f32"), max_seconds=2)
+    assert abs(pcm_length(str(truncated)) - 2 * SAMPLE_RATE) < SAMPLE_RATE // 10
+
+
+def test_quietest_point_finds_the_pause():
+    work_dir = Path(tempfile.mkdtemp())
+    media = work_dir / "talk.m4a"
+    make_media(media)
+    samples = open_pcm(str(extract_pcm(str(media), str(work_dir / "audio.f32"))))
+
+    cut = quietest_point(samples, 2 * SAMPLE_RATE, 7 * SAMPLE_RATE)
+    assert 4.1 * SAMPLE_RATE < cut < 4.9 * SAMPLE_RATE
+    # No pause in range: still a point inside it
+    cut = quietest_point(samples, 1 * SAMPLE_RATE, 3 * SAMPLE_RATE)
+    assert 1 * SAMPLE_RATE <= cut < 3 * SAMPLE_RATE
+
+
+def test_extract_pcm_reports_ffmpeg_errors():
+    work_dir = Path(tempfile.mkdtemp())
+    (work_dir / "broken.mp4").write_bytes(b"not media")
+    try:
+        extract_pcm(str(work_dir / "broken.mp4"), str(work_dir / "audio.f32"))
+        assert False, "undecodable input must raise"
+    except RuntimeError as e:
+        assert "Failed to extract audio" in str(e)
+
+
+if __name__ == "__main__":
+    test_extract_and_map_pcm()
+    print("✅ Audio decoded once and memory-mapped copy-on-write")
+    test_quietest_point_finds_the_pause()
+    print("✅ Pause found in the mapped audio")
+    test_extract_pcm_reports_ffmpeg_errors()
+    print("✅ Decoding errors reported")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test the shared download bandwidth budget and per-download throughput accounting.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from bandwidth import BandwidthScheduler
+
+
+def simulate_download(lease, seconds: float, chunk: int = 16 * 1024):
+    """Feed progress hook calls as fast as the lease lets them through"""
+    downloaded = 0
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        downloaded += chunk
+        lease.hook({"status": "downloading", "filename": "input.mp4", "downloaded_bytes": downloaded})
+
+
+def test_budget_is_shared_fairly():
+    limit = 400 * 1024
+    scheduler = BandwidthScheduler(limit, burst_seconds=0.1)
+    leases = [scheduler.lease(f"job-{i}") for i in range(2)]
+    threads = []
+    for lease in leases:
+        lease.__enter__()
+        threads.append(threading.Thread(target=simulate_download, args=(lease, 1.5)))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    total = sum(lease.throughput() for lease in leases)
+    for lease in leases:
+        lease.__exit__(None, None, None)
+
+    assert total < limit * 1.25
+    # Each download got roughly half
+    assert all(0.35 < lease.throughput() / total < 0.65 for lease in leases)
+    assert scheduler.get_stats()["throttled_seconds"] > 0
+
+
+def test_unlimited_counts_bytes():
+    scheduler = BandwidthScheduler(0)
+    with scheduler.lease("job") as lease:
+        for downloaded in (1000, 3000, 3000, 2500):
+            lease.hook({"status": "downloading", "filename": "a.m4a", "downloaded_bytes": downloaded})
+        lease.hook({"status": "downloading", "filename": "a.mp4", "downloaded_bytes": 500})
+        assert scheduler.get_stats()["active"][0]["bytes"] == 3500
+    assert lease.summary()["bytes"] == 3500
+    assert scheduler.get_stats()["active"] == []
+
+
+def test_retry_counts_bytes_again():
+    scheduler = BandwidthScheduler(0)
+    with scheduler.lease("job") as lease:
+        for downloaded in (1000, 4000, 3500):
+            lease.hook({"status": "downloading", "filename": "video.mp4", "downloaded_bytes": downloaded})
+        # The same file downloaded again from the start
+        lease.new_attempt()
+        for downloaded in (500, 2500, 5000):
+            lease.hook({"status": "downloading", "filename": "video.mp4", "downloaded_bytes": downloaded})
+        assert lease.summary()["bytes"] == 4000 + 5000
+        # A retry that resumes the partial file only adds what it fetched
+        lease.new_attempt()
+        lease.hook({"status": "downloading", "filename": "video.mp4", "downloaded_bytes": 6000})
+        assert lease.summary()["bytes"] == 4000 + 6000
+
+
+def test_counted_stream_takes_a_share_without_waiting():
+    limit = 100 * 1024
+    scheduler = BandwidthScheduler(limit, burst_seconds=0.1)
+    with scheduler.lease("stream") as stream, scheduler.lease("job") as other:
+        started = time.time()
+        for _ in range(10):
+            stream.count(limit)
+        assert time.time() - started < 0.5
+        assert stream.summary()["bytes"] == 10 * limit
+        # The download next to it still gets only half the budget
+        simulate_download(other, 1.0)
+        assert other.throughput() < limit * 0.5 * 1.3
+    assert scheduler.get_stats()["bytes"] >= 10 * limit
+
+
+if __name__ == "__main__":
+    test_budget_is_shared_fairly()
+    print("✅ Bandwidth budget shared fairly")
+    test_unlimited_counts_bytes()
+    print("✅ Bytes counted per download")
+    test_retry_counts_bytes_again()
+    print("✅ Retried downloads counted again")
+    test_counted_stream_takes_a_share_without_waiting()
+    print("✅ Streams that cannot wait are counted and keep their share")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test caption parsing, track selection and the quality check against local fixtures.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from captions import caption_quality_issue, parse_captions, select_caption_track
+
+FIXTURES = Path(__file__).parent / "fixtures" / "captions"
+
+
+def load(name: str):
+    return parse_captions((FIXTURES / name).read_text(encoding="utf-8"), name.rsplit(".", 1)[1])
+
+
+def test_manual_vtt():
+    transcript = load("manual.vtt")
+    assert [round(start, 1) for _, start, _ in transcript] == [0.0, 4.2, 9.8]
+    assert transcript[1][0] == " Today we're covering the three branches and how checks & balances work."
+    assert transcript[2][0] == " The legislative branch writes the laws."
+
+
+def test_auto_vtt_drops_rolling_duplicates():
+    transcript = load("auto.vtt")
+    assert [text for text, _, _ in transcript] == [
+        " welcome back to AP government",
+        " review today we're covering",
+        " the three branches",
+    ]
+
+
+def test_srv3_matches_vtt():
+    srv3 = load("auto.srv3")
+    assert [text for text, _, _ in srv3] == [text for text, _, _ in load("auto.vtt")]
+    # Overlapping auto-caption lines are clamped to the next start
+    assert srv3[1][2] == srv3[2][1] == 5.04
+
+
+def test_quality_check():
+    assert caption_quality_issue(load("manual.vtt"), duration=15) is None
+    assert caption_quality_issue(load("music_only.vtt"), duration=62) is not None
+    assert caption_quality_issue(load("manual.vtt"), duration=3600) is not None
+    assert caption_quality_issue([], duration=10) == "no caption segments"
+
+
+def test_track_selection_prefers_manual():
+    info = {
+        "automatic_captions": {
+            "en": [{"ext": "vtt", "url": "auto-vtt"}, {"ext": "srv3", "url": "auto-srv3"}],
+            "en-de": [{"ext": "srv3", "url": "translated"}],
+        },
+        "subtitles": {"en-US": [{"ext": "vtt", "url": "manual-vtt"}]},
+    }
+    assert select_caption_track(info)["url"] == "manual-vtt"
+    del info["subtitles"]
+    assert select_caption_track(info) == {"kind": "auto", "language": "en", "ext": "srv3", "url": "auto-srv3"}
+    assert select_caption_track({"automatic_captions": {"en-de": info["automatic_captions"]["en-de"]}}) is None
+
+
+if __name__ == "__main__":
+    for test in [test_manual_vtt, test_auto_vtt_drops_rolling_duplicates, test_srv3_matches_vtt,
+                 test_quality_check, test_track_selection_prefers_manual]:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test window planning, segment stitching and streaming for chunked transcription.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from audio import SAMPLE_RATE
+import chunked_transcription
+from chunked_transcription import plan_windows, should_chunk, stitch_segments, stream_windows
+
+
+def make_audio(seconds: int, pause_at):
+    """Noise with silent gaps at the given seconds"""
+    audio = np.random.default_rng(0).normal(0, 0.2, seconds * SAMPLE_RATE).astype(np.float32)
+    for t in pause_at:
+        audio[int(t * SAMPLE_RATE):int((t + 0.5) * SAMPLE_RATE)] = 0
+    return audio
+
+
+def test_windows_cut_at_pauses():
+    audio = make_audio(300, pause_at=[95, 203])
+    windows = plan_windows(audio, window_seconds=100, overlap_seconds=2, search_seconds=10)
+
+    assert len(windows) == 3
+    cuts = [w["own_end"] / SAMPLE_RATE for w in windows[:-1]]
+    assert 95 <= cuts[0] <= 95.5
+    assert 203 <= cuts[1] <= 203.5
+    # Owned spans tile the input exactly
+    assert windows[0]["own_start"] == 0 and windows[-1]["own_end"] == len(audio)
+    for a, b in zip(windows, windows[1:]):
+        assert a["own_end"] == b["own_start"]
+        assert a["end"] > b["start"]
+
+
+def test_stitch_offsets_and_dedupes_overlap():
+    windows = [
+        {"index": 0, "own_start": 0, "own_end": 100 * SAMPLE_RATE, "start": 0, "end": 102 * SAMPLE_RATE},
+        {"index": 1, "own_start": 100 * SAMPLE_RATE, "own_end": 200 * SAMPLE_RATE,
+         "start": 98 * SAMPLE_RATE, "end": 200 * SAMPLE_RATE},
+    ]
+    results = [
+        [(" first", 0.0, 4.0), (" at the cut", 98.5, 101.5)],
+        # Same sentence heard again by the second window, then new speech
+        [(" at the cut", 0.5, 3.5), (" second", 10.0, 12.0)],
+    ]
+    transcript = stitch_segments(windows, results)
+
+    assert [text for text, _, _ in transcript] == [" first", " at the cut", " second"]
+    assert transcript[2][1] == 108.0 and transcript[2][2] == 110.0
+
+
+def test_stream_emits_in_order_with_bounded_lookahead():
+    audio = make_audio(300, pause_at=[95, 203])
+    windows = plan_windows(audio, window_seconds=100, overlap_seconds=2, search_seconds=10)
+    in_flight = []
+    peak = []
+
+    async def transcribe_window(start, end):
+        in_flight.append(start)
+        peak.append(len(in_flight))
+        # Later windows finish first
+        await asyncio.sleep(0.01 * (len(windows) - start // SAMPLE_RATE // 100))
+        in_flight.remove(start)
+        return [(f" window at {start}", 5.0, 6.0)]
+
+    async def collect():
+        return [(window["index"], segments) async for window, segments in stream_windows(windows, transcribe_window, 2)]
+
+    batches = asyncio.run(collect())
+    assert [index for index, _ in batches] == [0, 1, 2]
+    assert max(peak) <= 2
+    assert batches[1][1][0][1] == round(windows[1]["start"] / SAMPLE_RATE + 5.0, 3)
+
+
+def test_auto_chunks_only_long_inputs_with_several_workers():
+    mode, streaming = chunked_transcription.CHUNK_MODE, chunked_transcription.STREAM_WINDOWS
+    try:
+        chunked_transcription.CHUNK_MODE = "auto"
+        # Streaming does not decide whether to chunk
+        for chunked_transcription.STREAM_WINDOWS in (True, False):
+            assert not should_chunk(20, workers=1)
+            assert not should_chunk(3600, workers=1)
+            assert not should_chunk(20, workers=4)
+            assert should_chunk(chunked_transcription.CHUNK_MIN_SECONDS, workers=4)
+        chunked_transcription.CHUNK_MODE = "true"
+        assert should_chunk(20, workers=1)
+        chunked_transcription.CHUNK_MODE = "false"
+        assert not should_chunk(3600, workers=4)
+    finally:
+        chunked_transcription.CHUNK_MODE, chunked_transcription.STREAM_WINDOWS = mode, streaming
+
+
+if __name__ == "__main__":
+    test_windows_cut_at_pauses()
+    print("✅ Windows cut at pauses")
+    test_stitch_offsets_and_dedupes_overlap()
+    print("✅ Segments stitched with global offsets")
+    test_stream_emits_in_order_with_bounded_lookahead()
+    print("✅ Windows streamed in order")
+    test_auto_chunks_only_long_inputs_with_several_workers()
+    print("✅ Auto mode chunks only long inputs with several workers")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test the window split and candidate reduce of map-reduce clip identification.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from clip_identification import EarlyMap, parse_intervals, reduce_candidates, split_transcript
+from transcript import Transcript
+
+
+def test_split_overlapping_windows():
+    transcript = Transcript.from_segments([(f" sentence {i}", i * 5.0, i * 5.0 + 4.0) for i in range(720)])
+    windows = split_transcript(transcript, window_seconds=900, overlap_seconds=60)
+    assert len(windows) == 5
+    assert [w.starts[0] for w in windows] == [0.0, 840.0, 1680.0, 2520.0, 3360.0]
+    # Every segment is in some window, and consecutive windows share the overlap
+    assert windows[-1].ends[-1] == transcript.ends[-1]
+    for a, b in zip(windows, windows[1:]):
+        assert a.ends[-1] > b.starts[0]
+    assert max(w.ends[-1] - w.starts[0] for w in windows) <= 900
+    assert len(split_transcript(Transcript.from_segments([(" short", 0.0, 3.0)]))) == 1
+
+
+def test_reduce_merges_and_ranks():
+    candidates = [
+        {"start": 850.0, "end": 880.0, "score": 6},   # the same moment seen by two windows
+        {"start": 845.0, "end": 875.0, "score": 9},
+        {"start": 10.0, "end": 30.0, "score": 3},
+        {"start": 2000.0, "end": 2040.0},             # no score: middle of the range
+        {"start": 400.0, "end": 420.0, "score": 7},
+    ]
+    assert reduce_candidates(candidates, max_clips=3) == [
+        {"start": 400.0, "end": 420.0},
+        {"start": 845.0, "end": 880.0},
+        {"start": 2000.0, "end": 2040.0},
+    ]
+    assert parse_intervals("Nothing relevant here: []") == []
+    assert parse_intervals("[{'start': 1.0, 'end': 2.5, 'score': 4}]") == [{"start": 1.0, "end": 2.5, "score": 4}]
+
+
+def test_early_map_windows_match_the_final_split():
+    transcript = Transcript.from_segments([(f" sentence {i}", i * 5.0, i * 5.0 + 4.0) for i in range(720)])
+
+    async def run():
+        mapped = []
+
+        async def map_window(window):
+            mapped.append(window.starts[0])
+            return [], 0.0
+
+        early = EarlyMap(map_window, window_seconds=900, overlap_seconds=60)
+        # Transcription windows of 120 s arrive in timeline order
+        for start in range(0, 3600, 120):
+            early.feed(transcript.slice(start, start + 120), start + 120.0)
+            await asyncio.sleep(0)
+        windows = split_transcript(transcript, window_seconds=900, overlap_seconds=60)
+        taken = [early.take(window) for window in windows]
+        early.cancel()
+        return mapped, taken
+
+    mapped, taken = asyncio.run(run())
+    # Every window that ended before the transcript did was started early and is taken over
+    assert mapped == [0.0, 840.0, 1680.0, 2520.0]
+    assert [task is not None for task in taken] == [True, True, True, True, False]
+
+
+if __name__ == "__main__":
+    test_split_overlapping_windows()
+    print("✅ Overlapping transcript windows")
+    test_reduce_merges_and_ranks()
+    print("✅ Candidates merged and ranked")
+    test_early_map_windows_match_the_final_split()
+    print("✅ Early map windows match the final split")
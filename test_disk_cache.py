@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test the size-bounded disk cache, the transcript cache on top of it and YouTube video ID parsing.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from disk_cache import DiskCache
+from transcript import Transcript
+from transcript_cache import TranscriptCache
+from video_ids import youtube_video_id
+
+
+def test_evicts_least_recently_used_beyond_size():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = DiskCache(Path(tmp), max_bytes=300)
+        for key in ("a", "b", "c"):
+            cache.set(key, key.encode() * 100)
+        assert cache.get("a") == b"a" * 100
+        cache.set("d", b"d" * 100)
+
+        # b was used longest ago; a was read after being written
+        assert cache.get("b") is None
+        assert all(cache.get(key) is not None for key in ("a", "c", "d"))
+        stats = cache.get_stats()
+        assert (stats["entries"], stats["bytes"], stats["evictions"]) == (3, 300, 1)
+        assert len(list(Path(tmp).glob("*.bin"))) == 3
+
+        # An entry larger than the whole cache is not stored
+        cache.set("huge", b"x" * 301)
+        assert cache.get("huge") is None
+        assert cache.get_stats()["entries"] == 3
+
+
+def test_index_rebuilt_on_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = DiskCache(Path(tmp), max_bytes=300)
+        for key in ("a", "b", "c"):
+            cache.set(key, key.encode() * 100)
+        # Recency lives in the files' modification times
+        now = time.time()
+        for age, key in ((30, "b"), (20, "c"), (10, "a")):
+            path = cache._path(cache._name(key))
+            os.utime(path, (now - age, now - age))
+
+        restarted = DiskCache(Path(tmp), max_bytes=300)
+        stats = restarted.get_stats()
+        assert (stats["entries"], stats["bytes"]) == (3, 300)
+        restarted.set("d", b"d" * 100)
+        assert restarted.get("b") is None
+        assert restarted.get("a") == b"a" * 100
+
+
+def test_transcript_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TranscriptCache(DiskCache(Path(tmp), max_bytes=10 ** 6))
+        transcript = Transcript.from_segments([
+            (" Welcome back", 0.0, 1.5), (" to the café.", 1.5, 3.25), (" Let's begin", 4.0, 6.125),
+        ])
+        assert cache.get("youtube:abcdefghijk", "whisper:base", "en") is None
+        cache.put("youtube:abcdefghijk", "whisper:base", "en", transcript)
+
+        restored = TranscriptCache(DiskCache(Path(tmp), max_bytes=10 ** 6)).get("youtube:abcdefghijk", "whisper:base", "en")
+        assert restored is not None
+        assert restored.to_segments() == transcript.to_segments()
+        # Model and language are part of the key
+        assert cache.get("youtube:abcdefghijk", "whisper:small", "en") is None
+        assert cache.get("youtube:abcdefghijk", "whisper:base", "de") is None
+
+
+def test_unreadable_transcript_is_a_miss():
+    with tempfile.TemporaryDirectory() as tmp:
+        disk = DiskCache(Path(tmp), max_bytes=10 ** 6)
+        disk.set(TranscriptCache.make_key("youtube:abcdefghijk", "whisper:base", "en"), b"not zlib")
+        assert TranscriptCache(disk).get("youtube:abcdefghijk", "whisper:base", "en") is None
+
+
+def test_youtube_video_id_forms():
+    video_id = "dQw4w9WgXcQ"
+    for url in (
+        f"https://www.youtube.com/watch?v={video_id}",
+        f"https://youtube.com/watch?v={video_id}&t=42s&list=PL123",
+        f"https://www.youtube.com/watch?feature=share&v={video_id}",
+        f"https://m.youtube.com/watch?v={video_id}",
+        f"https://music.youtube.com/watch?v={video_id}",
+        f"https://youtu.be/{video_id}",
+        f"https://youtu.be/{video_id}?si=abc&t=10",
+        f"https://www.youtube.com/shorts/{video_id}",
+        f"https://www.youtube.com/embed/{video_id}?start=5",
+        f"https://www.youtube-nocookie.com/embed/{video_id}",
+        f"https://www.youtube.com/live/{video_id}",
+        f"https://www.youtube.com/v/{video_id}",
+        f"  http://WWW.YOUTUBE.COM/watch?v={video_id}  ",
+    ):
+        assert youtube_video_id(url) == video_id, url
+
+    for url in (
+        "",
+        "not a url",
+        "https://www.youtube.com/watch",
+        "https://www.youtube.com/watch?v=short",
+        f"https://www.youtube.com/watch?v={video_id}extra",
+        "https://www.youtube.com/channel/UC1234567890",
+        f"https://notyoutube.com/watch?v={video_id}",
+        f"https://example.com/youtu.be/{video_id}",
+        f"https://vimeo.com/{video_id}",
+        "https://youtu.be/",
+    ):
+        assert youtube_video_id(url) is None, url
+
+
+if __name__ == "__main__":
+    test_evicts_least_recently_used_beyond_size()
+    print("✅ Least recently used entries evicted beyond the size limit")
+    test_index_rebuilt_on_restart()
+    print("✅ Index and recency rebuilt from the directory")
+    test_transcript_round_trip()
+    print("✅ Transcript survives the cache round trip")
+    test_unreadable_transcript_is_a_miss()
+    print("✅ Unreadable transcript treated as a miss")
+    test_youtube_video_id_forms()
+    print("✅ Video ID parsed from every URL form")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test download strategy ordering, failure cooldown and persisted history.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from download_strategies import DownloadStrategyScheduler
+
+CASCADE = ["no_cookies", "with_cookies", "extractor:android", "minimal"]
+
+
+def test_order_follows_recent_success():
+    scheduler = DownloadStrategyScheduler(None)
+    assert scheduler.order(CASCADE) == CASCADE
+
+    scheduler.record("no_cookies", False, 30.0)
+    scheduler.record("extractor:android", True, 8.0)
+    scheduler.record("minimal", True, 4.0)
+    # Proven strategies first (faster wins the tie), untried ones before known failures
+    assert scheduler.order(CASCADE) == ["minimal", "extractor:android", "with_cookies", "no_cookies"]
+
+
+def test_failing_strategies_are_skipped_until_cooldown():
+    scheduler = DownloadStrategyScheduler(None, failure_streak=3, cooldown_seconds=900)
+    for _ in range(3):
+        scheduler.record("no_cookies", False, 20.0)
+    assert "no_cookies" not in scheduler.order(CASCADE)
+    assert scheduler.get_stats()["strategies"]["no_cookies"]["cooling_down"]
+
+    scheduler.cooldown_seconds = 0
+    assert "no_cookies" in scheduler.order(CASCADE)
+
+    # With everything cooling down the whole cascade is still tried
+    scheduler.cooldown_seconds = 900
+    for name in CASCADE[1:]:
+        for _ in range(3):
+            scheduler.record(name, False, 1.0)
+    assert scheduler.order(CASCADE) == CASCADE
+
+
+def test_history_survives_restart():
+    path = Path(tempfile.mkdtemp()) / "strategies.json"
+    scheduler = DownloadStrategyScheduler(path)
+    scheduler.record("minimal", True, 3.0)
+    scheduler.record("no_cookies", False, 12.0)
+
+    restored = DownloadStrategyScheduler(path)
+    assert restored.order(CASCADE)[0] == "minimal"
+    assert restored.get_stats()["strategies"]["no_cookies"]["attempts"] == 1
+
+
+if __name__ == "__main__":
+    test_order_follows_recent_success()
+    print("✅ Strategies ordered by recent success")
+    test_failing_strategies_are_skipped_until_cooldown()
+    print("✅ Failing strategies skipped during cooldown")
+    test_history_survives_restart()
+    print("✅ History persisted across restarts")
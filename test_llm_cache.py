@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test the persistent clip list cache in front of clip identification.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from disk_cache import DiskCache
+from llm_cache import LLMCache, transcript_hash
+from transcript import Transcript
+
+
+def test_key_normalization():
+    transcript = Transcript.from_segments([(" Welcome back", 0.0, 1.5), (" to class.", 1.5, 3.0)])
+    content = transcript_hash(transcript)
+    assert content == transcript_hash(Transcript.from_segments([(" Welcome back", 0.0, 1.5), (" to class.", 1.5, 3.0)]))
+    assert content != transcript_hash(Transcript.from_segments([(" Welcome back", 0.0, 1.5), (" to class!", 1.5, 3.0)]))
+
+    key = LLMCache.make_key(content, "Find the funniest  moments.", "gpt-4", "v1")
+    assert key == LLMCache.make_key(content, " find the funniest moments", "gpt-4", "v1")
+    assert key != LLMCache.make_key(content, "Find the saddest moments", "gpt-4", "v1")
+    assert key != LLMCache.make_key(content, "Find the funniest moments", "gpt-4o", "v1")
+    assert key != LLMCache.make_key(content, "Find the funniest moments", "gpt-4", "v2")
+
+
+def test_hit_and_expiry():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMCache(DiskCache(Path(tmp), max_bytes=10 ** 6), ttl_seconds=3600)
+        clips = [{"start": 12.4, "end": 54.6}, {"start": 110.2, "end": 132.0}]
+        cache.put("key", clips)
+
+        # A fresh instance reads it back from disk, in milliseconds
+        cache = LLMCache(DiskCache(Path(tmp), max_bytes=10 ** 6), ttl_seconds=3600)
+        started = time.time()
+        assert cache.get("key") == clips
+        assert (time.time() - started) * 1000 < 50
+        assert cache.get("other") is None
+
+        cache.ttl_seconds = 0
+        time.sleep(0.01)
+        assert cache.get("key") is None
+        stats = cache.get_stats()
+        assert stats["expired"] == 1 and stats["entries"] == 0
+
+
+if __name__ == "__main__":
+    test_key_normalization()
+    print("✅ Cache keys normalize instructions")
+    test_hit_and_expiry()
+    print("✅ Cache hits from disk and expires")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test the shared AsyncOpenAI client against a local OpenAI-compatible stand-in.
+"""
+
+import asyncio
+import http.server
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from llm_client import LLMClient
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    """Answers chat completions over keep-alive connections and counts them"""
+
+    protocol_version = "HTTP/1.1"
+    opened = 0
+    closed = 0
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.lock:
+            type(self).opened += 1
+
+    def finish(self):
+        super().finish()
+        with self.lock:
+            type(self).closed += 1
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if request["model"] == "missing":
+            self.reply(404, {"error": {"message": "model not found", "type": "invalid_request_error"}})
+            return
+        self.reply(200, {
+            "id": "chatcmpl-1", "object": "chat.completion", "created": int(time.time()), "model": request["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "[{'start': 1.0, 'end': 2.0}]"}}],
+            "usage": {"prompt_tokens": 12, "completion_tokens": 5, "total_tokens": 17},
+        })
+
+    def reply(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_stand_in():
+    StandInHandler.opened = StandInHandler.closed = 0
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def test_requests_share_one_connection():
+    server, base_url = start_stand_in()
+    client = LLMClient(base_url)
+    messages = [{"role": "user", "content": "Find the clips"}]
+
+    async def run():
+        usage = {}
+        contents = [await client.complete(messages, "gpt-4", usage) for _ in range(5)]
+        assert client.get() is client.get()
+        await client.aclose()
+        return contents, usage
+
+    try:
+        contents, usage = asyncio.run(run())
+    finally:
+        server.shutdown()
+    assert contents == ["[{'start': 1.0, 'end': 2.0}]"] * 5
+    assert usage == {"prompt_tokens": 12, "completion_tokens": 5}
+    # Every request after the first reused the pooled connection
+    assert StandInHandler.opened == 1
+    stats = client.get_stats()
+    assert (stats["requests"], stats["errors"], stats["clients_created"]) == (5, 0, 1)
+    assert stats["mean_seconds"] is not None
+
+
+def test_errors_are_counted():
+    server, base_url = start_stand_in()
+    client = LLMClient(base_url)
+
+    async def run():
+        await client.complete([{"role": "user", "content": "hi"}], "gpt-4")
+        try:
+            await client.complete([{"role": "user", "content": "hi"}], "missing")
+            assert False, "the stand-in refuses unknown models"
+        except Exception as e:
+            assert "model not found" in str(e)
+        await client.aclose()
+
+    try:
+        asyncio.run(run())
+    finally:
+        server.shutdown()
+    stats = client.get_stats()
+    assert (stats["requests"], stats["errors"]) == (2, 1)
+
+
+def test_new_event_loop_closes_the_old_client():
+    server, base_url = start_stand_in()
+    client = LLMClient(base_url)
+    messages = [{"role": "user", "content": "hi"}]
+    try:
+        # Each asyncio.run is a new loop; the first loop's pooled connection must not be left open
+        asyncio.run(client.complete(messages, "gpt-4"))
+        first = client._client
+
+        async def second():
+            await client.complete(messages, "gpt-4")
+            assert client._client is not first
+            await client.aclose()
+
+        asyncio.run(second())
+        assert wait_for(lambda: StandInHandler.closed == StandInHandler.opened == 2)
+        stats = client.get_stats()
+        assert (stats["clients_created"], stats["clients_closed"]) == (2, 2)
+
+        # A client whose loop still runs in another thread is closed on that loop
+        other_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=other_loop.run_forever, daemon=True)
+        thread.start()
+        asyncio.run_coroutine_threadsafe(client.complete(messages, "gpt-4"), other_loop).result(10)
+        asyncio.run(second())
+        assert wait_for(lambda: StandInHandler.closed == StandInHandler.opened == 4)
+        other_loop.call_soon_threadsafe(other_loop.stop)
+        thread.join()
+        other_loop.close()
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_requests_share_one_connection()
+    print("✅ Requests share one pooled connection")
+    test_errors_are_counted()
+    print("✅ Requests and errors counted")
+    test_new_event_loop_closes_the_old_client()
+    print("✅ Client left by a previous event loop closed")
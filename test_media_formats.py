@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test the remux-first format policy: selector rewriting and container conversion plans.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+import yt_dlp
+
+from media_formats import plan_conversion, prefer_remuxable
+
+FORMATS = [
+    {'format_id': 'vp9', 'ext': 'webm', 'vcodec': 'vp9', 'acodec': 'opus', 'height': 360, 'tbr': 300},
+    {'format_id': '18', 'ext': 'mp4', 'vcodec': 'avc1.42001E', 'acodec': 'mp4a.40.2', 'height': 360, 'tbr': 500},
+    {'format_id': '160', 'ext': 'mp4', 'vcodec': 'avc1.4d400c', 'acodec': 'none', 'height': 144, 'tbr': 100},
+    {'format_id': '140', 'ext': 'm4a', 'vcodec': 'none', 'acodec': 'mp4a.40.2', 'tbr': 128},
+    {'format_id': '251', 'ext': 'webm', 'vcodec': 'none', 'acodec': 'opus', 'tbr': 100},
+]
+
+
+def select(selector: str, format_ids) -> str:
+    formats = [dict(f, url=f"http://media.invalid/{f['format_id']}") for f in FORMATS if f['format_id'] in format_ids]
+    info = {'id': 'x', 'title': 't', 'extractor': 'generic', 'extractor_key': 'Generic',
+            'webpage_url': 'http://media.invalid', 'formats': formats}
+    with yt_dlp.YoutubeDL({'quiet': True, 'format': selector}) as ydl:
+        return ydl.process_ie_result(info, download=False)['format_id']
+
+
+def test_selector_prefers_remuxable_streams():
+    selector = prefer_remuxable('worst[height<=360]')
+    assert selector.endswith('/worst[height<=360]')
+    assert select(selector, {'vp9', '18'}) == '18'
+    # Without a single H.264/AAC file, an H.264 + AAC pair beats the WebM file
+    assert select(selector, {'vp9', '160', '140', '251'}) == '160+140'
+    # The original choice is the last resort
+    assert select(selector, {'vp9', '251'}) == 'vp9'
+
+
+def test_conversion_plans():
+    mp4 = "mov,mp4,m4a,3gp,3g2,mj2"
+    assert plan_conversion({"container": mp4, "video_codec": "h264", "audio_codec": "aac"})["action"] == "none"
+    assert plan_conversion({"container": "matroska,webm", "video_codec": "h264", "audio_codec": "aac"})["action"] == "remux"
+    assert plan_conversion({"container": "matroska,webm", "video_codec": "h264", "audio_codec": None})["action"] == "remux"
+    plan = plan_conversion({"container": "matroska,webm", "video_codec": "vp9", "audio_codec": "aac"})
+    assert plan == {"action": "transcode", "copy_video": False, "copy_audio": True}
+
+
+if __name__ == "__main__":
+    test_selector_prefers_remuxable_streams()
+    print("✅ Format selection prefers remuxable streams")
+    test_conversion_plans()
+    print("✅ Conversion plans")
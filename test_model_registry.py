@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test the process-wide model registry and the pool's view of its workers' registries.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from model_registry import ModelRegistry
+from transcription_pool import TranscriptionPool
+
+
+class FakeLoader:
+    """Stands in for whisper.load_model: slow, and counts its calls per name"""
+
+    def __init__(self, seconds: float = 0.0):
+        self.seconds = seconds
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, name: str):
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+        time.sleep(self.seconds)
+        return {"model": name}
+
+
+def test_loads_once_and_counts_hits():
+    loader = FakeLoader()
+    registry = ModelRegistry(max_models=2, loader=loader)
+    first = registry.get("base")
+    registry.release("base")
+    with registry.acquire("base") as second:
+        assert second is first
+        assert registry.get_stats()["in_use"] == {"base": 1}
+    stats = registry.get_stats()
+    assert loader.calls == {"base": 1}
+    assert (stats["loads"], stats["hits"], stats["hit_rate"]) == (1, 1, 0.5)
+    assert stats["in_use"] == {}
+
+
+def test_evicts_least_recently_used_idle_model():
+    loader = FakeLoader()
+    registry = ModelRegistry(max_models=2, loader=loader)
+    for name in ("tiny", "base", "tiny", "small"):
+        registry.get(name)
+        registry.release(name)
+    # base was used longest ago
+    assert registry.get_stats()["resident"] == ["tiny", "small"]
+    assert registry.get_stats()["evictions"] == 1
+    registry.get("base")
+    registry.release("base")
+    assert loader.calls["base"] == 2
+
+
+def test_model_in_use_is_not_evicted():
+    registry = ModelRegistry(max_models=1, loader=FakeLoader())
+    held = registry.get("base")
+    registry.get("small")
+    registry.release("small")
+    # Over the limit while base is referenced: the idle one goes
+    assert registry.get_stats()["resident"] == ["base"]
+    assert registry.get("base") is held
+    registry.release("base")
+    registry.release("base")
+    registry.get("small")
+    registry.release("small")
+    assert registry.get_stats()["resident"] == ["small"]
+
+
+def test_concurrent_gets_share_one_load():
+    loader = FakeLoader(seconds=0.2)
+    registry = ModelRegistry(loader=loader)
+    models = []
+
+    def use():
+        with registry.acquire("base") as model:
+            models.append(model)
+
+    threads = [threading.Thread(target=use) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loader.calls == {"base": 1}
+    assert len(models) == 8 and all(model is models[0] for model in models)
+    stats = registry.get_stats()
+    assert (stats["loads"], stats["hits"]) == (1, 7)
+    assert stats["in_use"] == {}
+
+
+def test_pool_sums_worker_registries():
+    pool = TranscriptionPool(workers=2, model_name="base", threads_per_worker=1)
+    worker = ModelRegistry(loader=lambda name: object())
+    worker.warmup(["whisper:base"])
+    pool._record_registry({"worker_pid": 101, "registry": worker.get_stats()})
+    for _ in range(3):
+        worker.get("whisper:base")
+        worker.release("whisper:base")
+    pool._record_registry({"worker_pid": 101, "registry": worker.get_stats()})
+    other = ModelRegistry(loader=lambda name: object())
+    other.warmup(["whisper:base"])
+    pool._record_registry({"worker_pid": 102, "registry": other.get_stats()})
+
+    stats = pool.get_stats()["registry"]
+    # Each worker loaded once; later windows were hits
+    assert (stats["loads"], stats["hits"], stats["hit_rate"]) == (2, 3, 0.6)
+    assert set(stats["workers"]) == {"101", "102"}
+    assert stats["workers"]["101"]["resident"] == ["whisper:base"]
+
+
+if __name__ == "__main__":
+    test_loads_once_and_counts_hits()
+    print("✅ Model loaded once, later requests are hits")
+    test_evicts_least_recently_used_idle_model()
+    print("✅ Least recently used idle model evicted")
+    test_model_in_use_is_not_evicted()
+    print("✅ Model in use kept past the limit")
+    test_concurrent_gets_share_one_load()
+    print("✅ Concurrent requests share a single load")
+    test_pool_sums_worker_registries()
+    print("✅ Pool sums its workers' model registries")
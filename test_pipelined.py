@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test pipelined transcription: audio decoded by ffmpeg from a slow local HTTP
+server is cut into the same windows as the sequential path, and the first
+windows are transcribed while the download is still running. Requires ffmpeg.
+"""
+
+import asyncio
+import functools
+import http.server
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from audio import SAMPLE_RATE, open_pcm, pcm_length, start_pcm_stream
+from chunked_transcription import plan_windows, plan_windows_live, stream_windows
+from transcript import Transcript
+
+
+class SlowHandler(http.server.SimpleHTTPRequestHandler):
+    """Static files sent at about ``rate`` bytes per second"""
+
+    rate = 400_000
+
+    def log_message(self, format, *args):
+        pass
+
+    def copyfile(self, source, outputfile):
+        while True:
+            piece = source.read(self.rate // 20)
+            if not piece:
+                break
+            outputfile.write(piece)
+            time.sleep(0.05)
+
+
+def make_audio(path: Path, seconds: int):
+    # Bursts of tone with gaps, so windows have pauses to cut at
+    subprocess.run([
+        "ffmpeg", "-nostdin", "-y", "-loglevel", "error", "-f", "lavfi",
+        "-i", f"aevalsrc='0.3*sin(2*PI*220*t)*gt(sin(2*PI*0.3*t),-0.5)':s={SAMPLE_RATE}:d={seconds}",
+        "-ac", "1", str(path)
+    ], check=True)
+
+
+def test_stream_matches_sequential_plan():
+    media_dir = Path(tempfile.mkdtemp())
+    make_audio(media_dir / "talk.wav", 60)  # ~1.9 MB, about 5 s to serve
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(SlowHandler, directory=str(media_dir)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    pcm_path = str(media_dir / "audio.f32")
+    calls = []
+
+    async def run():
+        process = start_pcm_stream(f"http://127.0.0.1:{server.server_address[1]}/talk.wav", pcm_path)
+        windows = plan_windows_live(
+            lambda: pcm_length(pcm_path), lambda: process.poll() is not None,
+            lambda length: open_pcm(pcm_path, length), 10, 0.5, search_seconds=2, poll_seconds=0.05,
+        )
+
+        async def transcribe_window(start, end):
+            assert pcm_length(pcm_path) >= end
+            calls.append(process.poll() is None)
+            return Transcript.from_segments([(f"{start}-{end}", 0.0, (end - start) / SAMPLE_RATE)])
+
+        planned = [window async for window, _ in stream_windows(windows, transcribe_window, 2)]
+        assert process.wait() == 0
+        return planned
+
+    try:
+        planned = asyncio.run(run())
+    finally:
+        server.shutdown()
+
+    full = open_pcm(pcm_path)
+    assert abs(len(full) / SAMPLE_RATE - 60) < 0.1
+    expected = plan_windows(full, 10, 0.5, search_seconds=2)
+    assert [{k: v for k, v in w.items() if k != "last"} for w in planned] == expected
+    assert planned[-1]["last"] and not any(w["last"] for w in planned[:-1])
+    # Transcription overlapped the download
+    assert calls[0] and len(calls) == len(expected)
+
+
+if __name__ == "__main__":
+    test_stream_matches_sequential_plan()
+    print("✅ Live window plan matches the sequential plan and overlaps the download")
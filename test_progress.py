@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test the yt-dlp progress bridge: throttling, 0-25% mapping and thread-to-loop delivery.
+"""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from progress import ProgressBridge
+
+
+def run_download(bridge, events):
+    for d in events:
+        bridge.hook(d)
+
+
+def test_bridge_maps_and_throttles():
+    updates = []
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        delivered_on = []
+
+        def callback(progress, step, details):
+            delivered_on.append(threading.get_ident())
+            updates.append((progress, step, details))
+
+        bridge = ProgressBridge(loop, callback, 0, 25, "Downloading video...", interval=0.05)
+        video = [{"status": "downloading", "filename": "v.mp4", "downloaded_bytes": n * 100_000,
+                  "total_bytes": 1_000_000, "speed": 2_000_000} for n in range(1, 11)]
+        audio = [{"status": "downloading", "filename": "a.m4a", "downloaded_bytes": 50_000,
+                  "total_bytes": 500_000, "speed": 1_000_000},
+                 {"status": "finished", "filename": "a.m4a", "downloaded_bytes": 500_000, "total_bytes": 500_000}]
+        thread = threading.Thread(target=run_download, args=(bridge, video + audio))
+        thread.start()
+        await loop.run_in_executor(None, thread.join)
+        await asyncio.sleep(0)
+        return delivered_on
+
+    delivered_on = asyncio.run(main())
+    # Delivered on the loop thread, throttled well below one update per hook call
+    assert set(delivered_on) == {threading.get_ident()}
+    assert 2 <= len(updates) < 12
+    progress = [p for p, _, _ in updates]
+    assert progress == sorted(progress) and progress[0] >= 0 and progress[-1] == 25
+    first = updates[0][2]
+    assert first["downloaded_bytes"] == 100_000 and first["total_bytes"] == 1_000_000
+    assert first["speed"] == 2_000_000 and first["eta"] == 0
+    assert "of 1.0 MB at 2.0 MB/s" in updates[0][1]
+    assert updates[-1][2]["downloaded_bytes"] == 1_500_000
+
+
+if __name__ == "__main__":
+    test_bridge_maps_and_throttles()
+    print("✅ Progress mapped, throttled and delivered on the event loop")
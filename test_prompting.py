@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test the compact transcript encoding for the clip-identification prompt.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from prompting import build_transcript_block, estimate_tokens
+from transcript import Transcript
+
+
+def test_compact_lines():
+    transcript = Transcript.from_segments([
+        (" Welcome back", 0.0, 1.5),
+        (" to AP government.", 1.5, 3.2),
+        (" Today, the three branches.", 3.3, 12.0),
+        (" After the break:", 20.0, 21.0),  # a long pause starts a new line
+        (" the judiciary.", 21.0, 22.44),
+    ])
+    text, report = build_transcript_block(transcript, budget=1000, line_seconds=10)
+    assert text == "\n".join([
+        "[0.0] Welcome back to AP government.",
+        "[3.3] Today, the three branches.",
+        "[20.0] After the break: the judiciary.",
+        "[22.4] (end)",
+    ])
+    assert report["lines"] == 3 and report["words_per_line"] is None
+    assert report["tokens"] == estimate_tokens(text) < estimate_tokens(str(list(transcript))) / 2
+
+
+def test_budget_merges_then_trims():
+    segments = [(f" point number {i} is about the branches of government", i * 4.0, i * 4.0 + 3.5) for i in range(300)]
+    transcript = Transcript.from_segments(segments)
+    _, full = build_transcript_block(transcript, budget=10 ** 6)
+
+    _, merged = build_transcript_block(transcript, budget=full["tokens"] * 9 // 10)
+    assert merged["line_seconds"] > full["line_seconds"] and merged["words_per_line"] is None
+    assert merged["tokens"] <= full["tokens"] * 9 // 10
+
+    trimmed_text, trimmed = build_transcript_block(transcript, budget=800, max_line_seconds=40)
+    assert trimmed["words_per_line"] is not None and trimmed["tokens"] <= 800
+    # Every part of the timeline is still there
+    assert trimmed_text.splitlines()[-1] == "[1199.5] (end)"
+    assert trimmed["lines"] == len(trimmed_text.splitlines()) - 1 >= 1196 / 40
+
+
+if __name__ == "__main__":
+    test_compact_lines()
+    print("✅ Compact transcript lines")
+    test_budget_merges_then_trims()
+    print("✅ Token budget merges, then trims")
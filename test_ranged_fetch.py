@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test the two-phase fetch (audio first, then clip sections) against a local
+HTTP media server standing in for YouTube's CDN. Requires ffmpeg and yt-dlp.
+"""
+
+import http.server
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from ranged_fetch import fetch_audio, fetch_sections, locate_section, plan_sections
+
+
+class RangeRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Static file server with single byte-range support, counting bytes sent"""
+
+    bytes_sent = 0
+
+    def setup(self):
+        super().setup()
+        # A small send buffer keeps the count close to what the client actually read
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 32 * 1024)
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        range_header = self.headers.get("Range")
+        if not os.path.isfile(path) or not range_header or not range_header.startswith("bytes="):
+            return super().send_head()
+        size = os.path.getsize(path)
+        first, _, last = range_header[len("bytes="):].partition("-")
+        first, last = int(first), min(int(last) if last else size - 1, size - 1)
+        f = open(path, "rb")
+        f.seek(first)
+        self.send_response(206)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Range", f"bytes {first}-{last}/{size}")
+        self.send_header("Content-Length", str(last - first + 1))
+        self.end_headers()
+        self._remaining = last - first + 1
+        return f
+
+    def copyfile(self, source, outputfile):
+        remaining = getattr(self, "_remaining", None)
+        while remaining is None or remaining > 0:
+            chunk = source.read(64 * 1024 if remaining is None else min(64 * 1024, remaining))
+            if not chunk:
+                break
+            try:
+                outputfile.write(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                break
+            RangeRequestHandler.bytes_sent += len(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+
+
+def make_media(media_dir: Path, seconds: int = 120):
+    """A progressive mp4 (2s keyframe interval) and a separate audio-only m4a"""
+    subprocess.run([
+        "ffmpeg", "-y", "-v", "error",
+        "-f", "lavfi", "-i", f"testsrc=size=640x360:rate=25:duration={seconds}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}",
+        "-c:v", "libx264", "-g", "50", "-b:v", "1M", "-c:a", "aac", "-b:a", "128k",
+        "-movflags", "+faststart", str(media_dir / "video.mp4"),
+    ], check=True)
+    subprocess.run([
+        "ffmpeg", "-y", "-v", "error", "-i", str(media_dir / "video.mp4"),
+        "-vn", "-c:a", "aac", "-b:a", "32k", str(media_dir / "audio.m4a"),
+    ], check=True)
+
+
+def standin_info(base_url: str, seconds: int):
+    """The shape of info dict the YouTube extractor returns, pointing at the local server"""
+    return {
+        "id": "standin",
+        "title": "Local stand-in",
+        "extractor": "generic",
+        "extractor_key": "Generic",
+        "webpage_url": f"{base_url}/watch",
+        "duration": seconds,
+        "formats": [
+            {"format_id": "audio", "url": f"{base_url}/audio.m4a", "ext": "m4a",
+             "acodec": "aac", "vcodec": "none", "abr": 32},
+            {"format_id": "360p", "url": f"{base_url}/video.mp4", "ext": "mp4",
+             "acodec": "aac", "vcodec": "avc1", "height": 360, "width": 640, "tbr": 1160},
+        ],
+    }
+
+
+def test_plan_sections_pads_and_merges():
+    clips = [{"start": 50.0, "end": 60.0}, {"start": 10.0, "end": 20.0}, {"start": 22.0, "end": 30.0}]
+    assert plan_sections(clips, duration=58.0, pad_seconds=3) == [(7.0, 33.0), (47.0, 58.0)]
+    sections = [{"start": 7.0, "end": 33.0, "path": "a"}, {"start": 47.0, "end": 58.0, "path": "b"}]
+    assert locate_section(sections, 22.0, 30.0)["path"] == "a"
+    assert locate_section(sections, 30.0, 50.0) is None
+
+
+def test_two_phase_fetch_from_local_server():
+    seconds = 120
+    media_dir = Path(tempfile.mkdtemp())
+    out_dir = Path(tempfile.mkdtemp())
+    make_media(media_dir, seconds)
+
+    handler = lambda *args, **kwargs: RangeRequestHandler(*args, directory=str(media_dir), **kwargs)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        info = standin_info(f"http://127.0.0.1:{server.server_address[1]}", seconds)
+        opts = {"quiet": True, "no_warnings": True, "noprogress": True}
+
+        audio_path = fetch_audio(info, out_dir, opts)
+        assert Path(audio_path).name == "source_audio.m4a"
+        assert os.path.getsize(audio_path) == os.path.getsize(media_dir / "audio.m4a")
+
+        # A truncated job only takes the start of the track
+        prefix_path = fetch_audio(info, Path(tempfile.mkdtemp()), opts, max_seconds=30)
+        probe = subprocess.run(["ffmpeg", "-i", prefix_path], capture_output=True, text=True).stderr
+        assert "Duration: 00:00:3" in probe or "Duration: 00:00:29" in probe, probe
+        assert os.path.getsize(prefix_path) < os.path.getsize(audio_path) / 2
+
+        RangeRequestHandler.bytes_sent = 0
+        clips = [{"start": 30.0, "end": 36.0}, {"start": 90.0, "end": 95.0}]
+        sections = fetch_sections(info, plan_sections(clips, seconds, pad_seconds=2), out_dir, opts)
+        assert [(s["start"], s["end"]) for s in sections] == [(28.0, 38.0), (88.0, 97.0)]
+        for section in sections:
+            probe = subprocess.run(["ffmpeg", "-i", section["path"]], capture_output=True, text=True).stderr
+            assert "Video:" in probe and "Audio:" in probe
+        # Only the byte ranges around the clips crossed the wire
+        assert RangeRequestHandler.bytes_sent < os.path.getsize(media_dir / "video.mp4") / 3
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_plan_sections_pads_and_merges()
+    print("✅ Sections padded and merged")
+    test_two_phase_fetch_from_local_server()
+    print("✅ Audio and clip sections fetched from the local server")
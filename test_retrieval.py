@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test the lexical pre-filter that picks the transcript windows sent to GPT.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from retrieval import clamp_to_ranges, filter_transcript, query_terms
+from transcript import Transcript
+
+TOPICS = [
+    " Let's warm up and look at the schedule for the week.",
+    " AP Government covers the three branches and federalism.",
+    " In AP Chemistry we balance equations and count moles.",
+    " AP Research means writing a paper and defending it.",
+    " Now a few announcements about the bake sale.",
+]
+
+
+def lecture() -> Transcript:
+    """Five minutes per topic, one 5 s segment at a time"""
+    segments = []
+    for t, text in enumerate(TOPICS):
+        for i in range(60):
+            start = t * 300 + i * 5.0
+            segments.append((text, start, start + 4.5))
+    return Transcript.from_segments(segments)
+
+
+def test_broad_and_targeted_requests():
+    assert query_terms("Find the most engaging and important moments in this video") == []
+    assert query_terms("return #3") == []
+    assert query_terms("Return the part about ap gov") == ["ap", "gov"]
+
+    transcript = lecture()
+    filtered, ranges, report = filter_transcript(transcript, "Find the highlights")
+    assert filtered is None and report["mode"] == "broad"
+
+    filtered, ranges, report = filter_transcript(transcript, "Return the part about ap gov", top_k=3, neighbors=1)
+    assert report["mode"] == "targeted"
+    # "gov" matches "Government"; the neighbours of the chosen windows add context on both sides
+    assert ranges[0][0] < 300 and all(start >= 270 and end <= 630 for start, end in ranges)
+    assert len(filtered) < len(transcript) / 4
+    assert "Government" in filtered.text
+
+    filtered, _, report = filter_transcript(transcript, "the part about the reimann hypothesis")
+    assert filtered is None and report["mode"] == "no_match"
+
+
+def test_clamp_to_ranges():
+    ranges = [(270.0, 420.0), (900.0, 960.0)]
+    clips = [{"start": 300.0, "end": 700.0}, {"start": 910.0, "end": 930.0}, {"start": 500.0, "end": 520.0}]
+    assert clamp_to_ranges(clips, ranges) == [{"start": 300.0, "end": 420.0}, {"start": 910.0, "end": 930.0}]
+    assert clamp_to_ranges([{"start": 1300.0, "end": 1320.0}], ranges) == []
+
+
+def test_fallback_when_every_clip_is_dropped():
+    # Needs the full backend environment (moviepy, whisper)
+    from video_processor import VideoProcessor
+
+    os.environ.setdefault("OPENAI_API_KEY", "test")
+    prompts = []
+
+    async def complete(system_prompt: str, prompt: str) -> str:
+        prompts.append(prompt)
+        # Outside the windows retrieved for "ap gov", so clamping drops it
+        return "[{'start': 1300.0, 'end': 1320.0}]"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        processor = VideoProcessor("test_retrieval_fallback", storage_dir=tmp)
+        processor._complete = complete
+        clips = asyncio.run(processor._identify_clips_uncached(lecture(), "Return the part about ap gov"))
+    assert len(prompts) == 2
+    assert "left out" in prompts[0] and "left out" not in prompts[1]
+    assert clips == [{"start": 1300.0, "end": 1320.0}]
+    assert processor.metrics["retrieval"]["fallback"] is True
+
+
+if __name__ == "__main__":
+    test_broad_and_targeted_requests()
+    print("✅ Broad requests keep the transcript, targeted ones are filtered")
+    test_clamp_to_ranges()
+    print("✅ Clips stay within the retrieved ranges")
+    test_fallback_when_every_clip_is_dropped()
+    print("✅ Full transcript retried when every clip is dropped")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test the shared source cache: single-flight downloads, hits, LRU eviction and failures.
+"""
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from source_cache import SourceCache
+
+
+def make_producer(job_dir: Path, size: int, calls: list, fail: bool = False):
+    async def produce() -> str:
+        calls.append(job_dir)
+        await asyncio.sleep(0.05)
+        if fail:
+            raise RuntimeError("all download strategies failed")
+        path = job_dir / "input.mp4"
+        path.write_bytes(b"v" * size)
+        return str(path)
+    return produce
+
+
+def job_dir() -> Path:
+    return Path(tempfile.mkdtemp())
+
+
+def test_concurrent_jobs_share_one_download():
+    cache = SourceCache(Path(tempfile.mkdtemp()), max_bytes=10_000)
+    calls = []
+
+    async def run():
+        jobs = [job_dir() for _ in range(3)]
+        return await asyncio.gather(*[
+            cache.fetch("youtube:abc:video/mp4", make_producer(job, 1000, calls), job / "input") for job in jobs
+        ])
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert sorted(outcome for _, outcome in results) == ["coalesced", "coalesced", "miss"]
+    assert all(Path(path).read_bytes() == b"v" * 1000 for path, _ in results)
+
+    later = job_dir()
+    path, outcome = asyncio.run(cache.fetch("youtube:abc:video/mp4", make_producer(later, 1000, calls), later / "input"))
+    assert outcome == "hit" and path == str(later / "input.mp4") and len(calls) == 1
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["coalesced"]) == (1, 1, 2)
+
+
+def test_lru_eviction_and_failures():
+    cache = SourceCache(Path(tempfile.mkdtemp()), max_bytes=2500)
+    calls = []
+
+    async def fetch(key, fail=False):
+        job = job_dir()
+        return await cache.fetch(key, make_producer(job, 1000, calls, fail), job / "input")
+
+    asyncio.run(fetch("a"))
+    asyncio.run(fetch("b"))
+    asyncio.run(fetch("a"))  # a becomes most recently used
+    asyncio.run(fetch("c"))  # over budget: b is evicted
+    assert cache.contains("a") and cache.contains("c") and not cache.contains("b")
+    assert cache.get_stats()["evictions"] == 1
+
+    # Waiters see the downloader's failure; nothing is cached
+    async def failing():
+        return await asyncio.gather(fetch("d", fail=True), fetch("d"), return_exceptions=True)
+
+    results = asyncio.run(failing())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert not cache.contains("d")
+
+    # The index survives a restart
+    assert SourceCache(cache.cache_dir, max_bytes=2500).contains("c")
+
+
+if __name__ == "__main__":
+    test_concurrent_jobs_share_one_download()
+    print("✅ Concurrent jobs share one download")
+    test_lru_eviction_and_failures()
+    print("✅ LRU eviction and failure propagation")
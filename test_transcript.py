@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test the array-backed Transcript: time lookups, slicing, word snapping and serialization.
+"""
+
+import json
+import pickle
+import sys
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from transcript import Transcript
+
+
+def sample_transcript():
+    return Transcript.from_segments([
+        (" Hello there.", 0.0, 1.5, [(" Hello", 0.0, 0.6), (" there.", 0.7, 1.5)]),
+        (" General Kenobi!", 2.0, 3.4, [(" General", 2.0, 2.6), (" Kenobi!", 2.7, 3.4)]),
+        (" You are a bold one.", 5.0, 7.0, []),
+    ])
+
+
+def test_lookup_by_time():
+    transcript = sample_transcript()
+    assert len(transcript) == 3 and transcript.word_count == 4
+    assert transcript[1] == (" General Kenobi!", 2.0, 3.4)
+    assert transcript.segment_at(2.5) == 1
+    assert transcript.segment_at(4.0) is None
+    assert transcript.word_at(2.65) is None
+    assert transcript.word(transcript.word_at(3.0)) == (" Kenobi!", 2.7, 3.4)
+    assert transcript.words(2) == []
+
+
+def test_slice_and_snap():
+    transcript = sample_transcript()
+    assert [text for text, _, _ in transcript.slice(1.0, 5.5)] == [
+        " Hello there.", " General Kenobi!", " You are a bold one."
+    ]
+    assert [text for text, _, _ in transcript.slice(1.5, 4.0)] == [" General Kenobi!"]
+    # Cuts inside a word widen to its edges; cuts between words stay put
+    assert transcript.snap(0.3, 2.9) == (0.0, 3.4)
+    assert transcript.snap(0.65, 4.0) == (0.65, 4.0)
+
+
+def test_serialization_round_trips():
+    transcript = sample_transcript().shifted(10.0)
+    restored = Transcript.from_dict(json.loads(json.dumps(transcript.to_dict())))
+    assert list(restored) == list(transcript)
+    assert [restored.words(i) for i in range(3)] == [transcript.words(i) for i in range(3)]
+    assert list(pickle.loads(pickle.dumps(transcript)).rows()) == list(transcript.rows())
+
+    plain = Transcript.from_dict(Transcript.from_segments([(" hi", 0.0, 1.0)]).to_dict())
+    assert list(plain) == [(" hi", 0.0, 1.0)] and not plain.has_words
+
+
+if __name__ == "__main__":
+    test_lookup_by_time()
+    print("✅ Segments and words found by time")
+    test_slice_and_snap()
+    print("✅ Time slicing and word snapping")
+    test_serialization_round_trips()
+    print("✅ Serialization round trips")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test resumable chunked uploads and the direct-URL and upload video sources.
+"""
+
+import asyncio
+import functools
+import http.server
+import sys
+import tempfile
+import threading
+import urllib.request
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from sources import HttpSource, UploadSource, _PublicRedirectHandler, check_public_url
+from uploads import UploadManager
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+async def stream(*pieces: bytes, fail: bool = False):
+    for piece in pieces:
+        yield piece
+    if fail:
+        raise ConnectionError("client went away")
+
+
+def test_resumable_chunked_upload():
+    root = Path(tempfile.mkdtemp())
+    manager = UploadManager(root, chunk_size=4)
+    upload_id = manager.create("alice", "../talk.mp4", 10)["upload_id"]
+
+    async def interrupted():
+        await manager.write_chunk(upload_id, "alice", 2, stream(b"89"))
+        try:
+            await manager.write_chunk(upload_id, "alice", 0, stream(b"01", fail=True))
+        except ConnectionError:
+            pass
+
+    asyncio.run(interrupted())
+    # The half-sent chunk does not count; the state survives a restart
+    manager = UploadManager(root, chunk_size=4)
+    status = manager.status(upload_id, "alice")
+    assert (status["filename"], status["chunks"], status["missing"]) == ("talk.mp4", 3, [0, 1])
+
+    async def resume():
+        await manager.write_chunk(upload_id, "alice", 0, stream(b"01", b"23"))
+        try:
+            await manager.write_chunk(upload_id, "alice", 1, stream(b"4567", b"x"))
+        except ValueError:
+            pass
+        return await manager.write_chunk(upload_id, "alice", 1, stream(b"4", b"567"))
+
+    assert asyncio.run(resume())["complete"]
+    assert manager.completed_path(upload_id, "alice").read_bytes() == b"0123456789"
+
+    async def interrupted_resend():
+        try:
+            await manager.write_chunk(upload_id, "alice", 0, stream(b"XX", fail=True))
+        except ConnectionError:
+            pass
+
+    # An interrupted re-send of a received chunk leaves it missing, not silently corrupt
+    asyncio.run(interrupted_resend())
+    status = UploadManager(root, chunk_size=4).status(upload_id, "alice")
+    assert (status["complete"], status["missing"]) == (False, [0])
+    try:
+        manager.completed_path(upload_id, "alice")
+        assert False, "a partly overwritten upload must not be complete"
+    except ValueError:
+        pass
+    assert asyncio.run(manager.write_chunk(upload_id, "alice", 0, stream(b"0123")))["complete"]
+    assert manager.completed_path(upload_id, "alice").read_bytes() == b"0123456789"
+    try:
+        manager.status(upload_id, "mallory")
+        assert False, "other users must not see the upload"
+    except PermissionError:
+        pass
+
+
+def test_http_and_upload_sources():
+    media_dir = Path(tempfile.mkdtemp())
+    (media_dir / "clip.mp4").write_bytes(b"m" * 3_000_000)
+    handler = functools.partial(QuietHandler, directory=str(media_dir))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        events = []
+        dest = Path(tempfile.mkdtemp()) / "input.mp4"
+        url = f"http://127.0.0.1:{server.server_address[1]}/clip.mp4"
+        # Loopback is refused unless private addresses are explicitly allowed
+        try:
+            HttpSource(url).fetch(dest, [])
+            assert False, "loopback URLs must be refused"
+        except ValueError:
+            pass
+        HttpSource(url, allow_private=True).fetch(dest, [events.append])
+    finally:
+        server.shutdown()
+    assert dest.read_bytes() == (media_dir / "clip.mp4").read_bytes()
+    assert events[-1]["status"] == "finished" and events[-2]["downloaded_bytes"] == 3_000_000
+    assert all(event["total_bytes"] == 3_000_000 for event in events)
+
+    # Job lists show the URL or the uploaded file's name
+    assert HttpSource(url).title == url
+    assert UploadSource(str(dest), "talk.mp4").title == "talk.mp4"
+
+    # Uploads are moved into the job; local files are left in place
+    moved = Path(tempfile.mkdtemp()) / "input.mp4"
+    UploadSource(str(dest), "talk.mp4", move=True).fetch(moved, [])
+    assert moved.exists() and not dest.exists()
+    linked = Path(tempfile.mkdtemp()) / "input.mp4"
+    UploadSource(str(moved)).fetch(linked, [])
+    assert linked.read_bytes() == moved.read_bytes()
+
+
+def test_http_source_refuses_internal_addresses():
+    for url in ("http://localhost/x.mp4", "http://169.254.169.254/latest/meta-data/", "http://10.0.0.7/x.mp4",
+                "http://[::1]:8000/x.mp4", "http://0.0.0.0/x.mp4"):
+        try:
+            check_public_url(url)
+            assert False, f"{url} must be refused"
+        except ValueError:
+            pass
+    check_public_url("http://8.8.8.8/x.mp4")
+    # Redirects are checked too
+    request = urllib.request.Request("http://8.8.8.8/x.mp4")
+    try:
+        _PublicRedirectHandler().redirect_request(request, None, 302, "Found", {}, "http://169.254.169.254/")
+        assert False, "redirects to internal addresses must be refused"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    test_resumable_chunked_upload()
+    print("✅ Resumable chunked upload")
+    test_http_and_upload_sources()
+    print("✅ Direct URL and upload sources")
+    test_http_source_refuses_internal_addresses()
+    print("✅ Direct URLs limited to public addresses")
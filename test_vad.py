@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test the voice-activity pre-pass and timestamp remapping.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+
+from audio import SAMPLE_RATE, open_pcm
+from vad import compact_speech, speech_regions
+
+
+def synthetic_program():
+    """20s dead air, 20s steady music bed, 20s syllable-modulated speech, 10s dead air"""
+    rng = np.random.default_rng(1)
+    t = np.arange(20 * SAMPLE_RATE) / SAMPLE_RATE
+    dead_air = rng.normal(0, 0.001, len(t))
+    music = 0.3 * (np.sin(2 * np.pi * 220 * t) + 0.5 * np.sin(2 * np.pi * 330 * t))
+    syllables = np.clip(np.sin(2 * np.pi * 4 * t), 0, None)
+    speech = 0.3 * syllables * np.sin(2 * np.pi * 150 * t) * (1 + 0.3 * rng.normal(size=len(t)))
+    return np.concatenate([dead_air, music, speech, dead_air[:10 * SAMPLE_RATE]]).astype(np.float32)
+
+
+def test_speech_regions_skip_dead_air_and_music():
+    audio = synthetic_program()
+    regions = speech_regions(audio)
+    speech = sum(end - start for start, end in regions) / SAMPLE_RATE
+
+    assert 20 <= speech <= 22
+    # Only the step where the music starts may leak through; the steady bed does not
+    outside = sum(min(end, 39 * SAMPLE_RATE) - start for start, end in regions if start < 39 * SAMPLE_RATE)
+    assert outside / SAMPLE_RATE < 1.5
+    assert regions[-1][1] / SAMPLE_RATE <= 61
+
+
+def test_compacted_timestamps_map_back():
+    audio = np.zeros(60 * SAMPLE_RATE, dtype=np.float32)
+    regions = [(10 * SAMPLE_RATE, 15 * SAMPLE_RATE), (40 * SAMPLE_RATE, 50 * SAMPLE_RATE)]
+    out_path = Path(tempfile.mkdtemp()) / "speech.f32"
+    time_map = compact_speech(audio, regions, str(out_path), gap_seconds=0.5)
+
+    assert len(open_pcm(str(out_path))) == int(16 * SAMPLE_RATE)
+    assert time_map.to_original(0.0) == 10.0
+    assert time_map.to_original(4.0) == 14.0
+    # Inside the inserted gap: snaps to the end of the first region
+    assert time_map.to_original(5.2) == 15.0
+    assert time_map.to_original(5.5) == 40.0
+    assert time_map.to_original(12.5) == 47.0
+
+
+if __name__ == "__main__":
+    test_speech_regions_skip_dead_air_and_music()
+    print("✅ Dead air and music skipped")
+    test_compacted_timestamps_map_back()
+    print("✅ Compacted timestamps mapped back")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test that a job extracts the video info once and downloads from it, re-extracting only to retry.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent / "backend"))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import video_processor
+from download_strategies import DownloadStrategyScheduler
+from video_processor import VideoProcessor
+
+URL = "https://www.youtube.com/watch?v=jNQXAC9IVRw"
+
+
+class FakeYoutubeDL:
+    """Stands in for yt_dlp.YoutubeDL, recording extractions and downloads"""
+
+    calls = []
+    # Downloads from the stored info fail while this is positive, as with expired stream URLs
+    stale_info_failures = 0
+
+    def __init__(self, opts=None):
+        self.opts = opts or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, url, download=False):
+        self.calls.append("extract")
+        return {"id": "jNQXAC9IVRw", "title": "Me at the zoo", "duration": 19, "formats": []}
+
+    def sanitize_info(self, info):
+        return info
+
+    def process_ie_result(self, info, download=True):
+        self.calls.append("reuse")
+        if FakeYoutubeDL.stale_info_failures > 0:
+            FakeYoutubeDL.stale_info_failures -= 1
+            raise RuntimeError("HTTP Error 403: Forbidden")
+        self._write()
+        return info
+
+    def download(self, urls):
+        # A download by URL extracts the info afresh
+        self.calls.append("download")
+        self._write()
+        return 0
+
+    def _write(self):
+        Path(self.opts["outtmpl"]).write_bytes(b"video")
+
+
+def run_download(stale_info_failures: int = 0):
+    FakeYoutubeDL.calls = []
+    FakeYoutubeDL.stale_info_failures = stale_info_failures
+    scheduler = DownloadStrategyScheduler(None)
+    real_ydl, real_scheduler = video_processor.yt_dlp.YoutubeDL, video_processor.download_scheduler
+    video_processor.yt_dlp.YoutubeDL, video_processor.download_scheduler = FakeYoutubeDL, scheduler
+    try:
+        processor = VideoProcessor("info-reuse", storage_dir=tempfile.mkdtemp())
+        output_path = str(processor.temp_dir / "input.mp4")
+        asyncio.run(processor._download_youtube_video(URL, output_path, None))
+        # Later stages (sections, captions, render duration) use the stored info
+        assert processor._require_video_info(URL)["title"] == "Me at the zoo"
+        return processor, scheduler
+    finally:
+        video_processor.yt_dlp.YoutubeDL, video_processor.download_scheduler = real_ydl, real_scheduler
+
+
+def test_info_extracted_once_per_job():
+    processor, scheduler = run_download()
+    assert FakeYoutubeDL.calls == ["extract", "reuse"]
+    assert processor.metrics["download_strategy"]["reused_info"] is True
+    assert processor.metrics["download_strategy"]["attempts"] == 1
+
+
+def test_stale_info_retried_with_fresh_extraction():
+    processor, scheduler = run_download(stale_info_failures=1)
+    # The same strategy again by URL, not a second strategy
+    assert FakeYoutubeDL.calls == ["extract", "reuse", "download"]
+    strategy = processor.metrics["download_strategy"]
+    assert (strategy["attempts"], strategy["reused_info"]) == (1, False)
+    # Only the outcome of the retry is recorded against the strategy
+    history = scheduler.get_stats()["strategies"][strategy["name"]]
+    assert (history["attempts"], history["successes"]) == (1, 1)
+
+
+if __name__ == "__main__":
+    test_info_extracted_once_per_job()
+    print("✅ Video info extracted once and downloaded from")
+    test_stale_info_retried_with_fresh_extraction()
+    print("✅ Stale info retried with a fresh extraction")